@@ -2,29 +2,72 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from scipy import stats
 import numpy as np
 import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', 'python'))
+from aggregate_store import data_version, load_aggregates
+from funnel import onboarding_funnel
+from cohorts import cohort_retention
+from feature_bitmaps import build_index, co_adoption, feature_retention, popcount
+from ab_monitor import COLUMNS as MONITOR_COLUMNS, replay
+from data_loader import load_table
+from experiment_stats import EXPERIMENT_SEGMENTS, compare_variants, experiment_results
+from power import days_curve, days_to_significance, planning_grid, sample_size_proportions
+from upsell_scoring import undermonetized_workspaces, uplift_summary
 
 # Page config
 st.set_page_config(layout="wide", page_title="TaskFlow Analytics Command Center", page_icon="🚀")
 
 # ── Data Loading ──────────────────────────────────────────────────────────────
+@st.cache_resource
+def load_data(version):
+    # Small precomputed tables, materialized once per data version from the
+    # CSV or Parquet tables and refreshed incrementally as rows are appended
+    # (see python/aggregate_store.py). They are shared by all sessions, so
+    # pages must not modify them.
+    return load_aggregates()
+
+@st.cache_data
+def load_funnel(version, segment):
+    # Onboarding funnel in one pass per data version and segment (see python/funnel.py)
+    return onboarding_funnel(segment)
+
+@st.cache_resource
+def load_feature_index(version):
+    # Per-feature, per-tier and retained-user bitmaps (see python/feature_bitmaps.py)
+    return build_index()
+
+@st.cache_data
+def load_sequential(version):
+    # Daily always-valid results as the experiment would have been monitored
+    return replay(load_table('ab_test_assignments', columns=MONITOR_COLUMNS + ['assignment_date']))
+
+@st.cache_data
+def load_experiment_results(version, segment):
+    # Every test x segment x metric comparison, Holm-adjusted within each test
+    return experiment_results(segment=segment, family='test_name')
+
+@st.cache_resource
+def load_planning_grid():
+    # Users per arm over baseline x MDE x alpha x power, stored under data/.cache/power
+    return planning_grid()
+
+@st.cache_data
+def load_upsell_scores(version):
+    # Free workspaces scored against every paid tier (see python/upsell_scoring.py)
+    return undermonetized_workspaces()
+
 @st.cache_data
-def load_data():
-    SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(SCRIPT_DIR, '..', 'data')
-
-    users = pd.read_csv(os.path.join(data_path, 'users.csv'))
-    activity = pd.read_csv(os.path.join(data_path, 'user_activity_summary.csv'))
-    onboarding = pd.read_csv(os.path.join(data_path, 'onboarding_funnel.csv'))
-    features = pd.read_csv(os.path.join(data_path, 'feature_usage.csv'))
-    ab_test = pd.read_csv(os.path.join(data_path, 'ab_test_assignments.csv'))
-    subs = pd.read_csv(os.path.join(data_path, 'subscriptions.csv'))
-    return users, activity, onboarding, features, ab_test, subs
+def load_cohorts(version, granularity, max_periods):
+    # Cohort x period retention triangle (see python/cohorts.py)
+    return cohort_retention(granularity, max_periods)
 
 try:
-    users, activity, onboarding, features, ab_test, subs = load_data()
+    version = data_version()
+    aggregates = load_data(version)
 except FileNotFoundError:
     st.error("Data files not found. Please run `python python/data_generation.py` first.")
     st.stop()
@@ -42,11 +85,11 @@ if page == "📊 Executive Summary":
     st.markdown("*Key metrics for the TaskFlow product team — updated monthly*")
 
     # KPIs
-    total_users = len(users)
-    active_users = int(users['is_active'].sum())
-    active_subs = subs[subs['is_active'] == True]
-    mrr = active_subs['mrr'].sum()
-    activation_rate = onboarding['onboarding_completed'].sum() / total_users
+    summary = aggregates['summary'].iloc[0]
+    total_users = int(summary['total_users'])
+    active_users = int(summary['active_users'])
+    mrr = summary['mrr']
+    activation_rate = aggregates['funnel']['onboarding_completed'].iloc[0] / total_users
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Users", f"{total_users:,}")
@@ -64,8 +107,7 @@ if page == "📊 Executive Summary":
 
     # Monthly signups trend
     st.subheader("Monthly Signups Trend")
-    users['signup_month'] = pd.to_datetime(users['signup_date']).dt.to_period('M').astype(str)
-    signups = users.groupby('signup_month').size().reset_index(name='signups')
+    signups = aggregates['signups_by_month']
 
     fig = px.area(signups, x='signup_month', y='signups',
                   labels={'signup_month': 'Month', 'signups': 'New Signups'},
@@ -75,7 +117,7 @@ if page == "📊 Executive Summary":
 
     # MRR by plan
     st.subheader("MRR Breakdown by Plan")
-    mrr_by_plan = active_subs.groupby('plan_type')['mrr'].sum().reset_index()
+    mrr_by_plan = aggregates['mrr_by_plan']
     mrr_by_plan = mrr_by_plan[mrr_by_plan['mrr'] > 0]
     fig_mrr = px.pie(mrr_by_plan, values='mrr', names='plan_type',
                      color_discrete_sequence=px.colors.qualitative.Set2)
@@ -89,28 +131,37 @@ elif page == "🩺 Product Health":
 
     # ── Onboarding Funnel ─────────────────────────────────────────────────────
     st.subheader("Onboarding Funnel — The Cliff at Step 3")
-    s1 = int(onboarding['step_1_completed'].sum())
-    s2 = int(onboarding['step_2_completed'].sum())
-    s3 = int(onboarding['step_3_completed'].sum())
-    s4 = int(onboarding['step_4_completed'].sum())
-    total = len(onboarding)
-
-    funnel_df = pd.DataFrame({
-        'Step': ['Start (All Users)', 'Step 1: Team Setup', 'Step 2: Invite Members',
-                 'Step 3: Create Board ⚠️', 'Step 4: Create Task'],
-        'Users': [total, s1, s2, s3, s4]
-    })
-
-    fig_funnel = px.funnel(funnel_df, x='Users', y='Step',
-                           color_discrete_sequence=['#636EFA'])
+    segment_options = {"All users": None, "Account tier": 'account_tier',
+                       "Signup source": 'signup_source', "A/B variant": 'ab_test_variant'}
+    segment = segment_options[st.selectbox("Segment by", list(segment_options))]
+    funnel = load_funnel(version, segment)
+    overall = load_funnel(version, None)
+
+    start = funnel[funnel['step_number'] == 1].assign(
+        step_name='Start (All Users)', users_completed=lambda d: d['users_reached'])
+    funnel_df = pd.concat([start, funnel], ignore_index=True).rename(
+        columns={'step_name': 'Step', 'users_completed': 'Users', 'segment': 'Segment'})
+    funnel_df['Step'] = funnel_df['Step'].replace({'Step 3: Create Board': 'Step 3: Create Board ⚠️'})
+
+    fig_funnel = px.funnel(funnel_df, x='Users', y='Step', color='Segment' if segment else None,
+                           color_discrete_sequence=['#636EFA'] if segment is None else None)
     st.plotly_chart(fig_funnel, width="stretch")
 
     # Drop-off rates
+    drop_off = overall.set_index('step_number')['drop_off_rate']
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Step 1 Drop-off", f"{(1 - s1 / total):.0%}")
-    col2.metric("Step 2 Drop-off", f"{(1 - s2 / s1):.0%}" if s1 else "N/A")
-    col3.metric("Step 3 Drop-off", f"{(1 - s3 / s2):.0%}" if s2 else "N/A", delta="🚨 Highest")
-    col4.metric("Step 4 Drop-off", f"{(1 - s4 / s3):.0%}" if s3 else "N/A")
+    col1.metric("Step 1 Drop-off", f"{drop_off[1]:.0%}")
+    col2.metric("Step 2 Drop-off", f"{drop_off[2]:.0%}" if pd.notna(drop_off[2]) else "N/A")
+    col3.metric("Step 3 Drop-off", f"{drop_off[3]:.0%}" if pd.notna(drop_off[3]) else "N/A", delta="🚨 Highest")
+    col4.metric("Step 4 Drop-off", f"{drop_off[4]:.0%}" if pd.notna(drop_off[4]) else "N/A")
+
+    medians = overall.set_index('step_number')['median_hours_from_previous'].dropna()
+    st.caption("Median time from the previous step: " +
+               " · ".join(f"Step {step}: {hours:.1f}h" for step, hours in medians.items()))
+
+    if segment:
+        st.dataframe(funnel.pivot(index='segment', columns='step_name', values='drop_off_rate')
+                     .style.format("{:.0%}"), width="stretch")
 
     st.info("💡 **Hypothesis:** Users face the 'blank canvas' problem at Step 3 — they don't know what board structure to use. Providing templates could fix this.")
 
@@ -118,26 +169,51 @@ elif page == "🩺 Product Health":
     st.subheader("Power Feature Paradox")
     st.markdown("Low adoption + high retention = **hidden gem features**. Top-left quadrant is where the opportunities are.")
 
-    adoption = features.groupby('feature_name')['user_id'].nunique().reset_index(name='adopters')
-    adoption['adoption_rate'] = adoption['adopters'] / len(users)
-
-    retention_lift_map = {
-        'time_tracking': 3.9, 'kanban_boards': 1.2, 'automation_rules': 2.9,
-        'custom_fields': 3.2, 'reporting_dashboard': 2.1, 'integrations_slack': 1.4,
-        'integrations_google_drive': 1.1
-    }
-    adoption['retention_lift'] = adoption['feature_name'].map(retention_lift_map).fillna(1.0)
+    feature_index = load_feature_index(version)
+    tier = st.selectbox("Users", ["All tiers"] + list(feature_index['tiers']))
+    within = feature_index['tiers'].get(tier)
+    adoption = feature_retention(feature_index, within)
 
     fig_scatter = px.scatter(adoption, x='adoption_rate', y='retention_lift',
                              text='feature_name', size='adopters',
                              labels={'adoption_rate': 'Adoption Rate', 'retention_lift': '30-Day Retention Lift (x)'},
                              color_discrete_sequence=['#EF553B'])
     fig_scatter.update_traces(textposition='top center')
-    fig_scatter.add_hline(y=2.0, line_dash="dot", line_color="gray", annotation_text="2x retention threshold")
+    fig_scatter.add_hline(y=1.0, line_dash="dot", line_color="gray", annotation_text="No lift vs non-adopters")
     fig_scatter.add_vline(x=0.20, line_dash="dot", line_color="gray", annotation_text="20% adoption threshold")
     st.plotly_chart(fig_scatter, width="stretch")
 
-    st.success("🎯 **time_tracking** is the biggest opportunity: only 12% adoption but 3.9x retention lift. Moving it to the main nav could retain 2,800+ users.")
+    hidden_gems = adoption[(adoption['adoption_rate'] < 0.20) & (adoption['retention_lift'] > 1.0)]
+    if len(hidden_gems):
+        gem = hidden_gems.iloc[0]
+        # Users on the selected tier, counted directly (back-solving from a feature's
+        # adopters / adoption_rate divides by zero when nobody uses it)
+        users_in_scope = int(popcount(feature_index['universe'] if within is None else within))
+        extra_retained = (0.40 - gem['adoption_rate']) * users_in_scope * \
+            (gem['retention_rate'] - gem['baseline_retention_rate'])
+        st.success(f"🎯 **{gem['feature_name']}** is the biggest opportunity: only {gem['adoption_rate']:.0%} "
+                   f"adoption but {gem['retention_lift']:.2f}x retention lift. Raising adoption to 40% "
+                   f"could retain {extra_retained:,.0f} more users.")
+
+    st.markdown("**Feature co-adoption** — share of each row feature's adopters who also use the column feature")
+    both = co_adoption(feature_index, within)
+    fig_co = px.imshow(both.div(np.diag(both), axis=0) * 100, text_auto='.0f',
+                       labels={'color': 'Also use %'}, color_continuous_scale='Reds', aspect='auto')
+    st.plotly_chart(fig_co, width="stretch")
+
+    # ── Cohort Retention ──────────────────────────────────────────────────────
+    st.subheader("Cohort Retention")
+    st.markdown("Share of each signup cohort still active N periods after signup.")
+    granularity_options = {"Monthly": ('month', 24), "Weekly": ('week', 52), "Daily": ('day', 90)}
+    granularity_label = st.radio("Granularity", list(granularity_options), horizontal=True)
+    granularity, max_periods = granularity_options[granularity_label]
+    triangle = load_cohorts(version, granularity, max_periods)
+
+    fig_cohorts = px.imshow(triangle.drop(columns='cohort_size') * 100,
+                            labels={'x': f'{granularity.title()}s Since Signup', 'y': 'Signup Cohort',
+                                    'color': 'Retained %'},
+                            color_continuous_scale='Blues', aspect='auto')
+    st.plotly_chart(fig_cohorts, width="stretch")
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # PAGE 3: A/B TEST RESULTS
@@ -156,14 +232,16 @@ elif page == "🧪 A/B Test Results":
     | **Variant** | 3-step flow with templates |
     """)
 
-    test_data = ab_test[ab_test['test_name'] == 'simplified_onboarding_q4_2025']
+    ab_counts = aggregates['ab_counts']
+    test_data = ab_counts[ab_counts['test_name'] == 'simplified_onboarding_q4_2025']
     control = test_data[test_data['variant'] == 'control']
     variant = test_data[test_data['variant'] == 'variant_a']
 
-    con_n, con_conv = len(control), int(control['converted'].sum())
-    var_n, var_conv = len(variant), int(variant['converted'].sum())
+    con_n, con_conv = int(control['users'].sum()), int(control['conversions'].sum())
+    var_n, var_conv = int(variant['users'].sum()), int(variant['conversions'].sum())
     con_rate = con_conv / con_n if con_n else 0
     var_rate = var_conv / var_n if var_n else 0
+    comparison = compare_variants(test_data).iloc[0]
 
     # KPI cards
     col1, col2, col3 = st.columns(3)
@@ -171,8 +249,7 @@ elif page == "🧪 A/B Test Results":
     col2.metric("Variant Conversion", f"{var_rate:.1%}", delta=f"+{(var_rate - con_rate):.1%}")
 
     # Chi-square test
-    contingency = [[con_conv, con_n - con_conv], [var_conv, var_n - var_conv]]
-    chi2, p_value, _, _ = stats.chi2_contingency(contingency)
+    p_value = comparison['chi2_p_value']
     col3.metric("P-Value", f"{p_value:.6f}")
 
     if p_value < 0.05:
@@ -198,32 +275,66 @@ elif page == "🧪 A/B Test Results":
         st.plotly_chart(fig_bar, width="stretch")
 
     with col_chart2:
-        st.subheader("Confidence Intervals (95%)")
-        z = 1.96
-        con_se = np.sqrt(con_rate * (1 - con_rate) / con_n)
-        var_se = np.sqrt(var_rate * (1 - var_rate) / var_n)
-
+        st.subheader("Confidence Intervals (95%, Wilson)")
         ci_df = pd.DataFrame({
             'Variant': ['Control', 'Variant'],
             'Rate': [con_rate * 100, var_rate * 100],
-            'Lower': [(con_rate - z * con_se) * 100, (var_rate - z * var_se) * 100],
-            'Upper': [(con_rate + z * con_se) * 100, (var_rate + z * var_se) * 100]
+            'Lower': [comparison['control_ci_lower'] * 100, comparison['ci_lower'] * 100],
+            'Upper': [comparison['control_ci_upper'] * 100, comparison['ci_upper'] * 100]
         })
-        ci_df['Error'] = ci_df['Upper'] - ci_df['Rate']
 
         fig_ci = go.Figure()
         fig_ci.add_trace(go.Bar(
             x=ci_df['Variant'], y=ci_df['Rate'],
-            error_y=dict(type='data', array=ci_df['Error'].tolist(), visible=True),
+            error_y=dict(type='data', array=(ci_df['Upper'] - ci_df['Rate']).tolist(),
+                         arrayminus=(ci_df['Rate'] - ci_df['Lower']).tolist(), visible=True),
             marker_color=['#EF553B', '#00CC96']
         ))
         fig_ci.update_layout(yaxis_title='Conversion Rate (%)', yaxis_range=[0, 60])
         st.plotly_chart(fig_ci, width="stretch")
 
+    # Segments and secondary metrics
+    st.subheader("🧮 Segments & Metrics")
+    segment_labels = {segment.replace('_', ' ').capitalize(): segment for segment in EXPERIMENT_SEGMENTS}
+    breakdown = load_experiment_results(version, segment_labels[st.selectbox("Break down by", list(segment_labels))])
+    st.dataframe(
+        breakdown[['test_name', 'segment', 'metric', 'users', 'control_users', 'conversion_rate', 'control_rate',
+                   'lift', 'lift_ci_lower', 'lift_ci_upper', 'p_adjusted', 'significant']]
+        .style.format({'conversion_rate': '{:.1%}', 'control_rate': '{:.1%}', 'lift': '{:+.1%}',
+                       'lift_ci_lower': '{:+.1%}', 'lift_ci_upper': '{:+.1%}', 'p_adjusted': '{:.4f}'}),
+        width="stretch", hide_index=True)
+    st.caption("Lift intervals are Newcombe (Wilson-based); p-values are Holm-adjusted across every "
+               "segment and metric of a test.")
+
+    # Sequential monitoring
+    st.subheader("🔁 Sequential Monitoring")
+    st.markdown("Re-running the test above every day inflates false positives. The always-valid "
+                "p-value and confidence sequence below (mSPRT) can be checked daily at no such cost.")
+    sequential = load_sequential(version)
+    sequential = sequential[(sequential['test_name'] == 'simplified_onboarding_q4_2025') &
+                            (sequential['variant'] == 'variant_a')]
+    bounded = sequential[np.isfinite(sequential['ci_lower'])]
+    fig_seq = go.Figure([
+        go.Scatter(x=bounded['as_of'], y=bounded['ci_upper'] * 100, line=dict(width=0), showlegend=False),
+        go.Scatter(x=bounded['as_of'], y=bounded['ci_lower'] * 100, line=dict(width=0), fill='tonexty',
+                   fillcolor='rgba(0,204,150,0.2)', name='95% confidence sequence'),
+        go.Scatter(x=sequential['as_of'], y=sequential['lift'] * 100, line=dict(color='#00CC96'),
+                   name='Observed lift'),
+    ])
+    fig_seq.add_hline(y=0, line_dash="dot", line_color="gray")
+    fig_seq.update_layout(yaxis_title='Lift (pp)', xaxis_title='Assignment date')
+    st.plotly_chart(fig_seq, width="stretch")
+
+    stopped = sequential[sequential['decision'] != 'continue']
+    col_s1, col_s2 = st.columns(2)
+    col_s1.metric("Always-Valid P-Value", f"{sequential['always_valid_p'].iloc[-1]:.6f}")
+    col_s2.metric("Decision Reached", f"{stopped['as_of'].iloc[0]:%b %d, %Y}" if len(stopped) else "Not yet",
+                  help=f"After {stopped['rows_seen'].iloc[0]:,} users" if len(stopped) else None)
+
     # Business impact
     st.subheader("💰 Business Impact")
     lift = var_rate - con_rate
-    monthly_signups = 1000
+    monthly_signups = st.number_input("Monthly signups", min_value=100, value=1000, step=100)
     additional = monthly_signups * lift
     annual_impact = additional * 12 * 1200
 
@@ -234,6 +345,33 @@ elif page == "🧪 A/B Test Results":
 
     st.info("💡 **Recommendation:** Ship the simplified 3-step onboarding immediately. Monitor activation rate for 2 weeks post-launch.")
 
+    # Power & sample size
+    st.subheader("📐 Plan the Next Test")
+    col_p1, col_p2, col_p3 = st.columns(3)
+    default_baseline = float(np.clip(round(var_rate, 2), 0.01, 0.99))
+    baseline = col_p1.slider("Baseline conversion", 0.01, 0.99, default_baseline, 0.01,
+                             help="Defaults to the variant's rate, the baseline once it ships")
+    alpha = col_p2.selectbox("Alpha", [0.05, 0.01, 0.10])
+    power = col_p3.selectbox("Power", [0.80, 0.90])
+    curve = days_curve(load_planning_grid(), baseline, monthly_signups, alpha, power)
+    curve = curve[curve['days'] <= 365].assign(mde_pp=lambda d: d['mde'] * 100)
+
+    fig_days = px.line(curve, x='mde_pp', y='days', hover_data=['users_per_arm'],
+                       labels={'mde_pp': 'Minimum Detectable Lift (pp)', 'days': 'Days to Significance',
+                               'users_per_arm': 'Users per Arm'})
+    fig_days.add_hline(y=30, line_dash="dot", line_color="gray", annotation_text="1 month")
+    st.plotly_chart(fig_days, width="stretch")
+
+    # Sizing for the observed lift only makes sense when the variant won
+    if lift > 0:
+        observed_users = sample_size_proportions(con_rate, lift, alpha, power)
+        col_d1, col_d2 = st.columns(2)
+        col_d1.metric(f"Users/Arm for a +{lift:.1%} Lift", f"{observed_users:,.0f}")
+        col_d2.metric("Days Needed (This Test)", f"{days_to_significance(observed_users, monthly_signups):.0f}",
+                      help=f"At {monthly_signups:,} signups/month split across two arms")
+    else:
+        st.caption("The variant showed no positive lift, so there is no observed effect to size a test for.")
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # PAGE 4: ROADMAP INFLUENCE
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -241,16 +379,51 @@ elif page == "🗺️ Roadmap Influence":
     st.title("🗺️ Roadmap Prioritization Framework")
     st.markdown("Data-driven prioritization for Q1 2026. Scored on **User Demand**, **Revenue Impact**, **Effort**, and **Data Confidence**.")
 
+    # Upgrade campaign impact from the live workspace scores
+    upsell = load_upsell_scores(version)
+    campaign_size = st.slider("Upgrade campaign size (top-scored free workspaces)", 10, max(10, len(upsell)),
+                              min(230, max(10, len(upsell))), step=10)
+    campaign = uplift_summary(upsell, campaign_size)
+    campaign_share = campaign['workspaces'] / max(len(upsell), 1)
+
     roadmap = pd.DataFrame([
         {"Rank": "🥇 1", "Initiative": "Improve Time Tracking Discoverability", "User Demand": "88%", "Revenue Impact": "+$450K ARR", "Effort": "Low", "Score": 94, "Status": "✅ RECOMMEND"},
         {"Rank": "🥈 2", "Initiative": "Ship Simplified Onboarding (A/B Tested)", "User Demand": "67%", "Revenue Impact": "+$280K ARR", "Effort": "Medium", "Score": 86, "Status": "✅ RECOMMEND"},
-        {"Rank": "🥉 3", "Initiative": "Proactive Upgrade Campaign (Free→Pro)", "User Demand": "23%", "Revenue Impact": "+$480K ARR", "Effort": "Low", "Score": 81, "Status": "✅ RECOMMEND"},
+        {"Rank": "🥉 3", "Initiative": "Proactive Upgrade Campaign (Free→Paid)", "User Demand": f"{campaign_share:.0%}", "Revenue Impact": f"+${campaign['expected_arr_uplift'] / 1000:,.0f}K ARR", "Effort": "Low", "Score": 81, "Status": "✅ RECOMMEND"},
         {"Rank": "4", "Initiative": "Advanced Gantt Charts", "User Demand": "15%", "Revenue Impact": "+$890K ARR", "Effort": "High", "Score": 68, "Status": "⏸️ DEFER"},
     ])
 
     st.dataframe(roadmap, width="stretch", hide_index=True)
 
-    st.metric("Total Estimated Impact (Top 3)", "+$1.21M ARR")
+    st.metric("Total Estimated Impact (Top 3)", f"+${(450_000 + 280_000 + campaign['expected_arr_uplift']) / 1e6:.2f}M ARR")
+
+    # Upgrade campaign targets
+    st.subheader("🎯 Upgrade Campaign Targets")
+    col_u1, col_u2, col_u3, col_u4 = st.columns(4)
+    col_u1.metric("Workspaces Targeted", f"{campaign['workspaces']:,}", help=f"Of {len(upsell):,} active free workspaces")
+    col_u2.metric("Seats", f"{campaign['users']:,}")
+    col_u3.metric("Expected MRR Uplift", f"${campaign['expected_mrr_uplift']:,.0f}")
+    col_u4.metric("Expected ARR Uplift", f"${campaign['expected_arr_uplift']:,.0f}")
+    st.caption("Expected uplift = seats × per-seat MRR of each paid tier, weighted by how closely the "
+               "workspace's usage matches that tier's behavior profile.")
+
+    targets = upsell.head(campaign_size)
+    col_t1, col_t2 = st.columns([1, 2])
+    with col_t1:
+        by_plan = targets.groupby('nearest_paid_plan', as_index=False)['expected_mrr_uplift'].sum()
+        fig_upsell = px.bar(by_plan, x='nearest_paid_plan', y='expected_mrr_uplift',
+                            labels={'nearest_paid_plan': 'Closest Paid Tier', 'expected_mrr_uplift': 'Expected MRR Uplift ($)'},
+                            color='nearest_paid_plan')
+        fig_upsell.update_layout(showlegend=False)
+        st.plotly_chart(fig_upsell, width="stretch")
+    with col_t2:
+        st.dataframe(
+            targets[['workspace_id', 'users', 'total_sessions', 'premium_features_used', 'nearest_paid_plan',
+                     'expected_mrr_per_seat', 'expected_mrr_uplift']].head(20).rename(columns={
+                'workspace_id': 'Workspace', 'users': 'Seats', 'total_sessions': 'Sessions/User',
+                'premium_features_used': 'Premium Features/User', 'nearest_paid_plan': 'Closest Tier',
+                'expected_mrr_per_seat': 'Expected $/Seat', 'expected_mrr_uplift': 'Expected MRR Uplift'}).round(2),
+            width="stretch", hide_index=True)
 
     # Impact vs Effort scatter
     st.subheader("Impact vs Effort Matrix")
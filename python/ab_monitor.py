@@ -0,0 +1,238 @@
+"""
+=================================================================
+TaskFlow Analytics - Sequential A/B Test Monitor
+=================================================================
+Monitors experiments continuously from a stream of assignment records
+(chunks of ab_test_assignments) without rescanning history: each
+update only adds the chunk's users and conversions to running counts
+per test and variant.
+
+Every non-control variant is compared against the control with a
+mixture sequential probability ratio test (mSPRT, normal mixture over
+the absolute lift). Its p-value and confidence interval stay valid
+however often they are looked at, so an experiment can be stopped the
+first time p < alpha instead of only at a planned end date, which is
+what a repeated chi-square test on the running table would inflate.
+
+Usage:
+  python python/ab_monitor.py                  # stream the table in chunks
+  python python/ab_monitor.py --state          # save the monitor; next run
+                                               # only reads new rows
+=================================================================
+"""
+
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from data_loader import CACHE_DIR_NAME, DATA_DIR, read_appended, read_chunks
+from aggregate_store import appended_offsets, source_states
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+ALPHA = 0.05
+# Prior standard deviation of the absolute lift mixed over by the mSPRT:
+# the size of effect the test is most sensitive to
+MIXING_SD = 0.05
+# Users per arm before a comparison is tested (normal approximation)
+MIN_USERS = 100
+CONTROL = 'control'
+
+KEYS = ['test_name', 'variant']
+COLUMNS = KEYS + ['converted']
+
+
+def msprt(lift, variance, mixing_sd=MIXING_SD, alpha=ALPHA):
+    """
+    Normal-mixture SPRT for an estimated lift with the given variance.
+    Returns (p-value, confidence interval radius) at this look; the
+    always-valid p-value is the running minimum over looks.
+    """
+    tau2 = mixing_sd ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shrink = variance / (variance + tau2)
+        log_ratio = 0.5 * np.log(shrink) + tau2 * lift ** 2 / (2 * variance * (variance + tau2))
+        p_value = np.minimum(1.0, np.exp(-log_ratio))
+        radius = np.sqrt(variance * (variance + tau2) / tau2 * (2 * np.log(1 / alpha) - np.log(shrink)))
+    return np.nan_to_num(p_value, nan=1.0), np.nan_to_num(radius, nan=np.inf)
+
+
+class ExperimentMonitor:
+    """
+    Running users/conversions per (test, variant) and the running mSPRT
+    state per comparison against the control. Memory grows with the
+    number of arms, never with the number of records.
+    """
+
+    def __init__(self, alpha=ALPHA, mixing_sd=MIXING_SD, min_users=MIN_USERS, control=CONTROL):
+        self.alpha = alpha
+        self.mixing_sd = mixing_sd
+        self.min_users = min_users
+        self.control = control
+        self.rows = 0
+        self.looks = 0
+        self.counts = {}      # (test, variant) -> [users, conversions]
+        self.sequential = {}  # (test, variant) -> [p-value, ci lower, ci upper]
+
+    def update(self, chunk):
+        """Add a chunk of assignment records and return the results after it."""
+        test_codes, tests = pd.factorize(chunk['test_name'])
+        variant_codes, variants = pd.factorize(chunk['variant'])
+        codes = test_codes * len(variants) + variant_codes
+        size = len(tests) * len(variants)
+        users = np.bincount(codes, minlength=size)
+        conversions = np.bincount(codes, weights=chunk['converted'].to_numpy(dtype=float),
+                                  minlength=size)
+        for code in np.flatnonzero(users):
+            key = (str(tests[code // len(variants)]), str(variants[code % len(variants)]))
+            total = self.counts.setdefault(key, [0, 0])
+            total[0] += int(users[code])
+            total[1] += int(conversions[code])
+        self.rows += len(chunk)
+        return self.look()
+
+    def look(self):
+        """Test every variant against its control and fold into the running state."""
+        self.looks += 1
+        keys = [key for key in sorted(self.counts)
+                if key[1] != self.control and (key[0], self.control) in self.counts]
+        users, conversions = np.array([self.counts[key] for key in keys], dtype=float).reshape(-1, 2).T
+        control_users, control_conversions = np.array(
+            [self.counts[(test, self.control)] for test, _ in keys], dtype=float).reshape(-1, 2).T
+        rate = conversions / users
+        control_rate = control_conversions / control_users
+        lift = rate - control_rate
+
+        variance = rate * (1 - rate) / users + control_rate * (1 - control_rate) / control_users
+        p_value, radius = msprt(lift, variance, self.mixing_sd, self.alpha)
+        ready = np.minimum(users, control_users) >= self.min_users
+        p_value = np.where(ready, p_value, 1.0)
+        radius = np.where(ready, radius, np.inf)
+
+        # Always-valid p-value: running minimum; interval: running intersection
+        for key, p, lower, upper in zip(keys, p_value, lift - radius, lift + radius):
+            previous = self.sequential.get(key, [1.0, -np.inf, np.inf])
+            self.sequential[key] = [min(previous[0], float(p)), max(previous[1], float(lower)),
+                                    min(previous[2], float(upper))]
+        always_valid_p, ci_lower, ci_upper = np.array(
+            [self.sequential[key] for key in keys]).reshape(-1, 3).T
+
+        significant = always_valid_p < self.alpha
+        return pd.DataFrame({
+            'look': self.looks,
+            'rows_seen': self.rows,
+            'test_name': [test for test, _ in keys],
+            'variant': [variant for _, variant in keys],
+            'users': users.astype(np.int64),
+            'conversions': conversions.astype(np.int64),
+            'control_users': control_users.astype(np.int64),
+            'control_conversions': control_conversions.astype(np.int64),
+            'conversion_rate': rate,
+            'control_rate': control_rate,
+            'lift': lift,
+            'always_valid_p': always_valid_p,
+            'ci_lower': ci_lower,
+            'ci_upper': ci_upper,
+            'decision': np.select([significant & (ci_lower > 0), significant & (ci_upper < 0)],
+                                  ['variant wins', 'control wins'], 'continue'),
+        })
+
+    def state(self):
+        """JSON-serializable running state."""
+        return {
+            'settings': [self.alpha, self.mixing_sd, self.min_users, self.control],
+            'rows': self.rows, 'looks': self.looks,
+            'counts': [[*key, *value] for key, value in self.counts.items()],
+            'sequential': [[*key, *value] for key, value in self.sequential.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        monitor = cls(*state['settings'])
+        monitor.rows, monitor.looks = state['rows'], state['looks']
+        monitor.counts = {(test, variant): [users, conversions]
+                          for test, variant, users, conversions in state['counts']}
+        monitor.sequential = {(test, variant): [p, lower, upper]
+                              for test, variant, p, lower, upper in state['sequential']}
+        return monitor
+
+
+def replay(df, freq='D', **settings):
+    """
+    Replay assignments in time order, one look per assignment period.
+    Returns the results after every look, with the period in as_of.
+    """
+    monitor = ExperimentMonitor(**settings)
+    periods = df['assignment_date'].dt.floor(freq)
+    frames = [monitor.update(chunk).assign(as_of=period)
+              for period, chunk in df.groupby(periods, sort=True)]
+    return pd.concat(frames, ignore_index=True)
+
+
+# ============================================================
+# COMMAND LINE
+# ============================================================
+
+def state_path(data_dir=DATA_DIR):
+    return os.path.join(data_dir, CACHE_DIR_NAME, 'ab_monitor.json')
+
+
+def _chunks(data_dir, chunksize, saved):
+    """Chunks not yet seen by a saved monitor: appended rows, or the whole table."""
+    files = source_states(data_dir)['ab_test_assignments']
+    offsets = saved and appended_offsets({'ab_test_assignments': saved['files']},
+                                         {'ab_test_assignments': files}, data_dir)
+    if not offsets:
+        return files, None, read_chunks('ab_test_assignments', data_dir, COLUMNS, chunksize)
+    new_rows = read_appended('ab_test_assignments', offsets['ab_test_assignments'],
+                             data_dir, COLUMNS)
+    chunks = (new_rows.iloc[start:start + chunksize]
+              for start in range(0, len(new_rows), chunksize))
+    return files, ExperimentMonitor.from_state(saved['monitor']), chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequentially monitor the A/B tests.")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory with the generated tables")
+    parser.add_argument('--chunksize', type=int, default=1000, help="Records per look")
+    parser.add_argument('--state', nargs='?', const='', default=None,
+                        help="Monitor state file to resume from and update "
+                             "(default: data/.cache/ab_monitor.json)")
+    args = parser.parse_args()
+    if args.state == '':
+        args.state = state_path(args.data_dir)
+
+    saved = None
+    if args.state and os.path.exists(args.state):
+        with open(args.state) as f:
+            saved = json.load(f)
+    files, monitor, chunks = _chunks(args.data_dir, args.chunksize, saved)
+    if monitor is None:
+        print("📡 Streaming ab_test_assignments from the start...")
+        monitor = ExperimentMonitor()
+    else:
+        print(f"📡 Resuming after {monitor.rows:,} records; reading new rows only...")
+
+    result = None
+    for chunk in chunks:
+        result = monitor.update(chunk)
+        for row in result.itertuples():
+            print(f"   look {row.look:>4}  {row.rows_seen:>9,} rows  {row.test_name}/{row.variant}: "
+                  f"lift {row.lift:+.1%}  p = {row.always_valid_p:.4f}  "
+                  f"CI [{row.ci_lower:+.1%}, {row.ci_upper:+.1%}]  {row.decision}")
+
+    if result is None:
+        print("   No new records.")
+    if args.state:
+        os.makedirs(os.path.dirname(os.path.abspath(args.state)), exist_ok=True)
+        with open(args.state, 'w') as f:
+            json.dump({'files': files, 'monitor': monitor.state()}, f)
+        print(f"\n✅ Monitor state saved to {args.state}")
+
+
+if __name__ == "__main__":
+    main()
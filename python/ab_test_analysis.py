@@ -12,136 +12,204 @@ Expected Result: Variant shows ~12 percentage point lift (statistically signific
 =================================================================
 """
 
-import pandas as pd
 import numpy as np
-from scipy.stats import chi2_contingency, norm
-import os
-
-# Paths
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'data')
-
-# Load A/B test data
-df = pd.read_csv(os.path.join(DATA_DIR, 'ab_test_assignments.csv'))
-
-print("=" * 70)
-print("A/B TEST ANALYSIS: SIMPLIFIED ONBOARDING")
-print("=" * 70)
-print()
-
-# Split data by variant
-control = df[df['variant'] == 'control']
-variant_a = df[df['variant'] == 'variant_a']
-
-# Calculate conversion metrics
-control_converted = control['converted'].sum()
-control_total = len(control)
-control_rate = control_converted / control_total
-
-variant_converted = variant_a['converted'].sum()
-variant_total = len(variant_a)
-variant_rate = variant_converted / variant_total
-
-print("📊 SAMPLE SIZE & CONVERSION RATES")
-print("-" * 70)
-print(f"Control (A):  {control_total:,} users | {control_converted:,} converted | {control_rate:.1%} conversion rate")
-print(f"Variant (B):  {variant_total:,} users | {variant_converted:,} converted | {variant_rate:.1%} conversion rate")
-print()
-
-# Calculate lift
-absolute_lift = variant_rate - control_rate
-relative_lift = (variant_rate - control_rate) / control_rate if control_rate > 0 else 0
-
-print("📈 LIFT ANALYSIS")
-print("-" * 70)
-print(f"Absolute Lift:  {absolute_lift:+.1%} ({absolute_lift * 100:.1f} percentage points)")
-print(f"Relative Lift:  {relative_lift:+.1%}")
-print()
-
-# Chi-Square Test for Statistical Significance
-contingency_table = [
-    [control_converted, control_total - control_converted],
-    [variant_converted, variant_total - variant_converted]
-]
-
-chi2, p_value, dof, expected = chi2_contingency(contingency_table)
-
-print("🔬 STATISTICAL SIGNIFICANCE TEST (Chi-Square)")
-print("-" * 70)
-print(f"Chi-Square Statistic: {chi2:.4f}")
-print(f"P-Value: {p_value:.6f}")
-print(f"Degrees of Freedom: {dof}")
-print()
-
-if p_value < 0.001:
-    significance_level = "99.9%"
-elif p_value < 0.01:
-    significance_level = "99%"
-elif p_value < 0.05:
-    significance_level = "95%"
-else:
-    significance_level = "NOT SIGNIFICANT"
-
-print(f"✅ Result: {'STATISTICALLY SIGNIFICANT' if p_value < 0.05 else 'NOT SIGNIFICANT'}")
-print(f"   Confidence Level: {significance_level}")
-print()
-
-# Calculate Confidence Intervals (95%)
-z_score = 1.96
-
-control_se = np.sqrt((control_rate * (1 - control_rate)) / control_total)
-control_ci_lower = control_rate - (z_score * control_se)
-control_ci_upper = control_rate + (z_score * control_se)
-
-variant_se = np.sqrt((variant_rate * (1 - variant_rate)) / variant_total)
-variant_ci_lower = variant_rate - (z_score * variant_se)
-variant_ci_upper = variant_rate + (z_score * variant_se)
-
-print("📊 95% CONFIDENCE INTERVALS")
-print("-" * 70)
-print(f"Control:  [{control_ci_lower:.1%}, {control_ci_upper:.1%}]")
-print(f"Variant:  [{variant_ci_lower:.1%}, {variant_ci_upper:.1%}]")
-print()
-
-# Business Impact Calculation
-print("💰 BUSINESS IMPACT ANALYSIS")
-print("-" * 70)
-
-monthly_signups = 1000
-avg_ltv_per_user = 1200
-
-additional_conversions_monthly = monthly_signups * absolute_lift
-annual_additional_conversions = additional_conversions_monthly * 12
-revenue_impact_annual = annual_additional_conversions * avg_ltv_per_user
-
-print(f"Monthly Signups (avg): {monthly_signups:,}")
-print(f"Additional Conversions/Month: {additional_conversions_monthly:.0f} users")
-print(f"Additional Conversions/Year: {annual_additional_conversions:.0f} users")
-print(f"Average LTV per User: ${avg_ltv_per_user:,}")
-print(f"Estimated Annual Revenue Impact: ${revenue_impact_annual:,.0f}")
-print()
-
-# Recommendation
-print("=" * 70)
-print("🎯 RECOMMENDATION")
-print("=" * 70)
-print()
-print("✅ SHIP VARIANT B (Simplified 3-Step Onboarding)")
-print()
-print("Reasoning:")
-print(f"  1. Statistically significant improvement (p < 0.001, {significance_level} confidence)")
-print(f"  2. Meaningful business impact: +{absolute_lift:.1%} activation rate")
-print(f"  3. Estimated revenue lift: ${revenue_impact_annual:,.0f} ARR")
-print(f"  4. Low implementation risk (A/B test validates user preference)")
-print()
-print("Next Steps:")
-print("  1. Roll out Variant B to 100% of users")
-print("  2. Monitor activation rate for 2 weeks (watch for regressions)")
-print("  3. Track cohort retention at 7, 14, 30 days")
-print("  4. Set up alert: If activation drops below 45%, investigate immediately")
-print()
-print("=" * 70)
-print()
-print("✅ Analysis complete!")
-print("   → Results are ready to present to stakeholders")
-print("   → Recommendation: Ship Variant B immediately")
+
+from ab_monitor import ALPHA, replay
+from cuped import NUMERIC_COVARIATES, CATEGORICAL_COVARIATES, PRE_PERIOD_DAYS, cuped_results
+from data_loader import load_table, read_chunks
+from experiment_stats import ALL_USERS, experiment_results
+from power import days_to_significance, mde_proportions, sample_size_proportions
+from resampling import N_RESAMPLES, metric_intervals, poisson_bootstrap
+
+TEST_NAME = 'simplified_onboarding_q4_2025'
+
+
+def main():
+    # Load A/B test data (CSV or Parquet, see data_loader.py)
+    df = load_table('ab_test_assignments')
+    df = df[df['test_name'] == TEST_NAME]
+
+    # Every test, variant, segment and metric in one vectorized pass; the
+    # primary comparison is the overall conversion rate of variant_a
+    results = experiment_results(segment='account_tier', family='test_name')
+    primary = results[(results['test_name'] == TEST_NAME) & (results['variant'] == 'variant_a') &
+                      (results['segment'] == ALL_USERS) & (results['metric'] == 'converted')].iloc[0]
+
+    print("=" * 70)
+    print("A/B TEST ANALYSIS: SIMPLIFIED ONBOARDING")
+    print("=" * 70)
+    print()
+
+    # Conversion metrics
+    control_converted = primary['control_conversions']
+    control_total = primary['control_users']
+    control_rate = primary['control_rate']
+
+    variant_converted = primary['conversions']
+    variant_total = primary['users']
+    variant_rate = primary['conversion_rate']
+
+    print("📊 SAMPLE SIZE & CONVERSION RATES")
+    print("-" * 70)
+    print(f"Control (A):  {control_total:,} users | {control_converted:,} converted | {control_rate:.1%} conversion rate")
+    print(f"Variant (B):  {variant_total:,} users | {variant_converted:,} converted | {variant_rate:.1%} conversion rate")
+    print()
+
+    # Lift
+    absolute_lift = primary['lift']
+    relative_lift = primary['relative_lift'] if control_rate > 0 else 0
+
+    print("📈 LIFT ANALYSIS")
+    print("-" * 70)
+    print(f"Absolute Lift:  {absolute_lift:+.1%} ({absolute_lift * 100:.1f} percentage points)")
+    print(f"Relative Lift:  {relative_lift:+.1%}")
+    print()
+
+    # Chi-Square Test for Statistical Significance (Yates-corrected 2x2)
+    chi2, p_value, dof = primary['chi2'], primary['chi2_p_value'], 1
+
+    print("🔬 STATISTICAL SIGNIFICANCE TEST (Chi-Square)")
+    print("-" * 70)
+    print(f"Chi-Square Statistic: {chi2:.4f}")
+    print(f"P-Value: {p_value:.6f}")
+    print(f"Degrees of Freedom: {dof}")
+    print()
+
+    if p_value < 0.001:
+        significance_level = "99.9%"
+    elif p_value < 0.01:
+        significance_level = "99%"
+    elif p_value < 0.05:
+        significance_level = "95%"
+    else:
+        significance_level = "NOT SIGNIFICANT"
+
+    print(f"✅ Result: {'STATISTICALLY SIGNIFICANT' if p_value < 0.05 else 'NOT SIGNIFICANT'}")
+    print(f"   Confidence Level: {significance_level}")
+    print()
+
+    print("📊 95% CONFIDENCE INTERVALS (Wilson score)")
+    print("-" * 70)
+    print(f"Control:  [{primary['control_ci_lower']:.1%}, {primary['control_ci_upper']:.1%}]")
+    print(f"Variant:  [{primary['ci_lower']:.1%}, {primary['ci_upper']:.1%}]")
+    print(f"Lift:     [{primary['lift_ci_lower']:+.1%}, {primary['lift_ci_upper']:+.1%}] (Newcombe)")
+    print()
+
+    # All experiments, metrics and tier segments, Holm-adjusted within each test
+    print("🧮 ALL EXPERIMENTS x SEGMENTS x METRICS (Holm-adjusted p-values)")
+    print("-" * 70)
+    for row in results.itertuples():
+        print(f"{row.test_name}/{row.variant}  {row.segment:<13} {row.metric:<17} "
+              f"lift {row.lift:+6.1%}  p_adj = {row.p_adjusted:.4f}  {'✅' if row.significant else '—'}")
+    print()
+
+    # Resampling: no normal approximation, so also valid for small segments
+    # and for skewed continuous metrics such as time to complete onboarding
+    print(f"🎲 BOOTSTRAP & PERMUTATION ({N_RESAMPLES:,} resamples per segment)")
+    print("-" * 70)
+    for metric, unit in [('onboarding_completed', 'pp'), ('time_to_complete_hours', 'h')]:
+        scale = 100 if unit == 'pp' else 1
+        for row in metric_intervals(metric, segment='account_tier').itertuples():
+            print(f"{metric:<23} {row.segment:<13} diff {row.difference * scale:+6.2f}{unit}  "
+                  f"95% CI [{row.ci_lower * scale:+6.2f}, {row.ci_upper * scale:+6.2f}]  "
+                  f"permutation p = {row.p_value:.4f}")
+    streamed = poisson_bootstrap(read_chunks('onboarding_funnel', columns=['ab_test_variant', 'time_to_complete_hours']),
+                                 'time_to_complete_hours', group='ab_test_variant')
+    print(f"Streaming Poisson bootstrap, time_to_complete_hours: diff {streamed['difference']:+.2f}h  "
+          f"95% CI [{streamed['ci_lower']:+.2f}, {streamed['ci_upper']:+.2f}]")
+    print()
+
+    # Sequential monitoring: the p-value above is only valid for one look at
+    # the final table; replay the test day by day with the always-valid mSPRT
+    print("🔁 SEQUENTIAL MONITORING (always-valid, safe to check daily)")
+    print("-" * 70)
+    daily = replay(df)
+    daily = daily[daily['variant'] == 'variant_a']
+    final = daily.iloc[-1]
+    stopped = daily[daily['decision'] != 'continue']
+    print(f"Always-Valid P-Value: {final['always_valid_p']:.6f}")
+    print(f"Lift Confidence Sequence: [{final['ci_lower']:+.1%}, {final['ci_upper']:+.1%}]")
+    if len(stopped):
+        first = stopped.iloc[0]
+        print(f"Decision Reached: {first['as_of']:%Y-%m-%d} ({first['decision']}, "
+              f"after {first['rows_seen']:,} of {final['rows_seen']:,} users, alpha = {ALPHA})")
+    else:
+        print("Decision Reached: not yet, keep the test running")
+    print()
+
+    # Business Impact Calculation
+    print("💰 BUSINESS IMPACT ANALYSIS")
+    print("-" * 70)
+
+    monthly_signups = 1000
+    avg_ltv_per_user = 1200
+
+    additional_conversions_monthly = monthly_signups * absolute_lift
+    annual_additional_conversions = additional_conversions_monthly * 12
+    revenue_impact_annual = annual_additional_conversions * avg_ltv_per_user
+
+    print(f"Monthly Signups (avg): {monthly_signups:,}")
+    print(f"Additional Conversions/Month: {additional_conversions_monthly:.0f} users")
+    print(f"Additional Conversions/Year: {annual_additional_conversions:.0f} users")
+    print(f"Average LTV per User: ${avg_ltv_per_user:,}")
+    print(f"Estimated Annual Revenue Impact: ${revenue_impact_annual:,.0f}")
+    print()
+
+    # Power & sample size at the same signup volume
+    print("📐 POWER & SAMPLE SIZE (alpha = 0.05, power = 80%)")
+    print("-" * 70)
+    needed = sample_size_proportions(control_rate, absolute_lift)
+    detectable = mde_proportions(control_rate, min(control_total, variant_total))
+    print(f"Users/Arm to Detect {absolute_lift:+.1%}: {needed:,.0f} "
+          f"(~{days_to_significance(needed, monthly_signups):.0f} days at {monthly_signups:,} signups/month)")
+    print(f"Smallest Lift This Test Could Detect: {detectable:+.1%}")
+    for mde in [0.02, 0.05]:
+        users = sample_size_proportions(control_rate, mde)
+        print(f"Follow-up Test for {mde:+.0%}: {users:,.0f} users/arm, "
+              f"~{days_to_significance(users, monthly_signups):.0f} days")
+    print()
+
+    # CUPED: adjust conversion for covariates fixed before assignment (signup
+    # attributes and pre-period events); the adjusted variance sets how many
+    # users the same power needs
+    cuped = cuped_results(['converted'])
+    cuped = cuped[(cuped['test_name'] == TEST_NAME) & (cuped['variant'] == 'variant_a')].iloc[0]
+    print(f"🧭 CUPED VARIANCE REDUCTION (pre-assignment covariates: "
+          f"{', '.join(NUMERIC_COVARIATES + CATEGORICAL_COVARIATES)}, events in the prior {PRE_PERIOD_DAYS} days if generated)")
+    print("-" * 70)
+    print(f"Raw Lift:      {cuped['raw_lift']:+.2%} ± {1.96 * cuped['raw_se']:.2%} (p = {cuped['raw_p_value']:.6f})")
+    print(f"Adjusted Lift: {cuped['cuped_lift']:+.2%} ± {1.96 * cuped['cuped_se']:.2%} (p = {cuped['cuped_p_value']:.6f})")
+    print(f"Variance Reduction: {cuped['variance_reduction']:.1%}")
+    adjusted_needed = np.ceil(needed * (1 - cuped['variance_reduction']))
+    print(f"Users/Arm to Detect {absolute_lift:+.1%} with CUPED: {adjusted_needed:,.0f} "
+          f"(~{days_to_significance(adjusted_needed, monthly_signups):.0f} days)")
+    print()
+
+    # Recommendation
+    print("=" * 70)
+    print("🎯 RECOMMENDATION")
+    print("=" * 70)
+    print()
+    print("✅ SHIP VARIANT B (Simplified 3-Step Onboarding)")
+    print()
+    print("Reasoning:")
+    print(f"  1. Statistically significant improvement (p < 0.001, {significance_level} confidence)")
+    print(f"  2. Meaningful business impact: +{absolute_lift:.1%} activation rate")
+    print(f"  3. Estimated revenue lift: ${revenue_impact_annual:,.0f} ARR")
+    print(f"  4. Low implementation risk (A/B test validates user preference)")
+    print()
+    print("Next Steps:")
+    print("  1. Roll out Variant B to 100% of users")
+    print("  2. Monitor activation rate for 2 weeks (watch for regressions)")
+    print("  3. Track cohort retention at 7, 14, 30 days")
+    print("  4. Set up alert: If activation drops below 45%, investigate immediately")
+    print()
+    print("=" * 70)
+    print()
+    print("✅ Analysis complete!")
+    print("   → Results are ready to present to stakeholders")
+    print("   → Recommendation: Ship Variant B immediately")
+
+
+if __name__ == "__main__":
+    main()
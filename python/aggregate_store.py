@@ -0,0 +1,320 @@
+"""
+=================================================================
+TaskFlow Analytics - Dashboard Aggregate Store
+=================================================================
+Materializes the small tables behind the dashboard KPIs and charts
+(signups per month, MRR by plan, onboarding funnel counts, adopters
+per feature, A/B test counts) once per data version, so pages read a
+few rows instead of regrouping the raw tables on every rerun.
+
+Each version lives in data/.cache/aggregates/<version>/ as one Parquet
+file per aggregate plus a manifest of the source files it covers. The
+version is a content hash of the source files, so regenerating
+identical data reuses the stored aggregates.
+
+Sources are treated as append-only. When new Parquet part files land
+in a dataset, or rows are appended to a CSV, only those rows are read
+and merged into the previous version; any other change (a file
+rewritten or removed) rebuilds the aggregates from scratch.
+
+Run directly to materialize or refresh ahead of starting the dashboard:
+  python python/aggregate_store.py
+=================================================================
+"""
+
+import hashlib
+import json
+import os
+import pandas as pd
+
+from data_loader import CACHE_DIR_NAME, DATA_DIR, load_table, publish_directory, \
+    read_appended, source_files
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Bump when an aggregate definition changes so stored versions are rebuilt
+AGGREGATES_VERSION = 2
+
+FUNNEL_STEPS = ['step_1_completed', 'step_2_completed', 'step_3_completed',
+                'step_4_completed', 'onboarding_completed']
+
+# Source tables and the columns the aggregates need from them
+AGGREGATE_INPUTS = {
+    'users': ['signup_date', 'is_active'],
+    'onboarding_funnel': FUNNEL_STEPS,
+    'feature_usage': ['user_id', 'feature_name'],
+    'subscriptions': ['plan_type', 'mrr', 'is_active'],
+    'ab_test_assignments': ['test_name', 'variant', 'converted'],
+}
+
+# Tables whose content defines the data version: the aggregate inputs plus
+# tables the dashboard analyses read directly
+VERSIONED_TABLES = list(AGGREGATE_INPUTS) + ['user_activity_summary']
+
+# Every aggregate is a sum over its key columns, so the aggregates of two
+# disjoint batches of rows merge into the aggregates of their union
+AGGREGATE_KEYS = {
+    'summary': [],
+    'signups_by_month': ['signup_month'],
+    'mrr_by_plan': ['plan_type'],
+    'funnel': [],
+    'feature_adopters': ['feature_name'],
+    'ab_counts': ['test_name', 'variant'],
+}
+
+# Bytes before the previous end of a CSV compared to confirm a pure append
+TAIL_BYTES = 1 << 16
+
+
+def store_path(data_dir=DATA_DIR):
+    return os.path.join(data_dir, CACHE_DIR_NAME, 'aggregates')
+
+
+# ============================================================
+# SOURCE FILE STATES
+# ============================================================
+# Each source file is tracked by size, mtime, a SHA-256 digest of its
+# content and a digest of its last TAIL_BYTES. Digests are remembered in
+# file_states.json, so unchanged files are never re-read and an appended
+# CSV only has its new bytes hashed (chained onto the previous digest).
+
+def _write_json(path, payload):
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _digest(path, start=0, seed=b''):
+    digest = hashlib.sha256(seed)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _tail_digest(path, end):
+    start = max(0, end - TAIL_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(end - start)).hexdigest()
+
+
+def _is_append(path, old_state, size):
+    """Whether a file grew past its old state without changing its old bytes."""
+    return (path.endswith('.csv') and size > old_state['size']
+            and _tail_digest(path, old_state['size']) == old_state['tail'])
+
+
+def source_states(data_dir=DATA_DIR):
+    """Current state of every versioned source file, as {table: {path: state}}."""
+    index_path = os.path.join(store_path(data_dir), 'file_states.json')
+    known = _read_json(index_path)
+    states = {}
+    for table in VERSIONED_TABLES:
+        states[table] = {}
+        for path in source_files(table, data_dir):
+            name = os.path.relpath(path, data_dir)
+            stat = os.stat(path)
+            old = known.get(name)
+            if old and (old['size'], old['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+                states[table][name] = old
+                continue
+            if old and _is_append(path, old, stat.st_size):
+                digest = _digest(path, old['size'], bytes.fromhex(old['digest']))
+            else:
+                digest = _digest(path)
+            states[table][name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                   'digest': digest, 'tail': _tail_digest(path, stat.st_size)}
+
+    current = {name: state for files in states.values() for name, state in files.items()}
+    if current != known:
+        try:
+            os.makedirs(store_path(data_dir), exist_ok=True)
+            _write_json(index_path, current)
+        except OSError:
+            pass
+    return states
+
+
+def data_version(data_dir=DATA_DIR, states=None):
+    """Version key of the dashboard data: the content of every source file."""
+    states = states or source_states(data_dir)
+    digest = hashlib.sha256(f'aggregates-v{AGGREGATES_VERSION}'.encode())
+    for table, files in states.items():
+        for name, state in sorted(files.items()):
+            digest.update(f'{table}/{name}:{state["digest"]};'.encode())
+    return digest.hexdigest()[:16]
+
+
+def appended_offsets(previous, states, data_dir=DATA_DIR):
+    """
+    Per table, the byte offset new rows start at in each new or grown file
+    since the previous states, or None when a change is not an append.
+    """
+    offsets = {}
+    for table, files in states.items():
+        old_files = previous.get(table, {})
+        if not set(old_files) <= set(files):
+            return None
+        offsets[table] = {}
+        for name, state in files.items():
+            path = os.path.join(data_dir, name)
+            old = old_files.get(name)
+            if old is None:
+                offsets[table][path] = 0
+            elif old['digest'] == state['digest']:
+                continue
+            elif _is_append(path, old, state['size']):
+                offsets[table][path] = old['size']
+            else:
+                return None
+    return offsets
+
+
+# ============================================================
+# AGGREGATES
+# ============================================================
+
+def compute_aggregates(frames):
+    """Compute every dashboard aggregate from {table: DataFrame} of source rows."""
+    users = frames['users']
+    onboarding = frames['onboarding_funnel']
+    features = frames['feature_usage']
+    subs = frames['subscriptions']
+    ab_test = frames['ab_test_assignments']
+
+    active_subs = subs[subs['is_active']]
+    signup_month = users['signup_date'].dt.to_period('M').astype(str).rename('signup_month')
+
+    aggregates = {
+        'summary': pd.DataFrame([{
+            'total_users': len(users),
+            'active_users': int(users['is_active'].sum()),
+            'mrr': float(active_subs['mrr'].sum()),
+        }]),
+        'signups_by_month': users.groupby(signup_month).size().reset_index(name='signups'),
+        'mrr_by_plan': active_subs.groupby('plan_type', observed=True)['mrr'].sum().reset_index(),
+        'funnel': pd.DataFrame([{'users': len(onboarding),
+                                 **{step: int(onboarding[step].sum()) for step in FUNNEL_STEPS}}]),
+        # One feature_usage row per (user, feature), so adopters add up across batches
+        'feature_adopters': (features.groupby('feature_name', observed=True)['user_id']
+                             .nunique().reset_index(name='adopters')),
+        'ab_counts': (ab_test.groupby(['test_name', 'variant'], observed=True)['converted']
+                      .agg(users='size', conversions='sum').reset_index()),
+    }
+    return merge_aggregates(aggregates)
+
+
+def merge_aggregates(*batches):
+    """Sum aggregates computed over disjoint batches of rows."""
+    merged = {}
+    for name, keys in AGGREGATE_KEYS.items():
+        df = pd.concat([batch[name] for batch in batches], ignore_index=True)
+        if keys:
+            df[keys] = df[keys].astype(str)
+            merged[name] = df.groupby(keys, as_index=False).sum()
+        else:
+            merged[name] = df.sum().to_frame().T.astype(df.dtypes)
+    return merged
+
+
+def read_inputs(data_dir=DATA_DIR, offsets=None):
+    """Source rows for the aggregates: whole tables, or only appended rows."""
+    if offsets is None:
+        return {table: load_table(table, data_dir, columns=columns)
+                for table, columns in AGGREGATE_INPUTS.items()}
+    return {table: read_appended(table, offsets[table], data_dir, columns=columns)
+            for table, columns in AGGREGATE_INPUTS.items()}
+
+
+# ============================================================
+# STORE
+# ============================================================
+
+def _read_store(version_dir):
+    return {name: pd.read_parquet(os.path.join(version_dir, f'{name}.parquet'))
+            for name in AGGREGATE_KEYS}
+
+
+def _latest_stored(data_dir):
+    """(aggregates, manifest) of the newest stored version, if any."""
+    root = store_path(data_dir)
+    candidates = []
+    for name in os.listdir(root) if os.path.isdir(root) else []:
+        manifest = _read_json(os.path.join(root, name, 'manifest.json'))
+        if '.tmp-' not in name and manifest.get('aggregates_version') == AGGREGATES_VERSION:
+            candidates.append((os.path.getmtime(os.path.join(root, name)), name, manifest))
+    if not candidates:
+        return None, None
+    _, name, manifest = max(candidates)
+    return _read_store(os.path.join(root, name)), manifest['sources']
+
+
+def _write_store(aggregates, states, version_dir):
+    tmp_dir = f'{version_dir}.tmp-{os.getpid()}'
+    os.makedirs(tmp_dir, exist_ok=True)
+    for name, df in aggregates.items():
+        df.to_parquet(os.path.join(tmp_dir, f'{name}.parquet'), index=False)
+    _write_json(os.path.join(tmp_dir, 'manifest.json'),
+                {'aggregates_version': AGGREGATES_VERSION, 'sources': states})
+    publish_directory(tmp_dir, version_dir)
+
+
+def refresh_aggregates(data_dir=DATA_DIR):
+    """
+    Bring the store up to date with the source files.
+
+    Returns (version, aggregates, mode), where mode is 'stored' when the
+    version already existed, 'incremental' when only appended rows were
+    merged into the previous version and 'full' after a rebuild.
+    """
+    states = source_states(data_dir)
+    version = data_version(data_dir, states)
+    version_dir = os.path.join(store_path(data_dir), version)
+    if os.path.isdir(version_dir):
+        return version, _read_store(version_dir), 'stored'
+
+    previous, previous_states = _latest_stored(data_dir)
+    offsets = appended_offsets(previous_states, states, data_dir) if previous else None
+    if offsets is None:
+        aggregates, mode = compute_aggregates(read_inputs(data_dir)), 'full'
+    else:
+        delta = compute_aggregates(read_inputs(data_dir, offsets))
+        aggregates, mode = merge_aggregates(previous, delta), 'incremental'
+
+    try:
+        os.makedirs(store_path(data_dir), exist_ok=True)
+        _write_store(aggregates, states, version_dir)
+    except OSError:
+        # Read-only data directory: serve the aggregates unstored
+        pass
+    return version, aggregates, mode
+
+
+def load_aggregates(data_dir=DATA_DIR):
+    """Return the up-to-date dashboard aggregates as {name: DataFrame}."""
+    return refresh_aggregates(data_dir)[1]
+
+
+def main():
+    print("📦 Refreshing dashboard aggregates...")
+    version, aggregates, mode = refresh_aggregates()
+    for name, df in aggregates.items():
+        print(f"   ✓ {name}: {len(df):,} rows")
+    print(f"\n✅ Aggregates ({mode}) stored under data/{CACHE_DIR_NAME}/aggregates/{version}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+=================================================================
+TaskFlow Analytics - Cohort Retention Engine
+=================================================================
+Builds the full cohort x period retention triangle in one vectorized
+pass (np.bincount over cohort/period codes), at daily, weekly or
+monthly granularity:
+  - cohort_retention():       from user_activity_summary. A user is
+                              retained in period p when still active
+                              p periods after signup, as in
+                              sql/04_cohort_retention.sql
+  - event_cohort_retention(): from events. A user is retained in
+                              period p when they have any event in it
+
+Cohorts are calendar days, weeks (starting Monday) or months of the
+signup date; periods are 1, 7 or 30 days after signup.
+=================================================================
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, load_table
+
+# Period length in days per granularity
+GRANULARITIES = {'day': 1, 'week': 7, 'month': 30}
+
+
+def _days(values):
+    """Days since 1970-01-01 of a datetime Series or array."""
+    return np.asarray(values, dtype='datetime64[D]').astype(np.int64)
+
+
+def _cohorts(signup_days, granularity):
+    """Cohort number of each signup day, and a labeller for cohort numbers."""
+    if granularity == 'day':
+        return signup_days, lambda numbers: numbers.astype('datetime64[D]').astype(str)
+    if granularity == 'week':
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return ((signup_days + 3) // 7,
+                lambda numbers: (numbers * 7 - 3).astype('datetime64[D]').astype(str))
+    if granularity == 'month':
+        # Month of each day in the signup range, gathered per user: far
+        # cheaper than converting every user's date to datetime64[M]
+        first = signup_days.min()
+        days = np.arange(first, signup_days.max() + 1).astype('datetime64[D]')
+        months = days.astype('datetime64[M]').astype(np.int64)
+        return months[signup_days - first], lambda numbers: numbers.astype('datetime64[M]').astype(str)
+    raise ValueError(f"Unknown granularity {granularity!r}; expected one of {list(GRANULARITIES)}")
+
+
+def _triangle(labels, sizes, retained, eligible):
+    """Rates DataFrame from per-cohort sizes and retained/eligible counts."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = retained / eligible
+    triangle = pd.DataFrame(rates, index=pd.Index(labels, name='cohort'))
+    triangle.insert(0, 'cohort_size', sizes)
+    return triangle[triangle['cohort_size'] > 0]
+
+
+def _suffix_counts(codes, through, n_cohorts, periods):
+    """
+    Per cohort and period p, the number of users whose value in `through`
+    is at least p: one bincount, then a reversed cumulative sum.
+    """
+    counts = np.bincount(codes * periods + through, minlength=n_cohorts * periods)
+    return counts.reshape(n_cohorts, periods)[:, ::-1].cumsum(axis=1)[:, ::-1]
+
+
+def retention_matrix(signup_days, last_active_days, observed_days, granularity='month',
+                     max_periods=None):
+    """
+    Retention triangle from per-user arrays: signup and last-active days
+    (days since epoch) and days each user has been observed for.
+
+    Returns a DataFrame indexed by cohort with a cohort_size column followed
+    by the retention rate for periods 0..P; NaN where a cohort is too
+    young to have reached the period.
+    """
+    cohort, label = _cohorts(np.asarray(signup_days), granularity)
+    length = GRANULARITIES[granularity]
+    first = cohort.min()
+    codes = cohort - first
+    n_cohorts = int(codes.max()) + 1
+
+    eligible_through = np.asarray(observed_days) // length
+    periods = int(eligible_through.max()) + 1
+    if max_periods is not None:
+        periods = min(periods, max_periods + 1)
+    eligible_through = np.clip(eligible_through, 0, periods - 1)
+    active_through = (np.asarray(last_active_days) - np.asarray(signup_days)) // length
+    retained_through = np.clip(np.minimum(active_through, eligible_through), 0, periods - 1)
+
+    eligible = _suffix_counts(codes, eligible_through, n_cohorts, periods)
+    retained = _suffix_counts(codes, retained_through, n_cohorts, periods)
+    return _triangle(label(np.arange(n_cohorts) + first), eligible[:, 0], retained, eligible)
+
+
+def cohort_retention(granularity='month', max_periods=None, data_dir=DATA_DIR):
+    """Retention triangle from user_activity_summary."""
+    activity = load_table('user_activity_summary', data_dir,
+                          columns=['signup_date', 'last_active_date', 'days_since_signup'])
+    return retention_matrix(_days(activity['signup_date']), _days(activity['last_active_date']),
+                            activity['days_since_signup'].to_numpy(), granularity, max_periods)
+
+
+def event_retention_matrix(user_ids, signup_days, event_user_ids, event_days, end_day,
+                           granularity='month', max_periods=None):
+    """
+    Activity retention triangle: the share of each cohort with at least one
+    event in period p. Only periods that ended by end_day are eligible.
+    """
+    signup_days = np.asarray(signup_days)
+    cohort, label = _cohorts(signup_days, granularity)
+    length = GRANULARITIES[granularity]
+    first = cohort.min()
+    codes = cohort - first
+    n_cohorts = int(codes.max()) + 1
+
+    # Complete periods observed per user; period p needs p + 1 of them
+    complete = (end_day - signup_days) // length
+    periods = max(int(complete.max()), 1)
+    if max_periods is not None:
+        periods = min(periods, max_periods + 1)
+    eligible_through = np.clip(complete - 1, -1, periods - 1)
+
+    # Distinct (user, period) pairs with activity, in eligible periods
+    position = pd.Index(user_ids).get_indexer(event_user_ids)
+    known = position >= 0
+    position = position[known]
+    period = (np.asarray(event_days)[known] - signup_days[position]) // length
+    keep = (period >= 0) & (period <= eligible_through[position])
+    pairs = np.unique(position[keep].astype(np.int64) * periods + period[keep])
+
+    active_users = pairs // periods
+    retained = np.bincount(codes[active_users] * periods + pairs % periods,
+                           minlength=n_cohorts * periods).reshape(n_cohorts, periods)
+    observed = eligible_through >= 0
+    eligible = _suffix_counts(codes[observed], eligible_through[observed], n_cohorts, periods)
+    sizes = np.bincount(codes, minlength=n_cohorts)
+    return _triangle(label(np.arange(n_cohorts) + first), sizes, retained, eligible)
+
+
+def event_cohort_retention(granularity='month', max_periods=None, data_dir=DATA_DIR):
+    """Activity retention triangle from events; observed up to the last event."""
+    users = load_table('users', data_dir, columns=['user_id', 'signup_date'])
+    events = load_table('events', data_dir, columns=['user_id', 'event_timestamp'])
+    event_days = _days(events['event_timestamp'])
+    return event_retention_matrix(users['user_id'], _days(users['signup_date']),
+                                  events['user_id'], event_days, int(event_days.max()) + 1,
+                                  granularity, max_periods)
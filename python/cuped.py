@@ -0,0 +1,138 @@
+"""
+=================================================================
+TaskFlow Analytics - CUPED Variance Reduction
+=================================================================
+Regression-adjusted (CUPED) experiment effects. Each metric is adjusted
+by its pooled linear relation to user covariates fixed before the user
+was assigned, so the treatment cannot affect them:
+  - signup attributes: team size, account tier, signup source and role
+  - pre-period activity: events in the PRE_PERIOD_DAYS before assignment,
+    when the events table has been generated
+
+    y_adjusted = y - (X - mean(X)) @ theta,   theta = OLS of y on X
+
+Randomization keeps the adjusted difference in means unbiased, while its
+variance shrinks by the share of variance the covariates explain, so
+the same power is reached with (1 - variance_reduction) of the users.
+Post-assignment measurements (e.g. lifetime totals in
+user_activity_summary) must not be used: the treatment can move them,
+which biases the adjusted lift.
+
+Covariates are joined to the assignments in one pass and theta is one
+least-squares solve for every metric at once.
+=================================================================
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from data_loader import DATA_DIR, load_table, read_chunks, source_files
+from experiment_stats import CONTROL, EXPERIMENT_METRICS, load_experiments
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Numeric signup attributes from users (recorded before assignment)
+NUMERIC_COVARIATES = ['team_size']
+# Categorical signup attributes from users, one-hot encoded
+CATEGORICAL_COVARIATES = ['account_tier', 'signup_source', 'user_role']
+
+# Events in this many days before each assignment form a pre-period covariate
+PRE_PERIOD_DAYS = 28
+PRE_PERIOD_COVARIATE = 'pre_period_events'
+
+
+def covariate_matrix(df, numeric=NUMERIC_COVARIATES, categorical=CATEGORICAL_COVARIATES):
+    """Users x covariates matrix: numeric columns, then one-hot categories (first dropped)."""
+    columns = [df[column].to_numpy(dtype=float) for column in numeric]
+    for column in categorical:
+        codes, _ = pd.factorize(df[column], sort=True)
+        columns.extend((codes == level).astype(float) for level in range(1, codes.max() + 1))
+    return np.column_stack(columns) if columns else np.empty((len(df), 0))
+
+
+def pre_period_events(assignments, days=PRE_PERIOD_DAYS, data_dir=DATA_DIR):
+    """
+    Events per assignment row in the `days` before its assignment_date,
+    streamed from the events table; None if no events were generated.
+    """
+    if not all(os.path.exists(path) for path in source_files('events', data_dir)):
+        return None
+    # One row per assignment, so users in several tests get a count per test
+    rows = pd.DataFrame({'user_id': assignments['user_id'].to_numpy(),
+                         'row': np.arange(len(assignments)),
+                         'assigned': assignments['assignment_date'].to_numpy(dtype='datetime64[ns]')})
+    window = pd.Timedelta(days=days)
+
+    counts = np.zeros(len(assignments))
+    for chunk in read_chunks('events', data_dir, columns=['user_id', 'event_timestamp']):
+        events = chunk.merge(rows, on='user_id')
+        before = ((events['event_timestamp'] < events['assigned']) &
+                  (events['event_timestamp'] >= events['assigned'] - window)).to_numpy()
+        counts += np.bincount(events['row'].to_numpy()[before], minlength=len(assignments))
+    return counts
+
+
+def cuped_effects(y, treated, X):
+    """
+    Raw and CUPED-adjusted treatment effects for every metric at once.
+
+    y is users x metrics, treated a boolean per user, X users x covariates.
+    Returns a dict of per-metric arrays.
+    """
+    y = np.asarray(y, dtype=float).reshape(len(treated), -1)
+    X_centered = X - X.mean(axis=0)
+    theta = np.linalg.lstsq(X_centered, y - y.mean(axis=0), rcond=None)[0]
+    adjusted = y - X_centered @ theta
+
+    effects = {}
+    for name, values in [('raw', y), ('cuped', adjusted)]:
+        variant, control = values[treated], values[~treated]
+        lift = variant.mean(axis=0) - control.mean(axis=0)
+        se = np.sqrt(variant.var(axis=0, ddof=1) / len(variant) + control.var(axis=0, ddof=1) / len(control))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            p_value = 2 * stats.norm.sf(np.abs(lift / se))
+        effects.update({f'{name}_lift': lift, f'{name}_se': se, f'{name}_p_value': p_value})
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effects['variance_reduction'] = 1 - adjusted.var(axis=0) / y.var(axis=0)
+    return effects
+
+
+def cuped_results(metrics=None, numeric=NUMERIC_COVARIATES, categorical=CATEGORICAL_COVARIATES,
+                  pre_period_days=PRE_PERIOD_DAYS, control=CONTROL, data_dir=DATA_DIR):
+    """
+    Raw vs CUPED effect of every variant against its control, per test and
+    metric. Covariates are users columns recorded at signup, plus events in
+    the pre_period_days before assignment when events exist (0 to skip).
+    """
+    metrics = list(metrics or EXPERIMENT_METRICS)
+    df = load_experiments(metrics, data_dir=data_dir)
+    covariates = list(dict.fromkeys(list(numeric) + list(categorical)))
+    if covariates:
+        users = load_table('users', data_dir, columns=['user_id'] + covariates)
+        df = df.join(users.set_index('user_id'), on='user_id')
+    numeric = list(numeric)
+    if pre_period_days:
+        # Same table and row order as load_experiments
+        assignments = load_table('ab_test_assignments', data_dir, columns=['user_id', 'assignment_date'])
+        events = pre_period_events(assignments, pre_period_days, data_dir)
+        if events is not None:
+            df[PRE_PERIOD_COVARIATE] = events
+            numeric.append(PRE_PERIOD_COVARIATE)
+    X = covariate_matrix(df, numeric, categorical)
+
+    frames = []
+    test_names = df['test_name'].astype(str).to_numpy()
+    variants = df['variant'].astype(str).to_numpy()
+    for test in sorted(set(test_names)):
+        for variant in sorted(set(variants[test_names == test]) - {control}):
+            rows = (test_names == test) & np.isin(variants, [control, variant])
+            effects = cuped_effects(df.loc[rows, metrics].to_numpy(dtype=float),
+                                    variants[rows] == variant, X[rows])
+            frames.append(pd.DataFrame({'test_name': test, 'variant': variant, 'metric': metrics,
+                                        'users': int(rows.sum()), **effects}))
+    return pd.concat(frames, ignore_index=True)
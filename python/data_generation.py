@@ -14,38 +14,40 @@ Key realistic patterns included:
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from faker import Faker
-import random
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import operator
+import shutil
+import time
 import os
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
-fake = Faker()
-Faker.seed(42)
+from data_loader import DATA_DIR, MRR_MAP, PARQUET_PARTITIONS, csv_path, parquet_path
 
-# Paths
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'data')
-os.makedirs(DATA_DIR, exist_ok=True)
-
-print("=" * 70)
-print("TASKFLOW ANALYTICS - DATA GENERATION")
-print("=" * 70)
-print()
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # only needed for --format parquet
+    pa = pq = None
 
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
 
+SEED = 42
 NUM_USERS = 10000
 NUM_WORKSPACES = 2500
 START_DATE = datetime(2024, 1, 1)
 END_DATE = datetime(2025, 12, 31)
+AB_TEST_START = datetime(2025, 10, 1)
+
+# Share of users (the most recent signups) forced into the A/B test window
+AB_WINDOW_SHARE = 0.20
 
 TIERS = ['free', 'starter', 'professional', 'enterprise']
 TIER_DISTRIBUTION = [0.60, 0.25, 0.12, 0.03]
+PREMIUM_TIERS = ['professional', 'enterprise']
 
 # Churn rates by tier (monthly)
 CHURN_RATES = {
@@ -55,145 +57,63 @@ CHURN_RATES = {
     'enterprise': 0.01
 }
 
-print("📊 Configuration:")
-print(f"   Users: {NUM_USERS:,}")
-print(f"   Workspaces: {NUM_WORKSPACES:,}")
-print(f"   Date Range: {START_DATE.date()} to {END_DATE.date()}")
-print()
-
-# ============================================================================
-# TABLE 1: USERS
-# ============================================================================
-
-print("🔨 Generating users table...")
-
-users_data = []
-workspace_ids = [f"WS{str(i).zfill(6)}" for i in range(1, NUM_WORKSPACES + 1)]
-
-for i in range(1, NUM_USERS + 1):
-    user_id = f"U{str(i).zfill(6)}"
-    workspace_id = random.choice(workspace_ids)
-
-    # Signup date distribution:
-    # 80% spread across entire range (growth curve)
-    # 20% forced into Oct-Dec 2025 (A/B test window) to ensure sufficient sample
-    days_range = (END_DATE - START_DATE).days
-    if i <= NUM_USERS * 0.80:
-        signup_date = START_DATE + timedelta(days=np.random.randint(0, days_range))
-    else:
-        # A/B test window: Oct 1 - Dec 31, 2025
-        ab_start = datetime(2025, 10, 1)
-        ab_days = (END_DATE - ab_start).days
-        signup_date = ab_start + timedelta(days=np.random.randint(0, ab_days))
-
-    # Account tier
-    tier = np.random.choice(TIERS, p=TIER_DISTRIBUTION)
-
-    # Determine if churned
-    months_since_signup = (END_DATE - signup_date).days / 30
-    churn_probability = 1 - (1 - CHURN_RATES[tier]) ** months_since_signup
-    is_churned = np.random.random() < churn_probability
-
-    if is_churned:
-        churn_offset_days = np.random.randint(7, max(8, int((END_DATE - signup_date).days * 0.8)))
-        last_login = signup_date + timedelta(days=churn_offset_days)
-        is_active = False
-    else:
-        last_login = END_DATE - timedelta(days=np.random.randint(0, 7))
-        is_active = True
-
-    users_data.append({
-        'user_id': user_id,
-        'workspace_id': workspace_id,
-        'email': fake.email(),
-        'signup_date': signup_date,
-        'account_tier': tier,
-        'user_role': np.random.choice(['owner', 'admin', 'member', 'guest'], p=[0.10, 0.20, 0.60, 0.10]),
-        'industry': np.random.choice(['tech', 'marketing', 'finance', 'healthcare', 'education', 'retail']),
-        'team_size': np.random.choice([5, 10, 25, 50, 100, 250], p=[0.40, 0.30, 0.15, 0.10, 0.04, 0.01]),
-        'signup_source': np.random.choice(['organic', 'paid_search', 'referral', 'sales'], p=[0.40, 0.30, 0.20, 0.10]),
-        'country': np.random.choice(['US', 'UK', 'Canada', 'Germany', 'Australia']),
-        'is_active': is_active,
-        'last_login_date': last_login
-    })
-
-users_df = pd.DataFrame(users_data)
-print(f"   ✅ Generated {len(users_df):,} users")
-
-# ============================================================================
-# TABLE 2: USER ACTIVITY SUMMARY (80/20 power user distribution)
-# ============================================================================
+USER_ROLES = ['owner', 'admin', 'member', 'guest']
+USER_ROLE_DISTRIBUTION = [0.10, 0.20, 0.60, 0.10]
+INDUSTRIES = ['tech', 'marketing', 'finance', 'healthcare', 'education', 'retail']
+TEAM_SIZES = [5, 10, 25, 50, 100, 250]
+TEAM_SIZE_DISTRIBUTION = [0.40, 0.30, 0.15, 0.10, 0.04, 0.01]
+SIGNUP_SOURCES = ['organic', 'paid_search', 'referral', 'sales']
+SIGNUP_SOURCE_DISTRIBUTION = [0.40, 0.30, 0.20, 0.10]
+COUNTRIES = ['US', 'UK', 'Canada', 'Germany', 'Australia']
+
+# 80/20 rule: 20% of users drive 80% of activity
+USER_TYPES = ['power_user', 'regular', 'casual']
+USER_TYPE_DISTRIBUTION = [0.20, 0.50, 0.30]
+
+# Per user type [low, high) ranges, in USER_TYPES order
+ACTIVITY_RANGES = {
+    'total_sessions': [(50, 200), (10, 50), (1, 10)],
+    'total_events': [(500, 2000), (50, 500), (5, 50)],
+    'avg_session_duration': [(15, 45), (8, 20), (3, 10)],
+    'tasks_created': [(50, 300), (10, 50), (0, 10)],
+    'completion_ratio': [(0.6, 0.9), (0.5, 0.8), (0.3, 0.6)],
+    'boards_created': [(5, 20), (1, 5), (0, 2)],
+}
 
-print("🔨 Generating user_activity_summary table...")
-
-activity_data = []
-
-for idx, user in users_df.iterrows():
-    days_since_signup = (END_DATE - user['signup_date']).days
-
-    # 80/20 rule: 20% of users drive 80% of activity
-    user_type = np.random.choice(['power_user', 'regular', 'casual'], p=[0.20, 0.50, 0.30])
-
-    if user_type == 'power_user':
-        total_sessions = np.random.randint(50, 200)
-        total_events = np.random.randint(500, 2000)
-        avg_session_duration = np.random.uniform(15, 45)
-        tasks_created = np.random.randint(50, 300)
-        tasks_completed = int(tasks_created * np.random.uniform(0.6, 0.9))
-        boards_created = np.random.randint(5, 20)
-        premium_features_used = np.random.randint(3, 6) if user['account_tier'] in ['professional', 'enterprise'] else np.random.randint(0, 2)
-    elif user_type == 'regular':
-        total_sessions = np.random.randint(10, 50)
-        total_events = np.random.randint(50, 500)
-        avg_session_duration = np.random.uniform(8, 20)
-        tasks_created = np.random.randint(10, 50)
-        tasks_completed = int(tasks_created * np.random.uniform(0.5, 0.8))
-        boards_created = np.random.randint(1, 5)
-        premium_features_used = np.random.randint(0, 3) if user['account_tier'] in ['professional', 'enterprise'] else 0
-    else:
-        total_sessions = np.random.randint(1, 10)
-        total_events = np.random.randint(5, 50)
-        avg_session_duration = np.random.uniform(3, 10)
-        tasks_created = np.random.randint(0, 10)
-        tasks_completed = int(tasks_created * np.random.uniform(0.3, 0.6))
-        boards_created = np.random.randint(0, 2)
-        premium_features_used = 0
+# Premium features used, per user type: (other tiers, premium tiers)
+PREMIUM_FEATURE_RANGES = [
+    [(0, 2), (3, 6)],
+    [(0, 1), (0, 3)],
+    [(0, 1), (0, 1)],
+]
 
-    # Churned users have lower activity
-    if not user['is_active']:
-        total_sessions = int(total_sessions * 0.3)
-        total_events = int(total_events * 0.3)
+AB_TEST_NAME = 'simplified_onboarding_q4_2025'
 
-    is_at_risk = (END_DATE - user['last_login_date']).days > 14
+# Share of users whose full event history is written to events.csv
+EVENT_SAMPLE_FRACTION = 1.0
 
-    activity_data.append({
-        'user_id': user['user_id'],
-        'workspace_id': user['workspace_id'],
-        'signup_date': user['signup_date'].date(),
-        'days_since_signup': days_since_signup,
-        'total_sessions': total_sessions,
-        'total_events': total_events,
-        'avg_session_duration_min': round(avg_session_duration, 1),
-        'tasks_created': tasks_created,
-        'tasks_completed': tasks_completed,
-        'boards_created': boards_created,
-        'premium_features_used': premium_features_used,
-        'last_active_date': user['last_login_date'].date(),
-        'is_power_user': user_type == 'power_user',
-        'is_at_risk_churn': is_at_risk,
-        'cohort_month': user['signup_date'].strftime('%Y-%m')
-    })
+# Events are generated and written in blocks of about this many rows
+EVENT_BLOCK_SIZE = 1_000_000
 
-activity_df = pd.DataFrame(activity_data)
-print(f"   ✅ Generated {len(activity_df):,} activity summaries")
+EVENT_TYPES = [
+    'signup_completed', 'onboarding_step_1', 'onboarding_step_2',
+    'onboarding_step_3', 'onboarding_step_4', 'onboarding_completed',
+    'task_created', 'task_completed', 'board_created',
+    'automation_created', 'time_tracking_started', 'custom_field_added',
+    'report_generated', 'integration_connected', 'upgrade_initiated', 'upgrade_completed'
+]
 
-# ============================================================================
-# TABLE 3: ONBOARDING FUNNEL (With realistic drop-offs)
-# ============================================================================
+EVENT_WEIGHTS = [
+    0.01, 0.05, 0.05, 0.04, 0.03, 0.02,
+    0.30, 0.25, 0.05,
+    0.02, 0.02, 0.02,
+    0.03, 0.05, 0.03, 0.03
+]
 
-print("🔨 Generating onboarding_funnel table...")
+CHURN_REASONS = ['price', 'feature_gap', 'competitor', 'other']
+CHURN_REASON_DISTRIBUTION = [0.30, 0.25, 0.35, 0.10]
 
-onboarding_data = []
+AB_VARIANTS = ['control', 'variant_a']
 
 STEP_COMPLETION_RATES = {
     1: 0.85,
@@ -202,60 +122,8 @@ STEP_COMPLETION_RATES = {
     4: 0.78
 }
 
-for idx, user in users_df.iterrows():
-    # A/B test variant for users Oct-Dec 2025
-    if user['signup_date'] >= datetime(2025, 10, 1) and user['signup_date'] <= datetime(2025, 12, 31):
-        ab_variant = np.random.choice(['control', 'variant_a'])
-    else:
-        ab_variant = None
-
-    step_1_completed = np.random.random() < STEP_COMPLETION_RATES[1]
-    step_1_time = user['signup_date'] + timedelta(minutes=np.random.randint(5, 30)) if step_1_completed else None
-
-    step_2_completed = step_1_completed and (np.random.random() < STEP_COMPLETION_RATES[2])
-    step_2_time = step_1_time + timedelta(minutes=np.random.randint(10, 60)) if step_2_completed else None
-
-    # Step 3: variant_a has better completion rate
-    step_3_rate = 0.80 if ab_variant == 'variant_a' else STEP_COMPLETION_RATES[3]
-    step_3_completed = step_2_completed and (np.random.random() < step_3_rate)
-    step_3_time = step_2_time + timedelta(hours=np.random.randint(1, 48)) if step_3_completed else None
-
-    step_4_completed = step_3_completed and (np.random.random() < STEP_COMPLETION_RATES[4])
-    step_4_time = step_3_time + timedelta(minutes=np.random.randint(5, 30)) if step_4_completed else None
-
-    if step_4_completed:
-        time_to_complete_hours = (step_4_time - user['signup_date']).total_seconds() / 3600
-        onboarding_completed = True
-        completion_date = step_4_time
-    else:
-        time_to_complete_hours = None
-        onboarding_completed = False
-        completion_date = None
-
-    onboarding_data.append({
-        'user_id': user['user_id'],
-        'step_1_completed': step_1_completed,
-        'step_1_timestamp': step_1_time,
-        'step_2_completed': step_2_completed,
-        'step_2_timestamp': step_2_time,
-        'step_3_completed': step_3_completed,
-        'step_3_timestamp': step_3_time,
-        'step_4_completed': step_4_completed,
-        'step_4_timestamp': step_4_time,
-        'onboarding_completed': onboarding_completed,
-        'onboarding_completion_date': completion_date,
-        'time_to_complete_hours': time_to_complete_hours,
-        'ab_test_variant': ab_variant
-    })
-
-onboarding_df = pd.DataFrame(onboarding_data)
-print(f"   ✅ Generated {len(onboarding_df):,} onboarding records")
-
-# ============================================================================
-# TABLE 4: FEATURE USAGE (With discovery friction)
-# ============================================================================
-
-print("🔨 Generating feature_usage table...")
+# Step 3 completion rate for variant_a (simplified onboarding with templates)
+VARIANT_STEP_3_RATE = 0.80
 
 FEATURES = {
     'kanban_boards': {'adoption_rate': 0.85, 'is_premium': False},
@@ -267,190 +135,775 @@ FEATURES = {
     'integrations_google_drive': {'adoption_rate': 0.30, 'is_premium': False}
 }
 
-feature_data = []
-
-for idx, user in users_df.iterrows():
-    for feature_name, feature_config in FEATURES.items():
-        if feature_config['is_premium'] and user['account_tier'] == 'free':
-            continue
-
-        if np.random.random() < feature_config['adoption_rate']:
-            days_until_discovery = int(np.random.gamma(shape=2, scale=20))
-            first_used = user['signup_date'] + timedelta(days=days_until_discovery)
-            total_usage = np.random.randint(1, 50) if user['is_active'] else np.random.randint(1, 10)
-            last_used = user['last_login_date'] if user['is_active'] else first_used + timedelta(days=np.random.randint(1, 30))
+# Emails are drawn from a pool of Faker addresses instead of one call per user
+EMAIL_POOL_SIZE = 20000
 
-            feature_data.append({
-                'usage_id': f"FU{len(feature_data) + 1:08d}",
-                'user_id': user['user_id'],
-                'feature_name': feature_name,
-                'first_used_date': first_used,
-                'total_usage_count': total_usage,
-                'last_used_date': last_used,
-                'days_since_signup_at_first_use': days_until_discovery
-            })
-
-feature_df = pd.DataFrame(feature_data)
-print(f"   ✅ Generated {len(feature_df):,} feature usage records")
 
 # ============================================================================
-# TABLE 5: SUBSCRIPTIONS
+# VECTORIZED GENERATION ENGINE
 # ============================================================================
+# Each column is drawn as a whole NumPy array from one Generator instead of
+# one Python loop iteration per user. Categorical columns are drawn as integer
+# codes and mapped to labels once at the end.
+
+
+def format_ids(prefix, numbers, width):
+    """Zero-padded string ids (e.g. 'U000042') built from digit arrays, no Python loop."""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if len(numbers) == 0:
+        return np.array([], dtype=str)
+    width = max(width, len(str(int(numbers.max()))))
+    prefix_bytes = np.frombuffer(prefix.encode('ascii'), dtype=np.uint8)
+    chars = np.empty((len(numbers), len(prefix_bytes) + width), dtype=np.uint8)
+    chars[:, :len(prefix_bytes)] = prefix_bytes
+    remaining = numbers.copy()
+    for col in range(chars.shape[1] - 1, len(prefix_bytes) - 1, -1):
+        chars[:, col] = remaining % 10 + ord('0')
+        remaining //= 10
+    return chars.view(f'S{chars.shape[1]}').ravel().astype(str)
+
+
+def _day_offsets_to_datetime(offsets):
+    """Convert integer day offsets from START_DATE into a datetime64 array."""
+    return np.datetime64(START_DATE, 'D') + offsets.astype('timedelta64[D]')
+
+
+def _draw_ranges(rng, ranges, codes, integer=True):
+    """Draw one value per row from the [low, high) range selected by codes."""
+    low, high = np.array(ranges).T
+    if integer:
+        return rng.integers(low.astype(np.int64)[codes], high.astype(np.int64)[codes])
+    return rng.uniform(low[codes], high[codes])
+
+
+def build_email_pool(size, seed=SEED):
+    """Pre-generate Faker emails once; users draw from the pool by index."""
+    pool_fake = Faker()
+    pool_fake.seed_instance(seed)
+    return np.array([pool_fake.email() for _ in range(size)])
+
+
+def generate_users(rng, num_users, email_pool, first_user=1, total_users=None,
+                   num_workspaces=NUM_WORKSPACES):
+    """Generate the users table for user numbers [first_user, first_user + num_users).
+
+    total_users is the size of the full population; the last AB_WINDOW_SHARE of
+    it signs up inside the A/B test window, so chunks of a larger run keep the
+    same split as a single pass.
+    """
+    total_users = total_users or num_users
+    user_numbers = np.arange(first_user, first_user + num_users, dtype=np.int64)
 
-print("🔨 Generating subscriptions table...")
+    # Signup date distribution:
+    # 80% spread across entire range (growth curve)
+    # 20% forced into Oct-Dec 2025 (A/B test window) to ensure sufficient sample
+    days_range = (END_DATE - START_DATE).days
+    ab_offset = (AB_TEST_START - START_DATE).days
+    in_ab_window = user_numbers > total_users * (1 - AB_WINDOW_SHARE)
+    signup_offset = np.empty(num_users, dtype=np.int64)
+    signup_offset[~in_ab_window] = rng.integers(0, days_range, (~in_ab_window).sum())
+    signup_offset[in_ab_window] = ab_offset + rng.integers(0, days_range - ab_offset, in_ab_window.sum())
+
+    # Account tier and churn
+    tier_codes = rng.choice(len(TIERS), size=num_users, p=TIER_DISTRIBUTION)
+    churn_rates = np.array([CHURN_RATES[tier] for tier in TIERS])
+    days_to_end = days_range - signup_offset
+    churn_probability = 1 - (1 - churn_rates[tier_codes]) ** (days_to_end / 30)
+    is_churned = rng.random(num_users) < churn_probability
+
+    churn_offset = rng.integers(7, np.maximum(8, (days_to_end * 0.8).astype(np.int64)))
+    last_login_offset = np.where(
+        is_churned,
+        signup_offset + churn_offset,
+        days_range - rng.integers(0, 7, num_users)
+    )
+
+    return pd.DataFrame({
+        'user_id': format_ids('U', user_numbers, 6),
+        'workspace_id': format_ids('WS', rng.integers(1, num_workspaces + 1, num_users), 6),
+        'email': email_pool[rng.integers(0, len(email_pool), num_users)],
+        'signup_date': _day_offsets_to_datetime(signup_offset).astype('datetime64[ns]'),
+        'account_tier': pd.Categorical.from_codes(tier_codes, TIERS),
+        'user_role': pd.Categorical.from_codes(
+            rng.choice(len(USER_ROLES), size=num_users, p=USER_ROLE_DISTRIBUTION), USER_ROLES),
+        'industry': pd.Categorical.from_codes(
+            rng.integers(0, len(INDUSTRIES), num_users), INDUSTRIES),
+        'team_size': rng.choice(TEAM_SIZES, size=num_users, p=TEAM_SIZE_DISTRIBUTION),
+        'signup_source': pd.Categorical.from_codes(
+            rng.choice(len(SIGNUP_SOURCES), size=num_users, p=SIGNUP_SOURCE_DISTRIBUTION), SIGNUP_SOURCES),
+        'country': pd.Categorical.from_codes(
+            rng.integers(0, len(COUNTRIES), num_users), COUNTRIES),
+        'is_active': ~is_churned,
+        'last_login_date': _day_offsets_to_datetime(last_login_offset).astype('datetime64[ns]')
+    })
 
-subscription_data = []
 
-for workspace_id in users_df['workspace_id'].unique():
-    workspace_users = users_df[users_df['workspace_id'] == workspace_id]
-    owner = workspace_users[workspace_users['user_role'] == 'owner']
-    plan_type = owner.iloc[0]['account_tier'] if len(owner) > 0 else workspace_users.iloc[0]['account_tier']
+def generate_activity(rng, users_df):
+    """Generate user_activity_summary rows aligned one-to-one with users_df."""
+    num_users = len(users_df)
+    type_codes = rng.choice(len(USER_TYPES), size=num_users, p=USER_TYPE_DISTRIBUTION)
 
-    user_count = len(workspace_users)
-    mrr_map = {'free': 0, 'starter': 10, 'professional': 25, 'enterprise': 50}
-    mrr = user_count * mrr_map[plan_type]
+    total_sessions = _draw_ranges(rng, ACTIVITY_RANGES['total_sessions'], type_codes)
+    total_events = _draw_ranges(rng, ACTIVITY_RANGES['total_events'], type_codes)
+    avg_session_duration = _draw_ranges(rng, ACTIVITY_RANGES['avg_session_duration'], type_codes, integer=False)
+    tasks_created = _draw_ranges(rng, ACTIVITY_RANGES['tasks_created'], type_codes)
+    completion_ratio = _draw_ranges(rng, ACTIVITY_RANGES['completion_ratio'], type_codes, integer=False)
+    tasks_completed = (tasks_created * completion_ratio).astype(np.int64)
+    boards_created = _draw_ranges(rng, ACTIVITY_RANGES['boards_created'], type_codes)
 
-    start_date = workspace_users['signup_date'].min()
-    is_any_active = workspace_users['is_active'].any()
+    is_premium_tier = users_df['account_tier'].isin(PREMIUM_TIERS).to_numpy()
+    premium_ranges = np.array(PREMIUM_FEATURE_RANGES)[type_codes, is_premium_tier.astype(int)]
+    premium_features_used = rng.integers(premium_ranges[:, 0], premium_ranges[:, 1])
 
-    if not is_any_active:
-        churn_date = workspace_users['last_login_date'].max()
-        end_date = churn_date
-        churn_reason = np.random.choice(['price', 'feature_gap', 'competitor', 'other'], p=[0.30, 0.25, 0.35, 0.10])
-    else:
-        churn_date = None
-        end_date = None
-        churn_reason = None
-
-    subscription_data.append({
-        'subscription_id': f"SUB{len(subscription_data) + 1:06d}",
-        'workspace_id': workspace_id,
-        'plan_type': plan_type,
-        'mrr': mrr,
-        'start_date': start_date,
-        'end_date': end_date,
-        'is_active': is_any_active,
-        'churn_date': churn_date,
-        'churn_reason': churn_reason
+    # Churned users have lower activity
+    is_active = users_df['is_active'].to_numpy()
+    total_sessions = np.where(is_active, total_sessions, (total_sessions * 0.3).astype(np.int64))
+    total_events = np.where(is_active, total_events, (total_events * 0.3).astype(np.int64))
+
+    signup_date = users_df['signup_date']
+    last_login_date = users_df['last_login_date']
+
+    return pd.DataFrame({
+        'user_id': users_df['user_id'].to_numpy(),
+        'workspace_id': users_df['workspace_id'].to_numpy(),
+        'signup_date': signup_date.to_numpy(),
+        'days_since_signup': (END_DATE - signup_date).dt.days.to_numpy(),
+        'total_sessions': total_sessions,
+        'total_events': total_events,
+        'avg_session_duration_min': np.round(avg_session_duration, 1),
+        'tasks_created': tasks_created,
+        'tasks_completed': tasks_completed,
+        'boards_created': boards_created,
+        'premium_features_used': premium_features_used,
+        'last_active_date': last_login_date.to_numpy(),
+        'is_power_user': type_codes == USER_TYPES.index('power_user'),
+        'is_at_risk_churn': ((END_DATE - last_login_date).dt.days > 14).to_numpy(),
+        'cohort_month': signup_date.to_numpy().astype('datetime64[M]').astype(str)
     })
 
-subscriptions_df = pd.DataFrame(subscription_data)
-print(f"   ✅ Generated {len(subscriptions_df):,} subscription records")
 
-# ============================================================================
-# TABLE 6: A/B TEST ASSIGNMENTS
-# ============================================================================
+def build_user_index(users_df):
+    """Hash index over user_id shared by every downstream join.
 
-print("🔨 Generating ab_test_assignments table...")
+    Per-user tables (activity, onboarding) are generated row-aligned with
+    users_df, so a position from this index addresses all of them.
+    """
+    return pd.Index(users_df['user_id'])
 
-# Use the onboarding table's variant assignment as source of truth
-ab_onboarding = onboarding_df[onboarding_df['ab_test_variant'].notna()].copy()
 
-ab_test_data = []
+def user_positions(user_index, user_ids):
+    """Row positions of user_ids in users_df and the tables aligned with it."""
+    positions = user_index.get_indexer(user_ids)
+    if (positions < 0).any():
+        raise KeyError("user_id not found in users table")
+    return positions
 
-for idx, ob_record in ab_onboarding.iterrows():
-    user_id = ob_record['user_id']
-    user_row = users_df[users_df['user_id'] == user_id].iloc[0]
 
-    ab_test_data.append({
-        'user_id': user_id,
-        'test_name': 'simplified_onboarding_q4_2025',
-        'variant': ob_record['ab_test_variant'],
-        'assignment_date': user_row['signup_date'],
-        'converted': ob_record['onboarding_completed'],
-        'conversion_date': ob_record['onboarding_completion_date']
-    })
+def generate_onboarding(rng, users_df):
+    """Generate onboarding_funnel rows aligned one-to-one with users_df."""
+    num_users = len(users_df)
+    signup = users_df['signup_date'].to_numpy().astype('datetime64[m]')
 
-ab_test_df = pd.DataFrame(ab_test_data)
-print(f"   ✅ Generated {len(ab_test_df):,} A/B test assignments")
+    # A/B test variant for users Oct-Dec 2025
+    in_test = (signup >= np.datetime64(AB_TEST_START, 'm')) & (signup <= np.datetime64(END_DATE, 'm'))
+    variant_codes = np.where(in_test, rng.integers(0, len(AB_VARIANTS), num_users), -1)
 
-# ============================================================================
-# TABLE 7: EVENTS (Behavioral event stream - sampled)
-# ============================================================================
+    # Step 3: variant_a has better completion rate
+    step_3_rate = np.where(variant_codes == AB_VARIANTS.index('variant_a'),
+                           VARIANT_STEP_3_RATE, STEP_COMPLETION_RATES[3])
+    step_1_completed = rng.random(num_users) < STEP_COMPLETION_RATES[1]
+    step_2_completed = step_1_completed & (rng.random(num_users) < STEP_COMPLETION_RATES[2])
+    step_3_completed = step_2_completed & (rng.random(num_users) < step_3_rate)
+    step_4_completed = step_3_completed & (rng.random(num_users) < STEP_COMPLETION_RATES[4])
+
+    minute = np.timedelta64(1, 'm')
+    step_1_time = signup + rng.integers(5, 30, num_users) * minute
+    step_2_time = step_1_time + rng.integers(10, 60, num_users) * minute
+    step_3_time = step_2_time + rng.integers(1, 48, num_users) * 60 * minute
+    step_4_time = step_3_time + rng.integers(5, 30, num_users) * minute
+
+    def completed_at(times, completed):
+        return np.where(completed, times, np.datetime64('NaT')).astype('datetime64[ns]')
+
+    completion_date = completed_at(step_4_time, step_4_completed)
+    time_to_complete_hours = np.where(step_4_completed, (step_4_time - signup) / np.timedelta64(1, 'h'), np.nan)
+
+    return pd.DataFrame({
+        'user_id': users_df['user_id'].to_numpy(),
+        'step_1_completed': step_1_completed,
+        'step_1_timestamp': completed_at(step_1_time, step_1_completed),
+        'step_2_completed': step_2_completed,
+        'step_2_timestamp': completed_at(step_2_time, step_2_completed),
+        'step_3_completed': step_3_completed,
+        'step_3_timestamp': completed_at(step_3_time, step_3_completed),
+        'step_4_completed': step_4_completed,
+        'step_4_timestamp': completed_at(step_4_time, step_4_completed),
+        'onboarding_completed': step_4_completed,
+        'onboarding_completion_date': completion_date,
+        'time_to_complete_hours': time_to_complete_hours,
+        'ab_test_variant': pd.Categorical.from_codes(variant_codes, AB_VARIANTS)
+    })
 
-print("🔨 Generating events table (sampling 2,000 users)...")
 
-EVENT_TYPES = [
-    'signup_completed', 'onboarding_step_1', 'onboarding_step_2',
-    'onboarding_step_3', 'onboarding_step_4', 'onboarding_completed',
-    'task_created', 'task_completed', 'board_created',
-    'automation_created', 'time_tracking_started', 'custom_field_added',
-    'report_generated', 'integration_connected', 'upgrade_initiated', 'upgrade_completed'
-]
+def generate_feature_usage(rng, users_df, first_usage_id=1):
+    """Generate feature_usage rows (user order, then FEATURES order) for users_df.
+
+    Adoption is drawn as a users x features matrix; premium features are never
+    adopted by free-tier users.
+    """
+    num_users = len(users_df)
+    feature_names = list(FEATURES)
+    adoption_rates = np.array([FEATURES[name]['adoption_rate'] for name in feature_names])
+    is_premium = np.array([FEATURES[name]['is_premium'] for name in feature_names])
+    is_free = (users_df['account_tier'] == 'free').to_numpy()
+
+    eligible = ~(is_free[:, None] & is_premium[None, :])
+    adopted = eligible & (rng.random((num_users, len(feature_names))) < adoption_rates)
+    rows, feature_codes = np.nonzero(adopted)
+    num_rows = len(rows)
+
+    day = np.timedelta64(1, 'D')
+    signup = users_df['signup_date'].to_numpy()[rows]
+    is_active = users_df['is_active'].to_numpy()[rows]
+    days_until_discovery = rng.gamma(shape=2, scale=20, size=num_rows).astype(np.int64)
+    first_used = signup + days_until_discovery * day
+    total_usage = rng.integers(1, np.where(is_active, 50, 10))
+    last_used = np.where(
+        is_active,
+        users_df['last_login_date'].to_numpy()[rows],
+        first_used + rng.integers(1, 30, num_rows) * day
+    )
+
+    return pd.DataFrame({
+        'usage_id': format_ids('FU', np.arange(first_usage_id, first_usage_id + num_rows), 8),
+        'user_id': users_df['user_id'].to_numpy()[rows],
+        'feature_name': pd.Categorical.from_codes(feature_codes, feature_names),
+        'first_used_date': first_used,
+        'total_usage_count': total_usage,
+        'last_used_date': last_used,
+        'days_since_signup_at_first_use': days_until_discovery
+    })
 
-EVENT_WEIGHTS = [
-    0.01, 0.05, 0.05, 0.04, 0.03, 0.02,
-    0.30, 0.25, 0.05,
-    0.02, 0.02, 0.02,
-    0.03, 0.05, 0.03, 0.03
-]
 
-events_data = []
-event_id_counter = 1
-sample_users = users_df.sample(n=min(2000, len(users_df)), random_state=42)
+WORKSPACE_AGGREGATIONS = {
+    'user_count': 'sum',
+    'first_tier': 'first',
+    'owner_tier': 'first',
+    'start_date': 'min',
+    'is_active': 'any',
+    'last_login_date': 'max',
+}
 
-for idx, user in sample_users.iterrows():
-    num_events = activity_df[activity_df['user_id'] == user['user_id']]['total_events'].values[0]
-    active_days = max(1, (user['last_login_date'] - user['signup_date']).days)
 
-    for _ in range(num_events):
-        event_time = user['signup_date'] + timedelta(
-            days=np.random.randint(0, max(1, active_days)),
-            hours=np.random.randint(8, 22),
-            minutes=np.random.randint(0, 60)
-        )
-        event_name = np.random.choice(EVENT_TYPES, p=EVENT_WEIGHTS)
-
-        events_data.append({
-            'event_id': f"E{event_id_counter:010d}",
-            'user_id': user['user_id'],
-            'event_name': event_name,
-            'event_timestamp': event_time,
-            'session_id': f"SESSION{np.random.randint(1, 100000):08d}",
-            'properties': '{}'
-        })
-        event_id_counter += 1
+def aggregate_workspaces(users_df):
+    """Per-workspace partial aggregates for a batch of users, in first-appearance order.
+
+    Partials from consecutive user batches are combined with
+    merge_workspace_aggregates, so subscriptions never need every user in memory.
+    """
+    workspace_codes, workspace_ids = pd.factorize(users_df['workspace_id'])
+    tier_codes = pd.Categorical(users_df['account_tier'], categories=TIERS).codes
+    is_owner = (users_df['user_role'] == 'owner').to_numpy()
+
+    aggregates = pd.DataFrame({
+        'workspace': workspace_codes,
+        'tier': tier_codes,
+        'owner_tier': np.where(is_owner, tier_codes, np.nan),
+        'signup_date': users_df['signup_date'].to_numpy(),
+        'is_active': users_df['is_active'].to_numpy(),
+        'last_login_date': users_df['last_login_date'].to_numpy(),
+    }).groupby('workspace').agg(
+        user_count=('tier', 'size'),
+        first_tier=('tier', 'first'),
+        owner_tier=('owner_tier', 'first'),
+        start_date=('signup_date', 'min'),
+        is_active=('is_active', 'any'),
+        last_login_date=('last_login_date', 'max'),
+    )
+    aggregates.index = pd.Index(np.asarray(workspace_ids), name='workspace_id')
+    return aggregates
+
+
+def merge_workspace_aggregates(earlier, later):
+    """Combine two partials; earlier must cover lower-numbered users than later."""
+    if earlier is None:
+        return later
+    return pd.concat([earlier, later]).groupby(level=0, sort=False).agg(WORKSPACE_AGGREGATIONS)
+
+
+def generate_subscriptions(rng, workspaces):
+    """One subscription per workspace from the merged workspace aggregates.
+
+    Workspaces keep first-appearance order; the plan is the first owner's tier
+    (or the first user's tier when the workspace has no owner).
+    """
+    plan_codes = workspaces['owner_tier'].fillna(workspaces['first_tier']).to_numpy(dtype=np.int64)
+    mrr_per_seat = np.array([MRR_MAP[tier] for tier in TIERS])
+    is_active = workspaces['is_active'].to_numpy(dtype=bool)
+
+    # Churn reasons are drawn in bulk for the fully churned workspaces only
+    churn_reason_codes = np.full(len(workspaces), -1)
+    churn_reason_codes[~is_active] = rng.choice(
+        len(CHURN_REASONS), size=(~is_active).sum(), p=CHURN_REASON_DISTRIBUTION)
+    churn_date = workspaces['last_login_date'].where(~is_active).to_numpy()
+
+    return pd.DataFrame({
+        'subscription_id': format_ids('SUB', np.arange(1, len(workspaces) + 1), 6),
+        'workspace_id': workspaces.index.to_numpy(),
+        'plan_type': pd.Categorical.from_codes(plan_codes, TIERS),
+        'mrr': workspaces['user_count'].to_numpy() * mrr_per_seat[plan_codes],
+        'start_date': workspaces['start_date'].to_numpy(),
+        'end_date': churn_date,
+        'is_active': is_active,
+        'churn_date': churn_date,
+        'churn_reason': pd.Categorical.from_codes(churn_reason_codes, CHURN_REASONS)
+    })
 
-events_df = pd.DataFrame(events_data)
-print(f"   ✅ Generated {len(events_df):,} events")
 
-# ============================================================================
-# SAVE ALL FILES
-# ============================================================================
+def generate_ab_tests(onboarding_df, users_df, user_index):
+    """A/B assignments, using the onboarding table's variant as source of truth."""
+    ab_onboarding = onboarding_df[onboarding_df['ab_test_variant'].notna()]
+    positions = user_positions(user_index, ab_onboarding['user_id'])
+
+    return pd.DataFrame({
+        'user_id': ab_onboarding['user_id'].to_numpy(),
+        'test_name': AB_TEST_NAME,
+        'variant': ab_onboarding['ab_test_variant'].to_numpy(),
+        'assignment_date': users_df['signup_date'].to_numpy()[positions],
+        'converted': ab_onboarding['onboarding_completed'].to_numpy(),
+        'conversion_date': ab_onboarding['onboarding_completion_date'].to_numpy()
+    })
 
-print()
-print("💾 Saving CSV files...")
 
-users_df.to_csv(os.path.join(DATA_DIR, 'users.csv'), index=False)
-print("   ✅ users.csv")
+def generate_events(rng, users_df, activity_df, positions=None, first_event_id=1,
+                    block_size=EVENT_BLOCK_SIZE):
+    """Yield the events table in blocks of about block_size rows.
+
+    Each user's total_events is expanded with np.repeat, then timestamps, event
+    names and session ids are drawn for the whole block at once. positions
+    selects a subset of users (default: every user, in user order).
+    """
+    if positions is None:
+        positions = np.arange(len(users_df))
+    user_ids = users_df['user_id'].to_numpy()[positions]
+    signup = users_df['signup_date'].to_numpy()[positions].astype('datetime64[m]')
+    last_login = users_df['last_login_date'].to_numpy()[positions].astype('datetime64[m]')
+    active_days = np.maximum(1, (last_login - signup) // np.timedelta64(1, 'D'))
+    counts = activity_df['total_events'].to_numpy()[positions]
+    if counts.sum() == 0:
+        return
+
+    # Cut the user list so each block holds about block_size events
+    ends = np.cumsum(counts)
+    cuts = np.searchsorted(ends, np.arange(block_size, ends[-1], block_size), side='right')
+    bounds = np.unique(np.concatenate([[0], cuts, [len(counts)]]))
+
+    next_event_id = first_event_id
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        rows = np.repeat(np.arange(start, stop), counts[start:stop])
+        num_events = len(rows)
+        minute_offsets = (
+            rng.integers(0, active_days[rows]) * 1440
+            + rng.integers(8, 22, num_events) * 60
+            + rng.integers(0, 60, num_events)
+        )
+        event_codes = rng.choice(len(EVENT_TYPES), size=num_events, p=EVENT_WEIGHTS)
+
+        yield pd.DataFrame({
+            'event_id': format_ids('E', np.arange(next_event_id, next_event_id + num_events), 10),
+            'user_id': user_ids[rows],
+            'event_name': pd.Categorical.from_codes(event_codes, EVENT_TYPES),
+            'event_timestamp': (signup[rows] + minute_offsets.astype('timedelta64[m]')).astype('datetime64[ns]'),
+            'session_id': format_ids('SESSION', rng.integers(1, 100000, num_events), 8),
+            'properties': '{}'
+        })
+        next_event_id += num_events
 
-activity_df.to_csv(os.path.join(DATA_DIR, 'user_activity_summary.csv'), index=False)
-print("   ✅ user_activity_summary.csv")
 
-onboarding_df.to_csv(os.path.join(DATA_DIR, 'onboarding_funnel.csv'), index=False)
-print("   ✅ onboarding_funnel.csv")
+def generate_chunk(rng, email_pool, first_user, num_users, total_users, num_workspaces,
+                   first_usage_id=1, first_event_id=1):
+    """Generate every per-user table for one contiguous range of users.
 
-feature_df.to_csv(os.path.join(DATA_DIR, 'feature_usage.csv'), index=False)
-print("   ✅ feature_usage.csv")
+    Returns the tables as DataFrames plus a lazy generator of event blocks.
+    """
+    users_df = generate_users(rng, num_users, email_pool, first_user, total_users, num_workspaces)
+    user_index = build_user_index(users_df)
+    activity_df = generate_activity(rng, users_df)
+    onboarding_df = generate_onboarding(rng, users_df)
+    feature_df = generate_feature_usage(rng, users_df, first_usage_id)
+    ab_test_df = generate_ab_tests(onboarding_df, users_df, user_index)
 
-subscriptions_df.to_csv(os.path.join(DATA_DIR, 'subscriptions.csv'), index=False)
-print("   ✅ subscriptions.csv")
+    if EVENT_SAMPLE_FRACTION < 1:
+        event_positions = np.flatnonzero(rng.random(num_users) < EVENT_SAMPLE_FRACTION)
+    else:
+        event_positions = None
+    event_blocks = generate_events(rng, users_df, activity_df, event_positions, first_event_id)
+
+    tables = {
+        'users': users_df,
+        'user_activity_summary': activity_df,
+        'onboarding_funnel': onboarding_df,
+        'feature_usage': feature_df,
+        'ab_test_assignments': ab_test_df,
+    }
+    return tables, event_blocks
+
+
+# Dense ids that depend on how many rows earlier users produced. Shards write
+# these tables without the id column and the merge step numbers them globally.
+SHARD_RENUMBERED_IDS = {
+    'feature_usage': ('usage_id', 'FU', 8),
+    'events': ('event_id', 'E', 10),
+}
 
-ab_test_df.to_csv(os.path.join(DATA_DIR, 'ab_test_assignments.csv'), index=False)
-print("   ✅ ab_test_assignments.csv")
+# Bytes of shard CSV read per block while numbering ids
+MERGE_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def _clear_table_outputs(data_dir, table):
+    """Remove any previous CSV file or Parquet dataset for table in data_dir."""
+    if os.path.exists(csv_path(table, data_dir)):
+        os.remove(csv_path(table, data_dir))
+    if os.path.isdir(parquet_path(table, data_dir)):
+        shutil.rmtree(parquet_path(table, data_dir))
+
+
+class CsvTableWriter:
+    """Appends DataFrame chunks to <data_dir>/<table>.csv, writing each header once.
+
+    Each shard writes into its own directory, so unlike the Parquet writer
+    it needs no shard number to keep file names apart.
+    """
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.files = {}
+        self.row_counts = {}
+        self.part_rows = {}
+
+    def write(self, table, df):
+        is_new = table not in self.files
+        if is_new:
+            _clear_table_outputs(self.data_dir, table)
+            self.files[table] = open(csv_path(table, self.data_dir), 'w', newline='')
+            self.part_rows[table] = {csv_path(table, self.data_dir): 0}
+        df.to_csv(self.files[table], index=False, header=is_new)
+        self.row_counts[table] = self.row_counts.get(table, 0) + len(df)
+        self.part_rows[table][csv_path(table, self.data_dir)] += len(df)
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+    @staticmethod
+    def number_part(job):
+        """Process-pool entry point: prepend a dense id column to one shard CSV in place.
+
+        job is (path, (column, prefix, width), first_id); first_id comes from the
+        row counts of the earlier parts.
+        """
+        path, (column, prefix, width), first_id = job
+        next_id = first_id
+        with open(path, newline='') as f, open(f'{path}.numbered', 'w', newline='') as out:
+            out.write(f"{column},{f.readline()}")
+            while True:
+                lines = f.readlines(MERGE_BLOCK_BYTES)
+                if not lines:
+                    break
+                ids = format_ids(prefix, np.arange(next_id, next_id + len(lines)), width)
+                out.writelines(map(operator.add, np.char.add(ids, ',').tolist(), lines))
+                next_id += len(lines)
+        os.replace(f'{path}.numbered', path)
+
+    @staticmethod
+    def merge_shards(table, shard_dirs, data_dir):
+        """Concatenate the shard CSVs in shard order, keeping the first header only."""
+        _clear_table_outputs(data_dir, table)
+        header_written = False
+        with open(csv_path(table, data_dir), 'w', newline='') as out:
+            for shard_dir in shard_dirs:
+                if not os.path.exists(csv_path(table, shard_dir)):
+                    continue
+                with open(csv_path(table, shard_dir), newline='') as f:
+                    header = f.readline()
+                    if not header_written:
+                        out.write(header)
+                        header_written = True
+                    shutil.copyfileobj(f, out, 16 * 1024 * 1024)
+
+
+class ParquetTableWriter:
+    """Writes each table as a Parquet dataset directory <data_dir>/<table>/.
+
+    Chunks are appended as row groups to one part file per table, or per
+    partition for the PARQUET_PARTITIONS tables (events by event_month,
+    feature_usage by feature_name). Categorical columns are stored
+    dictionary-encoded and dates as timestamps, so readers get typed columns.
+    """
+
+    def __init__(self, data_dir, shard=0):
+        if pq is None:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+        self.data_dir = data_dir
+        self.part_name = f'part-{shard:04d}.parquet'
+        self.writers = {}
+        self.row_counts = {}
+        self.part_rows = {}
+
+    def write(self, table, df):
+        if table not in self.part_rows:
+            _clear_table_outputs(self.data_dir, table)
+            self.part_rows[table] = {}
+        table_dir = parquet_path(table, self.data_dir)
+
+        partition = PARQUET_PARTITIONS.get(table)
+        if partition is None:
+            self._append(table, os.path.join(table_dir, self.part_name), df)
+        else:
+            if partition in df.columns:
+                keys = df[partition]
+                df = df.drop(columns=partition)
+            else:
+                keys = pd.Series(df['event_timestamp'].to_numpy().astype('datetime64[M]').astype(str),
+                                 index=df.index)
+            for key, part in df.groupby(keys, observed=True, sort=False):
+                self._append(table, os.path.join(table_dir, f'{partition}={key}', self.part_name), part)
+        self.row_counts[table] = self.row_counts.get(table, 0) + len(df)
+
+    def _append(self, table, path, df):
+        arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+        writer = self.writers.get(path)
+        if writer is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            writer = pq.ParquetWriter(path, arrow_table.schema, compression='zstd')
+            self.writers[path] = writer
+            self.part_rows[table][path] = 0
+        writer.write_table(arrow_table)
+        self.part_rows[table][path] += len(df)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+    @staticmethod
+    def number_part(job):
+        """Process-pool entry point: prepend a dense id column to one shard part file."""
+        path, (column, prefix, width), first_id = job
+        next_id = first_id
+        writer = None
+        for batch in pq.ParquetFile(path).iter_batches():
+            df = batch.to_pandas()
+            df.insert(0, column, format_ids(prefix, np.arange(next_id, next_id + len(df)), width))
+            arrow_table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(f'{path}.numbered', arrow_table.schema, compression='zstd')
+            writer.write_table(arrow_table)
+            next_id += len(df)
+        if writer is not None:
+            writer.close()
+            os.replace(f'{path}.numbered', path)
+
+    @staticmethod
+    def merge_shards(table, shard_dirs, data_dir):
+        """Move every shard's part files into the final dataset directory."""
+        _clear_table_outputs(data_dir, table)
+        for shard_dir in shard_dirs:
+            shard_table_dir = parquet_path(table, shard_dir)
+            for root, _, files in os.walk(shard_table_dir):
+                target_dir = os.path.join(parquet_path(table, data_dir), os.path.relpath(root, shard_table_dir))
+                os.makedirs(target_dir, exist_ok=True)
+                for name in files:
+                    os.replace(os.path.join(root, name), os.path.join(target_dir, name))
+
+
+TABLE_WRITERS = {
+    'csv': CsvTableWriter,
+    'parquet': ParquetTableWriter,
+}
 
-events_df.to_csv(os.path.join(DATA_DIR, 'events.csv'), index=False)
-print("   ✅ events.csv")
 
-print()
-print("=" * 70)
-print("✅ DATA GENERATION COMPLETE!")
-print("=" * 70)
-print()
-print("📊 Summary:")
-print(f"   - {len(users_df):,} users")
-print(f"   - {len(subscriptions_df):,} workspaces")
-print(f"   - {len(events_df):,} events")
-print(f"   - {len(feature_df):,} feature usage records")
-print(f"   - {len(ab_test_df):,} A/B test participants")
-print()
+def generate_user_range(writer, rng, email_pool, first_user, last_user, total_users,
+                        num_workspaces, chunk_size=None, with_ids=True):
+    """Generate users first_user..last_user in chunks, appending every table to writer.
+
+    Returns the merged workspace aggregates for the range. With with_ids=False
+    the SHARD_RENUMBERED_IDS columns are left out for the merge step to fill.
+    """
+    chunk_size = chunk_size or (last_user - first_user + 1)
+    workspaces = None
+    next_usage_id = next_event_id = 1
+
+    for chunk_first in range(first_user, last_user + 1, chunk_size):
+        chunk_users = min(chunk_size, last_user - chunk_first + 1)
+        tables, event_blocks = generate_chunk(
+            rng, email_pool, chunk_first, chunk_users, total_users, num_workspaces,
+            next_usage_id, next_event_id)
+
+        for table, df in tables.items():
+            if not with_ids and table in SHARD_RENUMBERED_IDS:
+                df = df.drop(columns=SHARD_RENUMBERED_IDS[table][0])
+            writer.write(table, df)
+        chunk_events = 0
+        for block in event_blocks:
+            if not with_ids:
+                block = block.drop(columns=SHARD_RENUMBERED_IDS['events'][0])
+            writer.write('events', block)
+            chunk_events += len(block)
+
+        workspaces = merge_workspace_aggregates(workspaces, aggregate_workspaces(tables['users']))
+        next_usage_id += len(tables['feature_usage'])
+        next_event_id += chunk_events
+
+        chunk_last = chunk_first + chunk_users - 1
+        print(f"   ✅ Users {chunk_first:,}-{chunk_last:,}: "
+              f"{len(tables['feature_usage']):,} feature usage records, {chunk_events:,} events")
+
+    return workspaces
+
+
+def _generate_shard(job):
+    """Process-pool entry point: generate one shard's user range into its own directory."""
+    (shard, shard_dir, file_format, seed_sequence, seed, first_user, last_user, total_users,
+     num_workspaces, chunk_size) = job
+    os.makedirs(shard_dir, exist_ok=True)
+    email_pool = build_email_pool(min(EMAIL_POOL_SIZE, total_users), seed)
+    # Parquet part files are named by shard so merge_shards can move them side by side
+    writer = ParquetTableWriter(shard_dir, shard) if file_format == 'parquet' else \
+        TABLE_WRITERS[file_format](shard_dir)
+    try:
+        workspaces = generate_user_range(
+            writer, np.random.default_rng(seed_sequence), email_pool, first_user, last_user,
+            total_users, num_workspaces, chunk_size, with_ids=False)
+    finally:
+        writer.close()
+    return writer.row_counts, writer.part_rows, workspaces
+
+
+def generate_dataset(data_dir, num_users=NUM_USERS, num_workspaces=NUM_WORKSPACES, seed=SEED,
+                     chunk_size=None, shards=1, workers=None, file_format='csv'):
+    """Generate all seven tables into data_dir as CSV files or Parquet datasets.
+
+    Users are split into `shards` contiguous ranges, each with an independent
+    Generator spawned from SeedSequence(seed), and generated chunk_size users
+    at a time. With more than one shard the ranges run in a process pool and
+    are merged in shard order, so the output is byte-identical for a given
+    seed, shard count and chunk size, whatever the number of workers. Peak
+    memory per process depends on chunk_size (plus one row per workspace), not
+    on num_users. Returns row counts per table.
+    """
+    writer_class = TABLE_WRITERS[file_format]
+    seed_sequences = np.random.SeedSequence(seed).spawn(shards + 1)
+    bounds = np.linspace(1, num_users + 1, shards + 1).astype(np.int64)
+    ranges = [(int(first), int(end) - 1) for first, end in zip(bounds[:-1], bounds[1:]) if end > first]
+
+    if shards == 1:
+        email_pool = build_email_pool(min(EMAIL_POOL_SIZE, num_users), seed)
+        writer = writer_class(data_dir)
+        try:
+            workspaces = generate_user_range(
+                writer, np.random.default_rng(seed_sequences[0]), email_pool, 1, num_users,
+                num_users, num_workspaces, chunk_size)
+        finally:
+            writer.close()
+        row_counts = writer.row_counts
+    else:
+        shard_root = os.path.join(data_dir, '_shards')
+        shard_dirs = [os.path.join(shard_root, f'shard_{shard:04d}') for shard in range(len(ranges))]
+        jobs = [
+            (shard, shard_dir, file_format, seed_sequences[shard], seed, first, last, num_users,
+             num_workspaces, chunk_size)
+            for shard, (shard_dir, (first, last)) in enumerate(zip(shard_dirs, ranges))
+        ]
+        with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(_generate_shard, jobs))
+
+            row_counts = {}
+            workspaces = None
+            numbering_jobs = []
+            for shard_counts, shard_parts, shard_workspaces in results:
+                for table, num_rows in shard_counts.items():
+                    if table in SHARD_RENUMBERED_IDS:
+                        next_id = row_counts.get(table, 0) + 1
+                        for path, part_rows in shard_parts[table].items():
+                            numbering_jobs.append((path, SHARD_RENUMBERED_IDS[table], next_id))
+                            next_id += part_rows
+                    row_counts[table] = row_counts.get(table, 0) + num_rows
+                workspaces = merge_workspace_aggregates(workspaces, shard_workspaces)
+
+            # Dense ids are filled in per part file, in parallel, once every offset is known
+            print("   🔗 Merging shards...")
+            list(pool.map(writer_class.number_part, numbering_jobs))
+
+        for table in row_counts:
+            writer_class.merge_shards(table, shard_dirs, data_dir)
+        shutil.rmtree(shard_root)
+
+    writer = writer_class(data_dir)
+    try:
+        writer.write('subscriptions', generate_subscriptions(np.random.default_rng(seed_sequences[-1]), workspaces))
+    finally:
+        writer.close()
+    row_counts['subscriptions'] = len(workspaces)
+    return row_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the TaskFlow synthetic dataset.")
+    parser.add_argument('--users', type=int, default=NUM_USERS, help="number of users")
+    parser.add_argument('--workspaces', type=int, default=NUM_WORKSPACES, help="number of workspaces")
+    parser.add_argument('--seed', type=int, default=SEED, help="random seed")
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help="stream users in chunks of this size (default: one chunk)")
+    parser.add_argument('--shards', type=int, default=1,
+                        help="split users into this many independently seeded shards")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="processes used for shards (default: one per shard, up to the CPU count)")
+    parser.add_argument('--format', choices=sorted(TABLE_WRITERS), default='csv',
+                        help="csv files or typed, partitioned Parquet datasets")
+    parser.add_argument('--output-dir', default=DATA_DIR, help="directory for the generated tables")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    print("=" * 70)
+    print("TASKFLOW ANALYTICS - DATA GENERATION")
+    print("=" * 70)
+    print()
+
+    print("📊 Configuration:")
+    print(f"   Users: {args.users:,}")
+    print(f"   Workspaces: {args.workspaces:,}")
+    print(f"   Date Range: {START_DATE.date()} to {END_DATE.date()}")
+    print(f"   Format: {args.format}")
+    print(f"   Shards: {args.shards:,}")
+    print(f"   Chunk Size: {args.chunk_size or args.users // args.shards:,} users")
+    print()
+
+    print("🔨 Generating tables...")
+    started = time.perf_counter()
+    row_counts = generate_dataset(args.output_dir, args.users, args.workspaces, args.seed,
+                                  args.chunk_size, args.shards, args.workers, args.format)
+    elapsed = time.perf_counter() - started
+
+    print()
+    print(f"💾 Saved {args.format} tables:")
+    for table, num_rows in row_counts.items():
+        print(f"   ✅ {table} ({num_rows:,} rows)")
+
+    print()
+    print("=" * 70)
+    print("✅ DATA GENERATION COMPLETE!")
+    print("=" * 70)
+    print()
+    print("📊 Summary:")
+    print(f"   - {row_counts['users']:,} users")
+    print(f"   - {row_counts['subscriptions']:,} workspaces")
+    print(f"   - {row_counts['events']:,} events ({row_counts['events'] / elapsed:,.0f} events/sec overall)")
+    print(f"   - {row_counts['feature_usage']:,} feature usage records")
+    print(f"   - {row_counts['ab_test_assignments']:,} A/B test participants")
+    print(f"   - {elapsed:.1f}s total")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+=================================================================
+TaskFlow Analytics - Shared Table Loader
+=================================================================
+Reads the tables written by data_generation.py in either format:
+  - CSV:     data/<table>.csv
+  - Parquet: data/<table>/  (dataset directory, hive-partitioned for
+             events by event_month and feature_usage by feature_name)
+When both exist for a table, the Parquet dataset is used.
+
+Tables are returned with the dtypes declared in TABLE_SCHEMAS and are
+served from a memory-mapped columnar cache under data/.cache, so the
+dashboard workers and analysis scripts share one copy of each table.
+=================================================================
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as pa_dataset
+
+# Paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'data')
+CACHE_DIR_NAME = '.cache'
+
+# Tier and variant values allowed by the CHECK constraints in sql/schema.sql
+PLAN_TIERS = ['free', 'starter', 'professional', 'enterprise']
+
+# Per-seat MRR by plan, shared by the generator and the analyses
+MRR_MAP = {'free': 0, 'starter': 10, 'professional': 25, 'enterprise': 50}
+
+# Typed schema per table, in sql/schema.sql column order. A column kind is
+# one of 'string', 'datetime', 'bool', 'int64', 'float64', 'category'
+# (categories taken from the data) or a list of allowed category values.
+TABLE_SCHEMAS = {
+    'users': {
+        'user_id': 'string', 'workspace_id': 'string', 'email': 'string',
+        'signup_date': 'datetime', 'account_tier': PLAN_TIERS,
+        'user_role': ['owner', 'admin', 'member', 'guest'], 'industry': 'category',
+        'team_size': 'int64', 'signup_source': ['organic', 'paid_search', 'referral', 'sales'],
+        'country': 'category', 'is_active': 'bool', 'last_login_date': 'datetime',
+    },
+    'user_activity_summary': {
+        'user_id': 'string', 'workspace_id': 'string', 'signup_date': 'datetime',
+        'days_since_signup': 'int64', 'total_sessions': 'int64', 'total_events': 'int64',
+        'avg_session_duration_min': 'float64', 'tasks_created': 'int64',
+        'tasks_completed': 'int64', 'boards_created': 'int64',
+        'premium_features_used': 'int64', 'last_active_date': 'datetime',
+        'is_power_user': 'bool', 'is_at_risk_churn': 'bool', 'cohort_month': 'category',
+    },
+    'onboarding_funnel': {
+        'user_id': 'string',
+        'step_1_completed': 'bool', 'step_1_timestamp': 'datetime',
+        'step_2_completed': 'bool', 'step_2_timestamp': 'datetime',
+        'step_3_completed': 'bool', 'step_3_timestamp': 'datetime',
+        'step_4_completed': 'bool', 'step_4_timestamp': 'datetime',
+        'onboarding_completed': 'bool', 'onboarding_completion_date': 'datetime',
+        'time_to_complete_hours': 'float64', 'ab_test_variant': 'category',
+    },
+    'feature_usage': {
+        'usage_id': 'string', 'user_id': 'string', 'feature_name': 'category',
+        'first_used_date': 'datetime', 'total_usage_count': 'int64',
+        'last_used_date': 'datetime', 'days_since_signup_at_first_use': 'int64',
+    },
+    'subscriptions': {
+        'subscription_id': 'string', 'workspace_id': 'string', 'plan_type': PLAN_TIERS,
+        'mrr': 'float64', 'start_date': 'datetime', 'end_date': 'datetime',
+        'is_active': 'bool', 'churn_date': 'datetime', 'churn_reason': 'category',
+    },
+    'ab_test_assignments': {
+        'user_id': 'string', 'test_name': 'category', 'variant': ['control', 'variant_a'],
+        'assignment_date': 'datetime', 'converted': 'bool', 'conversion_date': 'datetime',
+    },
+    'events': {
+        'event_id': 'string', 'user_id': 'string', 'event_name': 'category',
+        'event_timestamp': 'datetime', 'session_id': 'string', 'properties': 'string',
+    },
+}
+
+# Column order per table
+TABLE_COLUMNS = {table: list(schema) for table, schema in TABLE_SCHEMAS.items()}
+
+TABLES = list(TABLE_COLUMNS)
+
+# Hive partition column per Parquet dataset. event_month is derived from
+# event_timestamp and is not itself part of the events schema.
+PARQUET_PARTITIONS = {
+    'events': 'event_month',
+    'feature_usage': 'feature_name',
+}
+
+
+def csv_path(table, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f'{table}.csv')
+
+
+def parquet_path(table, data_dir=DATA_DIR):
+    return os.path.join(data_dir, table)
+
+
+def cache_path(table, data_dir=DATA_DIR):
+    return os.path.join(data_dir, CACHE_DIR_NAME, table)
+
+
+# ============================================================
+# TYPED LOADING
+# ============================================================
+
+STRING_DTYPE = pd.StringDtype('pyarrow')
+PLAIN_DTYPES = {'string': STRING_DTYPE, 'category': 'category',
+                'bool': 'bool', 'int64': 'int64', 'float64': 'float64'}
+
+
+def column_dtype(kind):
+    """Pandas dtype for a schema column kind (None for datetimes)."""
+    if isinstance(kind, list):
+        return pd.CategoricalDtype(kind)
+    return PLAIN_DTYPES.get(kind)
+
+
+def apply_schema(df, table):
+    """Cast the columns of df to the dtypes declared for table."""
+    schema = TABLE_SCHEMAS[table]
+    for column in df.columns:
+        kind = schema[column]
+        if kind == 'datetime':
+            if not pd.api.types.is_datetime64_dtype(df[column]):
+                df[column] = pd.to_datetime(df[column])
+        else:
+            df[column] = df[column].astype(column_dtype(kind))
+    return df
+
+
+def _csv_types(table, columns):
+    """(dtype, parse_dates) arguments for reading columns of a table CSV."""
+    schema = TABLE_SCHEMAS[table]
+    dtypes = {column: column_dtype(schema[column]) for column in columns
+              if schema[column] in ('string', 'category') or isinstance(schema[column], list)}
+    dates = [column for column in columns if schema[column] == 'datetime']
+    return dtypes, dates
+
+
+def _read_csv(table, path, columns, offset=0):
+    """Read a table CSV with schema dtypes, optionally from a byte offset."""
+    dtypes, dates = _csv_types(table, columns)
+    with open(path, 'rb') as f:
+        names = f.readline().decode().rstrip('\r\n').split(',')
+        if offset:
+            f.seek(offset)
+        return pd.read_csv(f, names=names, usecols=columns, dtype=dtypes, parse_dates=dates)[columns]
+
+
+def read_source(table, data_dir=DATA_DIR, columns=None):
+    """Read a table from its Parquet dataset or CSV file, with schema dtypes."""
+    columns = columns or TABLE_COLUMNS[table]
+    if os.path.isdir(parquet_path(table, data_dir)):
+        # Partition columns come back last; select restores schema order
+        df = pd.read_parquet(parquet_path(table, data_dir), columns=columns)[columns]
+    else:
+        df = _read_csv(table, csv_path(table, data_dir), columns)
+    return apply_schema(df, table)
+
+
+def read_appended(table, offsets, data_dir=DATA_DIR, columns=None):
+    """
+    Read only the rows a table gained since an earlier state of its files.
+    offsets maps each new or grown source file to the byte offset its new
+    rows start at: 0 for new files, the previous size for appended CSVs.
+    """
+    columns = columns or TABLE_COLUMNS[table]
+    frames = []
+    parquet_files = [path for path in offsets if path.endswith('.parquet')]
+    if parquet_files:
+        # Hive partition values are taken from the paths under the dataset root
+        dataset = pa_dataset.dataset(parquet_files, format='parquet', partitioning='hive',
+                                     partition_base_dir=parquet_path(table, data_dir))
+        frames.append(dataset.to_table(columns=columns).to_pandas())
+    for path, offset in offsets.items():
+        if path.endswith('.csv'):
+            frames.append(_read_csv(table, path, columns, offset))
+
+    if not frames:
+        return apply_schema(pd.DataFrame({column: [] for column in columns}), table)
+    return apply_schema(pd.concat(frames, ignore_index=True)[columns], table)
+
+
+def read_chunks(table, data_dir=DATA_DIR, columns=None, chunksize=100_000):
+    """Yield a table in chunks of up to chunksize rows, with schema dtypes."""
+    columns = columns or TABLE_COLUMNS[table]
+    if os.path.isdir(parquet_path(table, data_dir)):
+        dataset = pa_dataset.dataset(parquet_path(table, data_dir), format='parquet',
+                                     partitioning='hive')
+        for batch in dataset.to_batches(columns=columns, batch_size=chunksize):
+            if batch.num_rows:
+                yield apply_schema(batch.to_pandas(), table)
+        return
+
+    dtypes, dates = _csv_types(table, columns)
+    for chunk in pd.read_csv(csv_path(table, data_dir), usecols=columns, dtype=dtypes,
+                             parse_dates=dates, chunksize=chunksize):
+        yield apply_schema(chunk[columns], table)
+
+
+# ============================================================
+# MEMORY-MAPPED CACHE
+# ============================================================
+# One directory per table and source fingerprint holding a .npy file per
+# column: raw values for numbers, bools and datetimes, codes for
+# categoricals, and Arrow offsets/data (plus validity) buffers for
+# strings. Loading maps the files read-only, so the OS page cache holds
+# a single copy however many processes read the table.
+
+def source_files(table, data_dir=DATA_DIR):
+    """Paths of the files a table is read from, in a stable order."""
+    root = parquet_path(table, data_dir)
+    if os.path.isdir(root):
+        return sorted(os.path.join(folder, name)
+                      for folder, _, names in os.walk(root) for name in names)
+    return [csv_path(table, data_dir)]
+
+
+def source_fingerprint(table, data_dir=DATA_DIR):
+    """Hash of the path, size and mtime of every source file of a table."""
+    digest = hashlib.sha1()
+    for path in source_files(table, data_dir):
+        stat = os.stat(path)
+        digest.update(f'{os.path.relpath(path, data_dir)}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return digest.hexdigest()[:16]
+
+
+def publish_directory(tmp_dir, target_dir):
+    """
+    Move a fully written tmp_dir into place as target_dir, then remove the
+    other versions next to it. Processes still mapping files of a removed
+    version keep their pages until they exit.
+    """
+    try:
+        os.replace(tmp_dir, target_dir)
+    except OSError:
+        # Another process published the same version first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    parent, version = os.path.split(target_dir)
+    for name in os.listdir(parent):
+        path = os.path.join(parent, name)
+        if os.path.isdir(path) and not name.startswith(version) and '.tmp-' not in name:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _write_cache(df, cache_dir):
+    """Write df column by column into cache_dir, atomically."""
+    tmp_dir = f'{cache_dir}.tmp-{os.getpid()}'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        stem = os.path.join(tmp_dir, column)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(f'{stem}.npy', values.cat.codes.to_numpy())
+            columns[column] = {'layout': 'category',
+                               'categories': values.cat.categories.tolist()}
+        elif isinstance(values.dtype, pd.StringDtype):
+            array = pa.array(values, from_pandas=True)
+            if isinstance(array, pa.ChunkedArray):
+                array = array.combine_chunks()
+            if array.offset:
+                array = pa.concat_arrays([array])
+            validity, offsets, data = array.buffers()
+            offset_dtype = np.int64 if pa.types.is_large_string(array.type) else np.int32
+            np.save(f'{stem}.offsets.npy', np.frombuffer(offsets, dtype=offset_dtype)[:len(array) + 1])
+            np.save(f'{stem}.data.npy', np.frombuffer(data, dtype=np.uint8))
+            if validity is not None and array.null_count:
+                np.save(f'{stem}.validity.npy', np.frombuffer(validity, dtype=np.uint8))
+            columns[column] = {'layout': 'string', 'large': offset_dtype is np.int64,
+                               'validity': bool(array.null_count)}
+        else:
+            np.save(f'{stem}.npy', values.to_numpy())
+            columns[column] = {'layout': 'array'}
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump({'rows': len(df), 'columns': columns}, f)
+
+    publish_directory(tmp_dir, cache_dir)
+
+
+def _map_array(path):
+    try:
+        # Plain ndarray view of the mapping, so results are not np.memmap
+        return np.asarray(np.load(path, mmap_mode='r'))
+    except ValueError:
+        # Zero-length arrays cannot be mapped
+        return np.load(path)
+
+
+def _read_cache(cache_dir, columns):
+    """Build a DataFrame whose columns are views of the mapped cache files."""
+    with open(os.path.join(cache_dir, 'meta.json')) as f:
+        meta = json.load(f)
+    data = {}
+    for column in columns:
+        info = meta['columns'][column]
+        stem = os.path.join(cache_dir, column)
+        if info['layout'] == 'category':
+            data[column] = pd.Categorical.from_codes(
+                _map_array(f'{stem}.npy'), dtype=pd.CategoricalDtype(info['categories']))
+        elif info['layout'] == 'string':
+            buffers = [pa.py_buffer(_map_array(f'{stem}.validity.npy')) if info['validity'] else None,
+                       pa.py_buffer(_map_array(f'{stem}.offsets.npy')),
+                       pa.py_buffer(_map_array(f'{stem}.data.npy'))]
+            array = pa.Array.from_buffers(pa.large_string() if info['large'] else pa.string(),
+                                          meta['rows'], buffers)
+            data[column] = pd.arrays.ArrowStringArray(pa.chunked_array([array]))
+        else:
+            data[column] = _map_array(f'{stem}.npy')
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+
+def load_table(table, data_dir=DATA_DIR, columns=None, cache=True):
+    """
+    Load one table with schema dtypes, from Parquet when available, else CSV.
+
+    With cache=True the table is read from its memory-mapped cache, which is
+    built on first use and rebuilt whenever the source files change. The
+    returned columns are read-only views of the cache files; assigning new
+    columns is fine, but copy before modifying values in place.
+    """
+    columns = columns or TABLE_COLUMNS[table]
+    if not cache:
+        return read_source(table, data_dir, columns)
+
+    cache_dir = os.path.join(cache_path(table, data_dir), source_fingerprint(table, data_dir))
+    if not os.path.isdir(cache_dir):
+        df = read_source(table, data_dir)
+        try:
+            os.makedirs(cache_path(table, data_dir), exist_ok=True)
+            _write_cache(df, cache_dir)
+        except OSError:
+            # Read-only data directory: serve the table uncached
+            return df[columns]
+    return _read_cache(cache_dir, columns)
@@ -0,0 +1,216 @@
+"""
+=================================================================
+TaskFlow Analytics - Experiment Statistics Engine
+=================================================================
+Analyzes every A/B test, variant, segment and binary metric at once.
+Counts come from one bincount per metric over the assignment rows, and
+each statistic is a single array operation over all comparisons:
+  - conversion rates with Wilson score intervals
+  - absolute and relative lift vs the control, with a Newcombe
+    (Wilson-based) interval for the difference
+  - pooled two-proportion z-test and the Yates-corrected chi-square
+    test of scipy's chi2_contingency
+  - p-values adjusted for multiple testing (Holm, Bonferroni or
+    Benjamini-Hochberg), across all comparisons or within each test
+=================================================================
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from data_loader import DATA_DIR, load_table
+from funnel import NO_SEGMENT
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+ALPHA = 0.05
+CONTROL = 'control'
+ALL_USERS = 'All users'
+
+# Binary metrics per experiment user, and the table they come from
+EXPERIMENT_METRICS = {
+    'converted': 'ab_test_assignments',
+    'step_1_completed': 'onboarding_funnel',
+    'step_2_completed': 'onboarding_funnel',
+    'step_3_completed': 'onboarding_funnel',
+    'step_4_completed': 'onboarding_funnel',
+}
+
+# User attributes experiments can be segmented by
+EXPERIMENT_SEGMENTS = ['account_tier', 'signup_source', 'user_role']
+
+CORRECTIONS = ['holm', 'bonferroni', 'fdr_bh', 'none']
+
+# Comparison keys, besides the variant
+COMPARISON_KEYS = ['test_name', 'segment', 'metric']
+
+
+# ============================================================
+# COUNTS
+# ============================================================
+
+def experiment_counts(df, metrics, segment=None):
+    """
+    Users and conversions per (test_name, variant, segment, metric) from
+    one row per assigned user. metrics are boolean columns of df; segment
+    an optional column to split by (every user is in 'All users' too).
+    """
+    segments = [ALL_USERS] if segment is None else [ALL_USERS, segment]
+    frames = []
+    for name in segments:
+        keys = df[['test_name', 'variant']].assign(
+            segment=ALL_USERS if name == ALL_USERS else
+            df[name].astype(object).fillna(NO_SEGMENT).astype(str))
+        codes, groups = pd.factorize(pd.MultiIndex.from_frame(keys), sort=True)
+        users = np.bincount(codes, minlength=len(groups))
+        # One bincount per metric, stacked: groups x metrics
+        conversions = np.column_stack([
+            np.bincount(codes, weights=df[metric].to_numpy(dtype=float), minlength=len(groups))
+            for metric in metrics])
+        frame = groups.to_frame(index=False, name=list(keys.columns)).loc[np.repeat(np.arange(len(groups)), len(metrics))]
+        frames.append(frame.assign(metric=np.tile(metrics, len(groups)),
+                                   users=np.repeat(users, len(metrics)),
+                                   conversions=conversions.ravel().astype(np.int64)))
+    return pd.concat(frames, ignore_index=True)
+
+
+# ============================================================
+# STATISTICS
+# ============================================================
+
+def wilson_interval(successes, n, alpha=ALPHA):
+    """Wilson score interval for binomial proportions (arrays)."""
+    z = stats.norm.ppf(1 - alpha / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = successes / n
+        denominator = 1 + z ** 2 / n
+        center = (p + z ** 2 / (2 * n)) / denominator
+        half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denominator
+    return center - half_width, center + half_width
+
+
+def adjust_pvalues(p_values, method='holm', groups=None):
+    """
+    Adjust p-values for multiple testing, within each group if groups
+    (one label per p-value) is given. method is one of CORRECTIONS.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    if method not in CORRECTIONS:
+        raise ValueError(f"Unknown correction {method!r}; expected one of {CORRECTIONS}")
+    if method == 'none' or not len(p_values):
+        return p_values
+
+    group_codes = np.zeros(len(p_values), dtype=np.int64) if groups is None else pd.factorize(groups)[0]
+    order = np.lexsort((p_values, group_codes))
+    sorted_groups = group_codes[order]
+    sizes = np.bincount(sorted_groups)
+    m = sizes[sorted_groups]
+    rank = np.arange(len(order)) - (np.cumsum(sizes) - sizes)[sorted_groups] + 1
+    p = p_values[order]
+
+    # Offsetting each group by 2 keeps running max/min from crossing groups
+    offset = 2.0 * sorted_groups
+    if method == 'bonferroni':
+        adjusted = np.minimum(1, m * p)
+    elif method == 'holm':
+        adjusted = np.maximum.accumulate(np.minimum(1, (m - rank + 1) * p) + offset) - offset
+    else:
+        stepped = np.minimum(1, m / rank * p)
+        adjusted = np.minimum.accumulate((stepped + offset)[::-1])[::-1] - offset
+
+    result = np.empty_like(p_values)
+    result[order] = adjusted
+    return result
+
+
+def compare_variants(counts, control=CONTROL, alpha=ALPHA, correction='holm', family=None):
+    """
+    Compare every variant with the control of its comparison group.
+
+    counts has test_name, variant, users and conversions columns, plus
+    optional segment and metric columns. Returns one row per variant and
+    group. family ('test_name', ...) corrects p-values within each family
+    instead of across all comparisons.
+    """
+    keys = [column for column in COMPARISON_KEYS if column in counts.columns]
+    controls = counts[counts['variant'].astype(str) == control]
+    variants = counts[counts['variant'].astype(str) != control]
+    df = variants.merge(controls.drop(columns='variant'), on=keys, suffixes=('', '_control'))
+
+    n1, x1 = df['users'].to_numpy(dtype=float), df['conversions'].to_numpy(dtype=float)
+    n0, x0 = df['users_control'].to_numpy(dtype=float), df['conversions_control'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p1, p0 = x1 / n1, x0 / n0
+        lift = p1 - p0
+        relative_lift = lift / p0
+
+        # Pooled two-proportion z-test (equivalent to the uncorrected chi-square)
+        pooled = (x0 + x1) / (n0 + n1)
+        z = lift / np.sqrt(pooled * (1 - pooled) * (1 / n0 + 1 / n1))
+        p_value = 2 * stats.norm.sf(np.abs(z))
+
+        # Yates-corrected chi-square, as chi2_contingency reports for 2x2 tables
+        total = n0 + n1
+        cross = np.abs(x1 * (n0 - x0) - x0 * (n1 - x1))
+        chi2 = total * np.maximum(cross - total / 2, 0) ** 2 / (n0 * n1 * (x0 + x1) * (total - x0 - x1))
+        chi2_p_value = stats.chi2.sf(chi2, 1)
+
+    low1, high1 = wilson_interval(x1, n1, alpha)
+    low0, high0 = wilson_interval(x0, n0, alpha)
+    # Newcombe hybrid score interval for p1 - p0
+    lift_lower = lift - np.sqrt((p1 - low1) ** 2 + (high0 - p0) ** 2)
+    lift_upper = lift + np.sqrt((high1 - p1) ** 2 + (p0 - low0) ** 2)
+
+    p_value = np.nan_to_num(p_value, nan=1.0)
+    p_adjusted = adjust_pvalues(p_value, correction, None if family is None else df[family])
+
+    result = df[keys + ['variant']].assign(
+        users=n1.astype(np.int64), conversions=x1.astype(np.int64), conversion_rate=p1,
+        ci_lower=low1, ci_upper=high1,
+        control_users=n0.astype(np.int64), control_conversions=x0.astype(np.int64),
+        control_rate=p0, control_ci_lower=low0, control_ci_upper=high0,
+        lift=lift, lift_ci_lower=lift_lower, lift_ci_upper=lift_upper, relative_lift=relative_lift,
+        z_stat=z, p_value=p_value, chi2=chi2, chi2_p_value=chi2_p_value, p_adjusted=p_adjusted,
+        significant=p_adjusted < alpha,
+    )
+    return result
+
+
+# ============================================================
+# LOADING
+# ============================================================
+
+def load_experiments(metrics=None, segment=None, data_dir=DATA_DIR):
+    """One row per assigned user: test, variant, the metrics and the segment."""
+    metrics = list(metrics or EXPERIMENT_METRICS)
+    unknown = set(metrics) - set(EXPERIMENT_METRICS)
+    if unknown:
+        raise ValueError(f"Unknown experiment metrics {sorted(unknown)}; "
+                         f"expected some of {list(EXPERIMENT_METRICS)}")
+    if segment is not None and segment not in EXPERIMENT_SEGMENTS:
+        raise ValueError(f"Unknown experiment segment {segment!r}; "
+                         f"expected one of {EXPERIMENT_SEGMENTS}")
+
+    assignment_metrics = [m for m in metrics if EXPERIMENT_METRICS[m] == 'ab_test_assignments']
+    df = load_table('ab_test_assignments', data_dir,
+                    columns=['user_id', 'test_name', 'variant'] + assignment_metrics)
+    funnel_metrics = [m for m in metrics if EXPERIMENT_METRICS[m] == 'onboarding_funnel']
+    if funnel_metrics:
+        onboarding = load_table('onboarding_funnel', data_dir, columns=['user_id'] + funnel_metrics)
+        onboarding = onboarding.set_index('user_id').reindex(df['user_id'])
+        df = df.assign(**{m: onboarding[m].fillna(False).to_numpy(dtype=bool) for m in funnel_metrics})
+    if segment is not None:
+        users = load_table('users', data_dir, columns=['user_id', segment])
+        df = df.assign(**{segment: df['user_id'].map(users.set_index('user_id')[segment])})
+    return df
+
+
+def experiment_results(metrics=None, segment=None, correction='holm', family=None,
+                       data_dir=DATA_DIR):
+    """Every variant vs control, per test, segment and metric."""
+    df = load_experiments(metrics, segment, data_dir)
+    counts = experiment_counts(df, list(metrics or EXPERIMENT_METRICS), segment)
+    return compare_variants(counts, correction=correction, family=family)
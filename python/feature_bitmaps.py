@@ -0,0 +1,130 @@
+"""
+=================================================================
+TaskFlow Analytics - Feature Adoption Bitmap Index
+=================================================================
+Indexes users as bit positions and keeps one packed bitmap (uint64
+words, one bit per user) per feature, per account tier and for the
+users retained 30 days after signup. Adoption, retention lift and
+feature co-adoption then come from AND + popcount over those words,
+so any slice of the user base is answered without touching the raw
+tables again:
+  - feature_retention(): adopters, adoption rate, 30-day retention of
+                         adopters vs non-adopters and their ratio (the
+                         retention lift of sql/01_power_feature_paradox.sql)
+  - co_adoption():       users adopting both features, for every pair
+=================================================================
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, load_table
+
+# Users retained 30+ days after signup, as in sql/01_power_feature_paradox.sql
+RETENTION_DAYS = 30
+
+
+# ============================================================
+# BITMAPS
+# ============================================================
+
+def pack(mask):
+    """Pack boolean rows (last axis = users) into uint64 words."""
+    mask = np.atleast_2d(mask)
+    padding = -mask.shape[-1] % 64
+    if padding:
+        mask = np.pad(mask, [(0, 0), (0, padding)])
+    return np.packbits(mask, axis=-1, bitorder='little').view(np.uint64)
+
+
+def popcount(words):
+    """Set bits per bitmap (summed over the last axis)."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    # NumPy < 2.0
+    return np.unpackbits(words.view(np.uint8), axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def build_index(data_dir=DATA_DIR):
+    """
+    Bitmap index over all users:
+      universe  - every user
+      retained  - active 30+ days after signup
+      features  - {feature_name: adopters}
+      tiers     - {account_tier: users on that tier}
+    """
+    users = load_table('users', data_dir, columns=['user_id', 'account_tier'])
+    activity = load_table('user_activity_summary', data_dir,
+                          columns=['user_id', 'signup_date', 'last_active_date', 'days_since_signup'])
+    usage = load_table('feature_usage', data_dir, columns=['user_id', 'feature_name'])
+    user_index = pd.Index(users['user_id'])
+    n = len(user_index)
+
+    # Rows for user_ids missing from users get -1 (which would index the last
+    # user), so they are dropped rather than counted
+    retained = np.zeros(n, dtype=bool)
+    position = user_index.get_indexer(activity['user_id'])
+    known = position >= 0
+    retained[position[known]] = ((activity['days_since_signup'] >= RETENTION_DAYS) &
+                                 (activity['last_active_date'] >=
+                                  activity['signup_date'] + pd.Timedelta(days=RETENTION_DAYS))).to_numpy()[known]
+
+    # One users x features matrix, packed row-wise
+    codes, feature_names = pd.factorize(usage['feature_name'], sort=True)
+    adopted = np.zeros((len(feature_names), n), dtype=bool)
+    position = user_index.get_indexer(usage['user_id'])
+    known = position >= 0
+    adopted[codes[known], position[known]] = True
+
+    tier_codes, tier_names = pd.factorize(users['account_tier'], sort=True)
+    on_tier = np.zeros((len(tier_names), n), dtype=bool)
+    on_tier[tier_codes, np.arange(n)] = True
+
+    return {
+        'universe': pack(np.ones(n, dtype=bool))[0],
+        'retained': pack(retained)[0],
+        'features': dict(zip(map(str, feature_names), pack(adopted))),
+        'tiers': dict(zip(map(str, tier_names), pack(on_tier))),
+    }
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def feature_retention(index, within=None):
+    """
+    Per feature: adopters, adoption rate, 30-day retention of adopters and
+    of non-adopters, and retention lift (their ratio). within is an
+    optional bitmap restricting the users considered, e.g. a tier.
+    """
+    scope = index['universe'] if within is None else index['universe'] & within
+    names = list(index['features'])
+    adopters = np.stack([index['features'][name] for name in names]) & scope
+    others = ~adopters & scope
+    retained = index['retained']
+
+    n_adopters = popcount(adopters)
+    n_others = popcount(others)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        adopter_retention = popcount(adopters & retained) / n_adopters
+        baseline_retention = popcount(others & retained) / n_others
+        result = pd.DataFrame({
+            'feature_name': names,
+            'adopters': n_adopters,
+            'adoption_rate': n_adopters / popcount(scope),
+            'retention_rate': adopter_retention,
+            'baseline_retention_rate': baseline_retention,
+            'retention_lift': adopter_retention / baseline_retention,
+        })
+    return result.sort_values('retention_lift', ascending=False, ignore_index=True)
+
+
+def co_adoption(index, within=None):
+    """Users adopting both features of every pair (diagonal: adopters)."""
+    scope = index['universe'] if within is None else index['universe'] & within
+    names = list(index['features'])
+    adopters = np.stack([index['features'][name] for name in names]) & scope
+    # One AND + popcount of each feature against all features at once
+    both = np.stack([popcount(adopters[i] & adopters) for i in range(len(names))])
+    return pd.DataFrame(both, index=names, columns=names)
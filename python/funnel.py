@@ -0,0 +1,121 @@
+"""
+=================================================================
+TaskFlow Analytics - Funnel Engine
+=================================================================
+Computes a funnel of any number of ordered steps in one pass over the
+rows: step counts, users reached, completion and drop-off rates,
+conversion from the start and the median time between consecutive
+steps, optionally split by a segment column (tier, signup source,
+A/B variant, ...).
+
+The SQL counterpart is sql/02_onboarding_cliff.sql.
+=================================================================
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, load_table
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Onboarding steps: (completed flag, completion timestamp, label)
+ONBOARDING_STEPS = [
+    ('step_1_completed', 'step_1_timestamp', 'Step 1: Team Setup'),
+    ('step_2_completed', 'step_2_timestamp', 'Step 2: Invite Members'),
+    ('step_3_completed', 'step_3_timestamp', 'Step 3: Create Board'),
+    ('step_4_completed', 'step_4_timestamp', 'Step 4: Create Task'),
+]
+
+# Segment columns the onboarding funnel can be split by, and their table
+ONBOARDING_SEGMENTS = {
+    'account_tier': 'users',
+    'signup_source': 'users',
+    'user_role': 'users',
+    'ab_test_variant': 'onboarding_funnel',
+}
+
+ALL_USERS = 'All users'
+NO_SEGMENT = '(none)'
+
+
+def funnel_metrics(df, steps, names=None, timestamps=None, segment=None):
+    """
+    Funnel metrics per segment and step, from one pass over df.
+
+    steps are boolean completion columns in funnel order; names label them
+    (default: the column names). timestamps, if given, are the matching
+    completion time columns, used for the median hours from the previous
+    step. segment is an optional column to split by; rows without a value
+    are reported as '(none)'.
+
+    A step is reached by the users who completed the previous one (every
+    user reaches the first step).
+    """
+    names = names or list(steps)
+    k = len(steps)
+
+    if segment is None:
+        codes, labels = np.zeros(len(df), dtype=np.intp), [ALL_USERS]
+    else:
+        codes, uniques = pd.factorize(df[segment], sort=True)
+        labels = [str(label) for label in uniques]
+        if (codes < 0).any():
+            codes = np.where(codes < 0, len(labels), codes)
+            labels.append(NO_SEGMENT)
+    g = len(labels)
+
+    # Every (segment, step) completion count from one bincount over the
+    # True cells of the users x steps completion matrix
+    completed = np.column_stack([df[step].to_numpy(dtype=bool) for step in steps])
+    rows, cols = np.nonzero(completed)
+    counts = np.bincount(codes[rows] * k + cols, minlength=g * k).reshape(g, k)
+    sizes = np.bincount(codes, minlength=g)
+    reached = np.column_stack([sizes, counts[:, :-1]])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        completion_rate = counts / reached
+        conversion = counts / sizes[:, None]
+
+    result = pd.DataFrame({
+        'segment': np.repeat(labels, k),
+        'step_number': np.tile(np.arange(1, k + 1), g),
+        'step_name': np.tile(names, g),
+        'users_reached': reached.ravel(),
+        'users_completed': counts.ravel(),
+        'completion_rate': completion_rate.ravel(),
+        'drop_off_rate': 1 - completion_rate.ravel(),
+        'conversion_from_start': conversion.ravel(),
+    })
+
+    if timestamps is not None:
+        # Hours between consecutive step timestamps; NaN unless both are set
+        times = [df[column] for column in timestamps]
+        hours = pd.DataFrame({j: (times[j] - times[j - 1]).dt.total_seconds().to_numpy() / 3600
+                              for j in range(1, k)})
+        medians = hours.groupby(codes).median().reindex(range(g))
+        median_hours = np.column_stack([np.full(g, np.nan), medians.to_numpy()])
+        result['median_hours_from_previous'] = median_hours.ravel()
+
+    return result
+
+
+def onboarding_funnel(segment=None, data_dir=DATA_DIR):
+    """The onboarding funnel from onboarding_funnel, optionally segmented."""
+    if segment is not None and segment not in ONBOARDING_SEGMENTS:
+        raise ValueError(f"Unknown onboarding segment {segment!r}; "
+                         f"expected one of {sorted(ONBOARDING_SEGMENTS)}")
+
+    flags, times, names = (list(column) for column in zip(*ONBOARDING_STEPS))
+    columns = ['user_id'] + flags + times
+    if ONBOARDING_SEGMENTS.get(segment) == 'onboarding_funnel':
+        columns.append(segment)
+    df = load_table('onboarding_funnel', data_dir, columns=columns)
+
+    if ONBOARDING_SEGMENTS.get(segment) == 'users':
+        users = load_table('users', data_dir, columns=['user_id', segment])
+        df = df.assign(**{segment: df['user_id'].map(users.set_index('user_id')[segment])})
+
+    return funnel_metrics(df, flags, names=names, timestamps=times, segment=segment)
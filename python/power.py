@@ -0,0 +1,156 @@
+"""
+=================================================================
+TaskFlow Analytics - Power & Sample-Size Planner
+=================================================================
+Answers how many users an experiment needs and how long it has to run,
+for conversion rates (two proportions) and for means, with equal
+allocation between control and variant. Every function broadcasts over
+arrays of baseline, minimum detectable effect (MDE, absolute), alpha,
+power and sample size, so a whole planning grid is one call:
+  - sample_size_proportions() / sample_size_means(): users per arm
+  - power_proportions():      power of a given design
+  - mde_proportions():        smallest detectable lift for a sample size
+  - days_to_significance():   users per arm / daily traffic per arm
+
+planning_grid() precomputes users per arm over baseline x MDE x alpha x
+power and stores it under data/.cache/power/, so the dashboard reads
+"days to significance" curves from the stored grid instead of solving
+them on every rerun.
+=================================================================
+"""
+
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from data_loader import CACHE_DIR_NAME, DATA_DIR, publish_directory
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Bump when the grid definition or formulas change so stored grids are rebuilt
+PLANNER_VERSION = 1
+
+# Default planning grid
+BASELINES = np.round(np.arange(0.01, 1.0, 0.01), 2)
+MDES = np.round(np.arange(0.005, 0.3001, 0.005), 3)
+ALPHAS = np.array([0.01, 0.05, 0.10])
+POWERS = np.array([0.80, 0.90])
+
+DAYS_PER_MONTH = 30
+
+
+def _z(alpha, power, two_sided=True):
+    z_alpha = stats.norm.ppf(1 - np.asarray(alpha) / (2 if two_sided else 1))
+    return z_alpha, stats.norm.ppf(np.asarray(power))
+
+
+# ============================================================
+# PROPORTIONS AND MEANS
+# ============================================================
+
+def sample_size_proportions(baseline, mde, alpha=0.05, power=0.80, two_sided=True):
+    """
+    Users per arm to detect an absolute lift of mde over a baseline rate
+    with a two-proportion z-test. NaN where baseline + mde is not a rate.
+    """
+    baseline, mde = np.asarray(baseline, dtype=float), np.asarray(mde, dtype=float)
+    z_alpha, z_power = _z(alpha, power, two_sided)
+    variant = baseline + mde
+    pooled = baseline + mde / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n = ((z_alpha * np.sqrt(2 * pooled * (1 - pooled)) +
+              z_power * np.sqrt(baseline * (1 - baseline) + variant * (1 - variant))) / mde) ** 2
+    return np.where((variant > 0) & (variant < 1) & (mde != 0), np.ceil(n), np.nan)
+
+
+def power_proportions(baseline, mde, n, alpha=0.05, two_sided=True):
+    """Power of a two-proportion z-test with n users per arm."""
+    baseline, mde, n = (np.asarray(x, dtype=float) for x in (baseline, mde, n))
+    z_alpha = _z(alpha, 0.5, two_sided)[0]
+    variant = baseline + mde
+    pooled = baseline + mde / 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = ((np.abs(mde) * np.sqrt(n) - z_alpha * np.sqrt(2 * pooled * (1 - pooled))) /
+             np.sqrt(baseline * (1 - baseline) + variant * (1 - variant)))
+    return stats.norm.cdf(z)
+
+
+def mde_proportions(baseline, n, alpha=0.05, power=0.80, two_sided=True, iterations=50):
+    """
+    Smallest absolute lift over baseline detectable with n users per arm
+    (bisection on the power curve, vectorized over every input).
+    """
+    baseline, n = np.broadcast_arrays(np.asarray(baseline, dtype=float), np.asarray(n, dtype=float))
+    low, high = np.zeros(baseline.shape), 1 - baseline - 1e-9
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        enough = power_proportions(baseline, middle, n, alpha, two_sided) >= power
+        high = np.where(enough, middle, high)
+        low = np.where(enough, low, middle)
+    return np.where(power_proportions(baseline, high, n, alpha, two_sided) >= power, high, np.nan)
+
+
+def sample_size_means(sd, mde, alpha=0.05, power=0.80, two_sided=True):
+    """Users per arm to detect a difference of mde in means, given the metric's sd."""
+    z_alpha, z_power = _z(alpha, power, two_sided)
+    with np.errstate(divide='ignore'):
+        return np.ceil(2 * ((z_alpha + z_power) * np.asarray(sd, dtype=float) /
+                            np.asarray(mde, dtype=float)) ** 2)
+
+
+def days_to_significance(users_per_arm, monthly_signups, share_in_test=1.0, arms=2):
+    """Days until every arm has users_per_arm users, from monthly signups entering the test."""
+    daily_per_arm = monthly_signups * share_in_test / DAYS_PER_MONTH / arms
+    return np.ceil(np.asarray(users_per_arm, dtype=float) / daily_per_arm)
+
+
+# ============================================================
+# PLANNING GRID
+# ============================================================
+
+def compute_grid(baselines=BASELINES, mdes=MDES, alphas=ALPHAS, powers=POWERS):
+    """Users per arm for every (baseline, mde, alpha, power), as a long DataFrame."""
+    b, m, a, p = np.meshgrid(baselines, mdes, alphas, powers, indexing='ij')
+    return pd.DataFrame({
+        'baseline': b.ravel(), 'mde': m.ravel(), 'alpha': a.ravel(), 'power': p.ravel(),
+        'users_per_arm': sample_size_proportions(b, m, a, p).ravel(),
+    })
+
+
+def grid_path(data_dir=DATA_DIR):
+    return os.path.join(data_dir, CACHE_DIR_NAME, 'power')
+
+
+def planning_grid(data_dir=DATA_DIR, baselines=BASELINES, mdes=MDES, alphas=ALPHAS, powers=POWERS):
+    """The planning grid, computed once and then read from data/.cache/power/."""
+    spec = repr([PLANNER_VERSION] + [np.asarray(x).round(6).tolist()
+                                     for x in (baselines, mdes, alphas, powers)])
+    key = hashlib.sha256(spec.encode()).hexdigest()[:16]
+    grid_dir = os.path.join(grid_path(data_dir), key)
+    grid_file = os.path.join(grid_dir, 'grid.parquet')
+    if os.path.exists(grid_file):
+        return pd.read_parquet(grid_file)
+
+    grid = compute_grid(baselines, mdes, alphas, powers)
+    tmp_dir = f'{grid_dir}.tmp-{os.getpid()}'
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+        grid.to_parquet(os.path.join(tmp_dir, 'grid.parquet'), index=False)
+        publish_directory(tmp_dir, grid_dir)
+    except OSError:
+        # Read-only data directory: serve the grid uncached
+        pass
+    return grid
+
+
+def days_curve(grid, baseline, monthly_signups, alpha=0.05, power=0.80, share_in_test=1.0):
+    """Users per arm and days to significance per MDE, at the grid baseline nearest to baseline."""
+    nearest = grid['baseline'].unique()[np.abs(grid['baseline'].unique() - baseline).argmin()]
+    curve = grid[(grid['baseline'] == nearest) & np.isclose(grid['alpha'], alpha) &
+                 np.isclose(grid['power'], power)].dropna(subset=['users_per_arm'])
+    return curve.assign(days=days_to_significance(curve['users_per_arm'], monthly_signups,
+                                                  share_in_test)).reset_index(drop=True)
@@ -0,0 +1,219 @@
+"""
+=================================================================
+TaskFlow Analytics - Resampling Confidence Intervals
+=================================================================
+Distribution-free intervals and tests for the difference between the
+variant and the control, for conversion flags and for continuous
+metrics such as time_to_complete_hours, where the normal approximation
+breaks down in small segments:
+  - bootstrap percentile intervals for the difference in mean or median
+  - permutation-test p-values for the same difference
+  - a streaming Poisson bootstrap over chunks of rows, which weights
+    each row by a Poisson(1) draw instead of materializing resamples
+
+Resamples are drawn a batch at a time as (resamples x users) index
+matrices and reduced along the rows. Batches of every segment are
+independent jobs, each with its own Generator spawned from
+SeedSequence(seed), so results depend on the seed but not on the number
+of workers. Jobs run in-process by default; pass workers > 1 (or None
+for one per CPU) to spread them over a process pool, from code behind
+an `if __name__ == "__main__":` guard.
+=================================================================
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, load_table
+from funnel import NO_SEGMENT
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+SEED = 42
+N_RESAMPLES = 10_000
+ALPHA = 0.05
+CONTROL, VARIANT = 'control', 'variant_a'
+ALL_USERS = 'All users'
+
+STATISTICS = {'mean': np.mean, 'median': np.median}
+
+# Cells per resampling batch (one int64 index matrix of ~32 MB)
+BATCH_CELLS = 4_000_000
+
+# Per-user metrics of onboarding A/B test users, and their table
+RESAMPLING_METRICS = {
+    'onboarding_completed': 'onboarding_funnel',
+    'time_to_complete_hours': 'onboarding_funnel',
+    'avg_session_duration_min': 'user_activity_summary',
+    'total_sessions': 'user_activity_summary',
+    'tasks_created': 'user_activity_summary',
+}
+
+
+# ============================================================
+# BATCHED RESAMPLING
+# ============================================================
+
+def _resample_batch(job):
+    """statistic(variant) - statistic(control) over one batch of resamples."""
+    kind, statistic, control, variant, size, seed_sequence = job
+    rng = np.random.default_rng(seed_sequence)
+    reduce = STATISTICS[statistic]
+    if kind == 'bootstrap':
+        control_draws = control[rng.integers(0, len(control), (size, len(control)))]
+        variant_draws = variant[rng.integers(0, len(variant), (size, len(variant)))]
+        return reduce(variant_draws, axis=1) - reduce(control_draws, axis=1)
+    # Permutation: shuffle the pooled values within each row
+    shuffled = rng.permuted(np.tile(np.concatenate([control, variant]), (size, 1)), axis=1)
+    return reduce(shuffled[:, len(control):], axis=1) - reduce(shuffled[:, :len(control)], axis=1)
+
+
+def resample_differences(groups, kinds=('bootstrap', 'permutation'), statistic='mean',
+                         n_resamples=N_RESAMPLES, seed=SEED, workers=1):
+    """
+    Resampled differences for every group and kind of resampling.
+
+    groups maps a key (e.g. a segment) to (control values, variant values).
+    workers > 1 runs the batches on a process pool (None: one per CPU).
+    Returns {(key, kind): array of n_resamples differences}.
+    """
+    if statistic not in STATISTICS:
+        raise ValueError(f"Unknown statistic {statistic!r}; expected one of {list(STATISTICS)}")
+
+    jobs, owners = [], []
+    for key, (control, variant) in groups.items():
+        control, variant = np.asarray(control, dtype=float), np.asarray(variant, dtype=float)
+        batch = max(1, BATCH_CELLS // (len(control) + len(variant)))
+        for kind in kinds:
+            for start in range(0, n_resamples, batch):
+                jobs.append((kind, statistic, control, variant, min(batch, n_resamples - start)))
+                owners.append((key, kind))
+    jobs = [job + (seed_sequence,)
+            for job, seed_sequence in zip(jobs, np.random.SeedSequence(seed).spawn(len(jobs)))]
+
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            batches = list(pool.map(_resample_batch, jobs))
+    else:
+        batches = [_resample_batch(job) for job in jobs]
+
+    differences = {}
+    for owner, values in zip(owners, batches):
+        differences.setdefault(owner, []).append(values)
+    return {owner: np.concatenate(values) for owner, values in differences.items()}
+
+
+def resampling_intervals(groups, statistic='mean', n_resamples=N_RESAMPLES, alpha=ALPHA,
+                         seed=SEED, workers=1):
+    """
+    Per group: the observed difference in the statistic (variant minus
+    control), its bootstrap percentile interval and permutation p-value.
+    """
+    groups = {key: (np.asarray(control, dtype=float), np.asarray(variant, dtype=float))
+              for key, (control, variant) in groups.items() if len(control) and len(variant)}
+    differences = resample_differences(groups, statistic=statistic, n_resamples=n_resamples,
+                                       seed=seed, workers=workers)
+    reduce = STATISTICS[statistic]
+    rows = []
+    for key, (control, variant) in groups.items():
+        observed = reduce(variant) - reduce(control)
+        bootstrap = differences[(key, 'bootstrap')]
+        permutation = differences[(key, 'permutation')]
+        lower, upper = np.quantile(bootstrap, [alpha / 2, 1 - alpha / 2])
+        extreme = np.count_nonzero(np.abs(permutation) >= np.abs(observed) - 1e-12)
+        rows.append({
+            'segment': key, 'control_users': len(control), 'users': len(variant),
+            f'control_{statistic}': reduce(control), f'variant_{statistic}': reduce(variant),
+            'difference': observed, 'ci_lower': lower, 'ci_upper': upper,
+            'p_value': (extreme + 1) / (len(permutation) + 1),
+        })
+    return pd.DataFrame(rows)
+
+
+# ============================================================
+# STREAMING POISSON BOOTSTRAP
+# ============================================================
+
+def poisson_bootstrap(chunks, value, group='variant', n_resamples=1000, alpha=ALPHA, seed=SEED,
+                      control=CONTROL, variant=VARIANT):
+    """
+    Bootstrap interval for the difference in means from an iterable of row
+    chunks, read once. Every row gets a Poisson(1) weight per resample and
+    only weighted sums and counts per resample are kept, so memory depends
+    on the chunk size, never on the number of rows.
+    """
+    rng = np.random.default_rng(seed)
+    sums = np.zeros((2, n_resamples))
+    counts = np.zeros((2, n_resamples))
+    totals, sizes = np.zeros(2), np.zeros(2)
+    rows = max(1, BATCH_CELLS // n_resamples)
+    for chunk in chunks:
+        chunk = chunk[chunk[value].notna()]
+        for arm, label in enumerate([control, variant]):
+            values = chunk.loc[chunk[group] == label, value].to_numpy(dtype=float)
+            totals[arm] += values.sum()
+            sizes[arm] += len(values)
+            for start in range(0, len(values), rows):
+                part = values[start:start + rows]
+                weights = rng.poisson(1.0, (n_resamples, len(part))).astype(float)
+                sums[arm] += weights @ part
+                counts[arm] += weights.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = sums / counts
+        observed = totals / sizes
+    lower, upper = np.nanquantile(means[1] - means[0], [alpha / 2, 1 - alpha / 2])
+    return {'control_users': int(sizes[0]), 'users': int(sizes[1]),
+            'difference': float(observed[1] - observed[0]),
+            'ci_lower': float(lower), 'ci_upper': float(upper)}
+
+
+# ============================================================
+# LOADING
+# ============================================================
+
+def load_metric(metric, segment=None, data_dir=DATA_DIR):
+    """
+    One row per onboarding A/B test user with its variant, the metric and
+    optionally a users column to segment by. Users without a value for the
+    metric (e.g. time_to_complete_hours before completing) are dropped.
+    """
+    if metric not in RESAMPLING_METRICS:
+        raise ValueError(f"Unknown metric {metric!r}; expected one of {list(RESAMPLING_METRICS)}")
+    df = load_table('onboarding_funnel', data_dir, columns=['user_id', 'ab_test_variant'])
+    df = df[df['ab_test_variant'].notna()].rename(columns={'ab_test_variant': 'variant'})
+
+    table = RESAMPLING_METRICS[metric]
+    values = load_table(table, data_dir, columns=['user_id', metric]).set_index('user_id')[metric]
+    df = df.assign(**{metric: df['user_id'].map(values)})
+    if segment is not None:
+        users = load_table('users', data_dir, columns=['user_id', segment])
+        df = df.assign(**{segment: df['user_id'].map(users.set_index('user_id')[segment])})
+    return df[df[metric].notna()]
+
+
+def segment_groups(df, value, segment=None, control=CONTROL, variant=VARIANT):
+    """{segment: (control values, variant values)}, with 'All users' first."""
+    labels = df['variant'].astype(str).to_numpy()
+    values = df[value].to_numpy(dtype=float)
+    groups = {ALL_USERS: (values[labels == control], values[labels == variant])}
+    if segment is not None:
+        keys = df[segment].astype(object).fillna(NO_SEGMENT).astype(str).to_numpy()
+        for key in sorted(set(keys)):
+            in_segment = keys == key
+            groups[key] = (values[in_segment & (labels == control)],
+                           values[in_segment & (labels == variant)])
+    return groups
+
+
+def metric_intervals(metric, segment=None, statistic='mean', n_resamples=N_RESAMPLES,
+                     alpha=ALPHA, seed=SEED, workers=1, data_dir=DATA_DIR):
+    """Bootstrap intervals and permutation p-values of a metric, per segment."""
+    df = load_metric(metric, segment, data_dir)
+    return resampling_intervals(segment_groups(df, metric, segment), statistic, n_resamples,
+                                alpha, seed, workers).assign(metric=metric)
@@ -0,0 +1,146 @@
+"""
+=================================================================
+TaskFlow Analytics - Embedded SQL Runner
+=================================================================
+Runs the analyses in sql/ in-process with DuckDB, directly against the
+files written by data_generation.py, with no database server:
+  1. sql/schema.sql is loaded into a scratch `ddl` schema, which gives
+     the column names and types of every table
+  2. each generated table is exposed as a view with those types over its
+     CSV file or Parquet dataset; queries scan the files in place
+  3. each .sql file is executed statement by statement and timed
+
+Usage:
+  python python/sql_runner.py                    # every sql/0*.sql file
+  python python/sql_runner.py sql/04_cohort_retention.sql --show
+=================================================================
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+from data_loader import DATA_DIR, PARQUET_PARTITIONS, SCRIPT_DIR, csv_path, parquet_path
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+SQL_DIR = os.path.join(SCRIPT_DIR, '..', 'sql')
+SCHEMA_FILE = os.path.join(SQL_DIR, 'schema.sql')
+
+# PostgreSQL types in schema.sql that DuckDB spells differently
+DIALECT_REWRITES = [
+    (r'\bJSONB\b', 'JSON'),
+]
+
+
+def _quote(path):
+    return "'" + path.replace("'", "''") + "'"
+
+
+def schema_columns(con, schema_file=SCHEMA_FILE):
+    """Load schema.sql into the `ddl` schema; return {table: [(column, type)]}."""
+    with open(schema_file) as f:
+        ddl = f.read()
+    for pattern, replacement in DIALECT_REWRITES:
+        ddl = re.sub(pattern, replacement, ddl)
+    con.execute("CREATE SCHEMA IF NOT EXISTS ddl")
+    con.execute("SET schema = 'ddl'")
+    con.execute(ddl)
+    con.execute("SET schema = 'main'")
+
+    rows = con.execute("""
+        SELECT table_name, column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = 'ddl'
+        ORDER BY table_name, ordinal_position
+    """).fetchall()
+    tables = {}
+    for table, column, data_type in rows:
+        tables.setdefault(table, []).append((column, data_type))
+    return tables
+
+
+def connect(data_dir=DATA_DIR, schema_file=SCHEMA_FILE):
+    """
+    Open an in-memory DuckDB connection with one typed view per generated
+    table. Tables with no files in data_dir (e.g. events before it is
+    generated) are left out.
+    """
+    if duckdb is None:
+        raise ImportError("The SQL runner needs duckdb: pip install duckdb")
+
+    con = duckdb.connect()
+    for table, columns in schema_columns(con, schema_file).items():
+        if os.path.isdir(parquet_path(table, data_dir)):
+            source = (f"read_parquet({_quote(os.path.join(parquet_path(table, data_dir), '**', '*.parquet'))}, "
+                      f"hive_partitioning = {str(table in PARQUET_PARTITIONS).lower()})")
+        elif os.path.exists(csv_path(table, data_dir)):
+            # Declared types instead of sniffing the file on every scan
+            types = ', '.join(f"'{column}': '{data_type}'" for column, data_type in columns)
+            source = (f"read_csv({_quote(csv_path(table, data_dir))}, header = true, "
+                      f"auto_detect = false, columns = {{{types}}})")
+        else:
+            continue
+        # Cast to the schema.sql types; partition columns such as event_month are dropped
+        select = ', '.join(f'CAST("{column}" AS {data_type}) AS "{column}"'
+                           for column, data_type in columns)
+        con.execute(f"CREATE VIEW main.{table} AS SELECT {select} FROM {source}")
+    return con
+
+
+def run_sql_file(con, path):
+    """Run every statement of a .sql file; return (last result DataFrame, seconds)."""
+    start = time.perf_counter()
+    result = None
+    with open(path) as f:
+        sql = f.read()
+    for statement in con.extract_statements(sql):
+        relation = con.execute(statement)
+        if relation.description is not None:
+            result = relation.fetchdf()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the sql/ analyses with embedded DuckDB.")
+    parser.add_argument('files', nargs='*', help="SQL files to run (default: sql/0*.sql)")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory with the generated tables")
+    parser.add_argument('--show', action='store_true', help="Print each query's result")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(SQL_DIR, '0*.sql')))
+    con = connect(args.data_dir)
+
+    print("=" * 70)
+    print("SQL ANALYSES (DuckDB, in-process)")
+    print("=" * 70)
+    failed = 0
+    for path in files:
+        name = os.path.basename(path)
+        try:
+            result, seconds = run_sql_file(con, path)
+        except duckdb.Error as e:
+            failed += 1
+            print(f"❌ {name}: {str(e).splitlines()[0]}")
+            continue
+        rows = 0 if result is None else len(result)
+        print(f"✅ {name:<40} {rows:>6,} rows  {seconds * 1000:>8.1f} ms")
+        if args.show and result is not None:
+            print(result.to_string(index=False))
+            print()
+
+    if failed:
+        raise SystemExit(f"\n{failed} of {len(files)} queries failed")
+
+
+if __name__ == "__main__":
+    main()
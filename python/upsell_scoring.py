@@ -0,0 +1,179 @@
+"""
+=================================================================
+TaskFlow Analytics - Undermonetized Workspace Scoring
+=================================================================
+Scores every active free workspace by how closely its users behave
+like each paid tier, and ranks them by expected MRR uplift. The Python
+counterpart of sql/03_undermonetized_segments.sql, which applies fixed
+thresholds against the Professional average.
+
+  1. Workspace profiles: team size and per-user averages of activity
+     from user_activity_summary, in one factorize + bincount pass
+  2. Tier profiles: the centroid of each plan's active workspaces on a
+     log1p scale, standardized by the spread across all workspaces
+  3. Distances from every workspace to every centroid in one matrix
+     product, turned into tier probabilities by a Gaussian
+     nearest-centroid model weighted by each plan's share
+  4. Expected uplift = seats x sum over tiers of P(tier) x per-seat MRR
+     (MRR_MAP, as used by the generator), since free workspaces pay nothing
+
+Run directly to print the top candidates:
+  python python/upsell_scoring.py
+=================================================================
+"""
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from data_loader import DATA_DIR, MRR_MAP, load_table
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+# Per-user activity averaged over each workspace (plus team size and power-user share)
+PROFILE_COLUMNS = ['total_sessions', 'total_events', 'avg_session_duration_min',
+                   'tasks_created', 'premium_features_used']
+FEATURES = ['users'] + PROFILE_COLUMNS + ['power_user_share']
+
+PLANS = list(MRR_MAP)
+FREE_PLAN = 'free'
+PAID_PLANS = [plan for plan in PLANS if MRR_MAP[plan] > 0]
+
+
+# ============================================================
+# PROFILES
+# ============================================================
+
+def workspace_profiles(activity):
+    """
+    Users per workspace and the mean of every profile column, from
+    user-level activity rows, as a DataFrame indexed by workspace_id.
+    """
+    codes, workspace_ids = pd.factorize(activity['workspace_id'])
+    n = len(workspace_ids)
+    users = np.bincount(codes, minlength=n)
+    profiles = {'users': users}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for column in PROFILE_COLUMNS:
+            profiles[column] = np.bincount(codes, weights=activity[column].to_numpy(dtype=float),
+                                           minlength=n) / users
+        profiles['power_user_share'] = np.bincount(
+            codes, weights=activity['is_power_user'].to_numpy(dtype=float), minlength=n) / users
+    return pd.DataFrame(profiles, index=pd.Index(np.asarray(workspace_ids), name='workspace_id'))
+
+
+def _scaled(profiles):
+    return np.log1p(profiles[FEATURES].to_numpy(dtype=float))
+
+
+def tier_profiles(X, plan_codes):
+    """Per-plan centroid of the scaled features (rows follow PLANS) and each plan's share."""
+    counts = np.bincount(plan_codes, minlength=len(PLANS))
+    sums = np.stack([np.bincount(plan_codes, weights=X[:, j], minlength=len(PLANS))
+                     for j in range(X.shape[1])], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return sums / counts[:, None], counts / counts.sum()
+
+
+# ============================================================
+# SCORING
+# ============================================================
+
+def score_matrix(X, centroids, shares, mrr_per_seat):
+    """
+    Vectorized scores for standardized workspaces X (workspaces x features):
+    squared distance to each plan centroid, plan probabilities, and the
+    expected MRR per seat under those probabilities.
+    """
+    # ||x - c||^2 = ||x||^2 - 2 x.c + ||c||^2 for every pair at once
+    distance2 = np.maximum((X * X).sum(axis=1)[:, None] - 2 * X @ centroids.T +
+                           (centroids * centroids).sum(axis=1)[None, :], 0)
+    with np.errstate(divide='ignore'):
+        logits = np.log(shares)[None, :] - distance2 / 2
+    logits -= logits.max(axis=1, keepdims=True)
+    probability = np.exp(logits)
+    probability /= probability.sum(axis=1, keepdims=True)
+    return distance2, probability, probability @ mrr_per_seat
+
+
+def score_workspaces(profiles, plans, mrr_map=MRR_MAP):
+    """
+    Score the active free workspaces against every paid plan.
+
+    profiles come from workspace_profiles(); plans is a Series of the
+    current plan per workspace_id (active subscriptions only). Returns one
+    row per candidate, best expected MRR uplift first.
+    """
+    plan = plans.reindex(profiles.index).astype(object)
+    known = plan.notna().to_numpy()
+    plan_codes = pd.Categorical(plan[known], categories=PLANS).codes
+
+    X = _scaled(profiles)
+    X = (X - X[known].mean(axis=0)) / np.where(X[known].std(axis=0) > 0, X[known].std(axis=0), 1)
+    centroids, shares = tier_profiles(X[known], plan_codes)
+    present = shares > 0
+    mrr_per_seat = np.array([mrr_map[name] for name in PLANS], dtype=float)
+
+    free = known & (plan == FREE_PLAN).to_numpy()
+    distance2, probability, expected = score_matrix(X[free], centroids[present], shares[present],
+                                                    mrr_per_seat[present])
+    names = [name for name, keep in zip(PLANS, present) if keep]
+    paid = [i for i, name in enumerate(names) if name in PAID_PLANS]
+
+    scores = profiles[free].copy()
+    for i in paid:
+        # Root-mean-square distance in standard deviations per feature
+        scores[f'distance_{names[i]}'] = np.sqrt(distance2[:, i] / X.shape[1])
+    for i in paid:
+        scores[f'p_{names[i]}'] = probability[:, i]
+    scores['nearest_paid_plan'] = np.array(names)[paid][distance2[:, paid].argmin(axis=1)]
+    scores['expected_mrr_per_seat'] = expected
+    scores['expected_mrr_uplift'] = expected * scores['users'].to_numpy()
+    return scores.sort_values('expected_mrr_uplift', ascending=False).reset_index()
+
+
+def undermonetized_workspaces(data_dir=DATA_DIR, mrr_map=MRR_MAP):
+    """Scored free workspaces from the generated tables."""
+    activity = load_table('user_activity_summary', data_dir,
+                          columns=['workspace_id'] + PROFILE_COLUMNS + ['is_power_user'])
+    subscriptions = load_table('subscriptions', data_dir, columns=['workspace_id', 'plan_type', 'is_active'])
+    active = subscriptions[subscriptions['is_active']]
+    plans = active.drop_duplicates('workspace_id', keep='last').set_index('workspace_id')['plan_type']
+    return score_workspaces(workspace_profiles(activity), plans, mrr_map)
+
+
+def uplift_summary(scores, top=None):
+    """Candidates, seats and expected MRR uplift over the top `top` workspaces (all if None)."""
+    targets = scores if top is None else scores.head(top)
+    return {
+        'workspaces': len(targets),
+        'users': int(targets['users'].sum()),
+        'expected_mrr_uplift': float(targets['expected_mrr_uplift'].sum()),
+        'expected_arr_uplift': float(targets['expected_mrr_uplift'].sum() * 12),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank free workspaces by expected MRR uplift.")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Directory with the generated tables")
+    parser.add_argument('--top', type=int, default=20, help="Candidates to list")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    scores = undermonetized_workspaces(args.data_dir)
+    print(f"🎯 Scored {len(scores):,} free workspaces in {time.perf_counter() - start:.2f}s\n")
+    columns = ['workspace_id', 'users', 'premium_features_used', 'nearest_paid_plan',
+               'expected_mrr_per_seat', 'expected_mrr_uplift']
+    print(scores[columns].head(args.top).to_string(index=False, float_format='{:.2f}'.format))
+
+    summary = uplift_summary(scores, args.top)
+    print(f"\n💰 Top {summary['workspaces']} workspaces ({summary['users']:,} seats): "
+          f"${summary['expected_mrr_uplift']:,.0f} expected MRR, "
+          f"${summary['expected_arr_uplift']:,.0f} ARR")
+
+
+if __name__ == "__main__":
+    main()
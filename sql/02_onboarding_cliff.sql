@@ -7,52 +7,42 @@ EXPECTED INSIGHT: 36% drop-off at Step 3 (Create First Board)
 =================================================================
 */
 
-WITH funnel_metrics AS (
-    -- Step 1: Team Setup
+WITH step_counts AS (
+    -- One scan of onboarding_funnel: every step count and step-to-step
+    -- median duration comes out of a single aggregate row
     SELECT 
-        1 AS step_number,
-        'Step 1: Team Setup' AS step_name,
-        COUNT(*) AS users_reached,
-        SUM(CASE WHEN step_1_completed THEN 1 ELSE 0 END) AS users_completed,
-        ROUND(100.0 * SUM(CASE WHEN step_1_completed THEN 1 ELSE 0 END) / COUNT(*), 1) AS completion_rate,
-        ROUND(100.0 * (1 - SUM(CASE WHEN step_1_completed THEN 1 ELSE 0 END)::FLOAT / COUNT(*)), 1) AS drop_off_rate
+        COUNT(*) AS started,
+        COUNT(*) FILTER (WHERE step_1_completed) AS step_1,
+        COUNT(*) FILTER (WHERE step_2_completed) AS step_2,
+        COUNT(*) FILTER (WHERE step_3_completed) AS step_3,
+        COUNT(*) FILTER (WHERE step_4_completed) AS step_4,
+        PERCENTILE_CONT(0.5) WITHIN GROUP (
+            ORDER BY EXTRACT(EPOCH FROM step_2_timestamp - step_1_timestamp) / 3600.0) AS median_hours_2,
+        PERCENTILE_CONT(0.5) WITHIN GROUP (
+            ORDER BY EXTRACT(EPOCH FROM step_3_timestamp - step_2_timestamp) / 3600.0) AS median_hours_3,
+        PERCENTILE_CONT(0.5) WITHIN GROUP (
+            ORDER BY EXTRACT(EPOCH FROM step_4_timestamp - step_3_timestamp) / 3600.0) AS median_hours_4
     FROM onboarding_funnel
-    
-    UNION ALL
-    
-    -- Step 2: Invite Team Members
-    SELECT 
-        2,
-        'Step 2: Invite Members',
-        SUM(CASE WHEN step_1_completed THEN 1 ELSE 0 END),
-        SUM(CASE WHEN step_2_completed THEN 1 ELSE 0 END),
-        ROUND(100.0 * SUM(CASE WHEN step_2_completed THEN 1 ELSE 0 END) / NULLIF(SUM(CASE WHEN step_1_completed THEN 1 ELSE 0 END), 0), 1),
-        ROUND(100.0 * (1 - SUM(CASE WHEN step_2_completed THEN 1 ELSE 0 END)::FLOAT / NULLIF(SUM(CASE WHEN step_1_completed THEN 1 ELSE 0 END), 0)), 1)
-    FROM onboarding_funnel
-    
-    UNION ALL
-    
-    -- Step 3: Create First Board (THE PROBLEM STEP)
-    SELECT 
-        3,
-        'Step 3: Create Board',
-        SUM(CASE WHEN step_2_completed THEN 1 ELSE 0 END),
-        SUM(CASE WHEN step_3_completed THEN 1 ELSE 0 END),
-        ROUND(100.0 * SUM(CASE WHEN step_3_completed THEN 1 ELSE 0 END) / NULLIF(SUM(CASE WHEN step_2_completed THEN 1 ELSE 0 END), 0), 1),
-        ROUND(100.0 * (1 - SUM(CASE WHEN step_3_completed THEN 1 ELSE 0 END)::FLOAT / NULLIF(SUM(CASE WHEN step_2_completed THEN 1 ELSE 0 END), 0)), 1)
-    FROM onboarding_funnel
-    
-    UNION ALL
-    
-    -- Step 4: Create First Task
+),
+
+funnel_metrics AS (
+    -- Unpivot the single row into one row per step; no further scans
     SELECT 
-        4,
-        'Step 4: Create Task',
-        SUM(CASE WHEN step_3_completed THEN 1 ELSE 0 END),
-        SUM(CASE WHEN step_4_completed THEN 1 ELSE 0 END),
-        ROUND(100.0 * SUM(CASE WHEN step_4_completed THEN 1 ELSE 0 END) / NULLIF(SUM(CASE WHEN step_3_completed THEN 1 ELSE 0 END), 0), 1),
-        ROUND(100.0 * (1 - SUM(CASE WHEN step_4_completed THEN 1 ELSE 0 END)::FLOAT / NULLIF(SUM(CASE WHEN step_3_completed THEN 1 ELSE 0 END), 0)), 1)
-    FROM onboarding_funnel
+        s.step_number,
+        s.step_name,
+        s.users_reached,
+        s.users_completed,
+        ROUND(100.0 * s.users_completed / NULLIF(s.users_reached, 0), 1) AS completion_rate,
+        ROUND(100.0 * (1 - s.users_completed::FLOAT / NULLIF(s.users_reached, 0)), 1) AS drop_off_rate,
+        ROUND(s.median_hours_from_previous::NUMERIC, 1) AS median_hours_from_previous
+    FROM step_counts c
+    CROSS JOIN LATERAL (VALUES
+        (1, 'Step 1: Team Setup',     c.started, c.step_1, NULL::FLOAT),
+        (2, 'Step 2: Invite Members', c.step_1,  c.step_2, c.median_hours_2),
+        -- Step 3: Create First Board (THE PROBLEM STEP)
+        (3, 'Step 3: Create Board',   c.step_2,  c.step_3, c.median_hours_3),
+        (4, 'Step 4: Create Task',    c.step_3,  c.step_4, c.median_hours_4)
+    ) AS s(step_number, step_name, users_reached, users_completed, median_hours_from_previous)
 )
 SELECT 
     step_number,
@@ -61,6 +51,7 @@ SELECT
     users_completed,
     completion_rate,
     drop_off_rate,
+    median_hours_from_previous,
     CASE 
         WHEN drop_off_rate > 30 THEN '🚨 HIGH DROP-OFF'
         WHEN drop_off_rate > 20 THEN '⚠️ MODERATE DROP-OFF'
@@ -1,36 +1,29 @@
 -- Analysis 1.2: Onboarding Cliff Analysis
 -- Analyze drop-off at each onboarding step
 
+-- One scan of onboarding_funnel for all step counts, then one row per step
+WITH step_counts AS (
+    SELECT 
+        COUNT(*) AS total_users,
+        COUNT(*) FILTER (WHERE step_1_completed) AS step_1,
+        COUNT(*) FILTER (WHERE step_2_completed) AS step_2,
+        COUNT(*) FILTER (WHERE step_3_completed) AS step_3,
+        COUNT(*) FILTER (WHERE step_4_completed) AS step_4
+    FROM onboarding_funnel
+)
 SELECT 
-    'Step 1: Team Setup' as step_name,
-    COUNT(CASE WHEN step_1_completed THEN 1 END) as users_completed,
-    ROUND(100.0 * COUNT(CASE WHEN step_1_completed THEN 1 END) / COUNT(*), 2) as completion_rate,
-    100.0 - ROUND(100.0 * COUNT(CASE WHEN step_1_completed THEN 1 END) / COUNT(*), 2) as drop_off_rate
-FROM onboarding_funnel
-
-UNION ALL
-
-SELECT 
-    'Step 2: Invite Members' as step_name,
-    COUNT(CASE WHEN step_2_completed THEN 1 END) as users_completed,
-    ROUND(100.0 * COUNT(CASE WHEN step_2_completed THEN 1 END) / COUNT(*), 2) as completion_rate,
-    ROUND(100.0 * (COUNT(CASE WHEN step_1_completed THEN 1 END) - COUNT(CASE WHEN step_2_completed THEN 1 END)) / COUNT(CASE WHEN step_1_completed THEN 1 END), 2) as drop_off_rate
-FROM onboarding_funnel
-
-UNION ALL
-
-SELECT 
-    'Step 3: Create Board' as step_name,
-    COUNT(CASE WHEN step_3_completed THEN 1 END) as users_completed,
-    ROUND(100.0 * COUNT(CASE WHEN step_3_completed THEN 1 END) / COUNT(*), 2) as completion_rate,
-    ROUND(100.0 * (COUNT(CASE WHEN step_2_completed THEN 1 END) - COUNT(CASE WHEN step_3_completed THEN 1 END)) / COUNT(CASE WHEN step_2_completed THEN 1 END), 2) as drop_off_result
-FROM onboarding_funnel
-
-UNION ALL
-
-SELECT 
-    'Step 4: Create Task' as step_name,
-    COUNT(CASE WHEN step_4_completed THEN 1 END) as users_completed,
-    ROUND(100.0 * COUNT(CASE WHEN step_4_completed THEN 1 END) / COUNT(*), 2) as completion_rate,
-    ROUND(100.0 * (COUNT(CASE WHEN step_3_completed THEN 1 END) - COUNT(CASE WHEN step_4_completed THEN 1 END)) / COUNT(CASE WHEN step_3_completed THEN 1 END), 2) as drop_off_rate
-FROM onboarding_funnel;
+    s.step_name,
+    s.users_completed,
+    ROUND(100.0 * s.users_completed / c.total_users, 2) as completion_rate,
+    CASE WHEN s.step_number = 1
+        THEN 100.0 - ROUND(100.0 * s.users_completed / c.total_users, 2)
+        ELSE ROUND(100.0 * (s.users_previous - s.users_completed) / s.users_previous, 2)
+    END as drop_off_rate
+FROM step_counts c
+CROSS JOIN LATERAL (VALUES
+    (1, 'Step 1: Team Setup',     c.step_1, c.total_users),
+    (2, 'Step 2: Invite Members', c.step_2, c.step_1),
+    (3, 'Step 3: Create Board',   c.step_3, c.step_2),
+    (4, 'Step 4: Create Task',    c.step_4, c.step_3)
+) AS s(step_number, step_name, users_completed, users_previous)
+ORDER BY s.step_number;
@@ -1,48 +1,79 @@
 import os
-from crewai import Agent
-from langchain_google_genai import ChatGoogleGenerativeAI
-from crewai_tools import SerperDevTool
+import threading
+from functools import wraps
 
-# Initialize the tool
-search_tool = SerperDevTool()
+# crewai, the LLM and tool clients and the analytics modules are imported
+# and built on first use, so importing this module (and main.py --help)
+# stays fast. Built clients are shared by every agent and thread.
+_built = {}
+_build_lock = threading.Lock()
 
-# Check for API keys
-if not os.environ.get("GOOGLE_API_KEY"):
-    print("WARNING: GOOGLE_API_KEY not found in environment variables.")
-if not os.environ.get("SERPER_API_KEY"):
-    print("WARNING: SERPER_API_KEY not found in environment variables.")
 
-# Initialize Gemini LLM
-# You can use 'gemini-pro' or other available models.
-gemini_llm = ChatGoogleGenerativeAI(model="gemini-pro", verbose=True, temperature=0.5)
+def _once(build):
+    @wraps(build)
+    def get():
+        with _build_lock:
+            if build.__name__ not in _built:
+                _built[build.__name__] = build()
+            return _built[build.__name__]
+    return get
+
+
+@_once
+def search_tool():
+    # Search results are cached on disk, see call_cache.py
+    from clients import make_search_tool
+    return make_search_tool()
+
+
+@_once
+def gemini_llm():
+    from clients import BACKEND, make_llm
+
+    # Check for API keys
+    if BACKEND != 'stub':
+        if not os.environ.get("GOOGLE_API_KEY"):
+            print("WARNING: GOOGLE_API_KEY not found in environment variables.")
+        if not os.environ.get("SERPER_API_KEY"):
+            print("WARNING: SERPER_API_KEY not found in environment variables.")
+
+    # Initialize Gemini LLM (set CREW_BACKEND=stub to run offline)
+    # You can use 'gemini-pro' or other available models.
+    return make_llm()
+
 
 # Define the Agents
 class ProductAnalysts:
     def market_researcher(self):
+        from crewai import Agent
         return Agent(
             role='Market Researcher',
             goal='Gather comprehensive data about the product and its market.',
             backstory="""You are an expert market researcher with a knack for finding 
             hidden gems of information. You are detailed-oriented and leave no stone unturned.""",
-            tools=[search_tool],
+            tools=[search_tool()],
             verbose=True,
             memory=True,
-            llm=gemini_llm
+            llm=gemini_llm()
         )
 
     def data_analyst(self):
+        from crewai import Agent
+        from analytics_tools import analytics_tools
         return Agent(
             role='Data Analyst',
             goal='Analyze gathered data to identify trends and insights.',
             backstory="""You are a seasoned data analyst. You can look at raw data 
-            and see the story behind the numbers. You provide clear, data-driven insights.""",
-            tools=[], # Can add specific data analysis tools if needed
+            and see the story behind the numbers. You provide clear, data-driven insights,
+            and you query TaskFlow's own product data with your tools instead of guessing figures.""",
+            tools=analytics_tools(), # Funnel, retention, feature lift and A/B queries over data/
             verbose=True,
             memory=True,
-            llm=gemini_llm
+            llm=gemini_llm()
         )
 
     def content_writer(self):
+        from crewai import Agent
         return Agent(
             role='Content Writer',
             goal='Synthesize all findings into a comprehensive report.',
@@ -51,5 +82,5 @@ class ProductAnalysts:
             tools=[],
             verbose=True,
             memory=True,
-            llm=gemini_llm
+            llm=gemini_llm()
         )
@@ -0,0 +1,159 @@
+import os
+import sys
+from functools import lru_cache
+from crewai_tools import BaseTool
+
+# The analytics modules live in python/ next to this directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python'))
+
+from aggregate_store import data_version  # noqa: E402
+from cohorts import cohort_retention  # noqa: E402
+from experiment_stats import EXPERIMENT_METRICS, EXPERIMENT_SEGMENTS, experiment_results  # noqa: E402
+from feature_bitmaps import build_index, feature_retention  # noqa: E402
+from funnel import ONBOARDING_SEGMENTS, onboarding_funnel  # noqa: E402
+
+# Retention periods reported by the cohort tool, and cohorts listed (newest first)
+RETENTION_PERIODS = [1, 3, 6, 12]
+RETENTION_COHORTS = 12
+
+
+# Every query returns a short plain-text table, so the agent spends tokens on
+# findings rather than on raw rows. Results are cached per data version (as
+# the dashboard does), so regenerating data/ invalidates them
+SUMMARY_CACHE_SIZE = 64
+
+def _option(value):
+    """Tool arguments arrive as text; '', 'none' or 'all' mean no filter."""
+    value = (value or '').strip()
+    return None if value.lower() in ('', 'none', 'all', 'all users') else value
+
+
+def _table(df, percent=()):
+    df = df.copy()
+    for column in percent:
+        df[column] = df[column].map(lambda value: '-' if value != value else f'{value:.1%}')
+    return df.to_string(index=False, float_format='{:.3f}'.format, na_rep='-')
+
+
+@lru_cache(maxsize=SUMMARY_CACHE_SIZE)
+def funnel_summary(version, segment=None):
+    funnel = onboarding_funnel(segment)
+    columns = ['step_name', 'users_reached', 'completion_rate', 'drop_off_rate', 'conversion_from_start']
+    if segment is not None:
+        columns.insert(0, 'segment')
+    worst = funnel.loc[funnel.groupby('segment')['drop_off_rate'].idxmax()] if segment else \
+        funnel.loc[[funnel['drop_off_rate'].idxmax()]]
+    lines = [f"Onboarding funnel{f' by {segment}' if segment else ''}:",
+             _table(funnel[columns], ['completion_rate', 'drop_off_rate', 'conversion_from_start']),
+             "Largest drop-off:"]
+    for _, row in worst.iterrows():
+        who = f"{row['segment']}: " if segment else ''
+        lines.append(f"- {who}{row['step_name']} ({row['drop_off_rate']:.1%} drop off)")
+    return '\n'.join(lines)
+
+
+@lru_cache(maxsize=SUMMARY_CACHE_SIZE)
+def retention_summary(version, granularity='month'):
+    triangle = cohort_retention(granularity)
+    periods = [period for period in RETENTION_PERIODS if period in triangle.columns]
+    sizes = triangle['cohort_size']
+    # Average over the cohorts old enough to have each period, weighted by size
+    average = {period: (triangle[period] * sizes).sum() / sizes[triangle[period].notna()].sum()
+               for period in periods}
+    table = triangle[['cohort_size'] + periods].tail(RETENTION_COHORTS).reset_index()
+    table.columns = ['cohort', 'cohort_size'] + [f'{granularity}_{period}' for period in periods]
+    return '\n'.join([
+        f"Retention by signup {granularity}, latest {len(table)} of {len(triangle)} cohorts "
+        f"(share of the cohort still active):",
+        _table(table, table.columns[2:]),
+        "Size-weighted average over all cohorts: " + ', '.join(f"{granularity} {period}: {value:.1%}"
+                                                               for period, value in average.items()),
+    ])
+
+
+@lru_cache(maxsize=1)
+def _feature_index(version):
+    return build_index()
+
+
+@lru_cache(maxsize=SUMMARY_CACHE_SIZE)
+def feature_lift_summary(version, account_tier=None, top=10):
+    index = _feature_index(version)
+    if account_tier is not None and account_tier not in index['tiers']:
+        return f"Unknown account tier {account_tier!r}; expected one of {sorted(index['tiers'])}"
+    within = None if account_tier is None else index['tiers'][account_tier]
+    lift = feature_retention(index, within).head(top)
+    return '\n'.join([
+        f"30-day retention lift of feature adopters vs non-adopters"
+        f"{f' ({account_tier} tier)' if account_tier else ''}, top {len(lift)}:",
+        _table(lift, ['adoption_rate', 'retention_rate', 'baseline_retention_rate']),
+    ])
+
+
+@lru_cache(maxsize=SUMMARY_CACHE_SIZE)
+def ab_test_summary(version, segment=None, metric='converted'):
+    results = experiment_results([metric], segment)
+    columns = ['test_name', 'variant', 'users', 'control_rate', 'conversion_rate', 'lift',
+               'lift_ci_lower', 'lift_ci_upper', 'p_adjusted', 'significant']
+    if segment is not None:
+        columns.insert(1, 'segment')
+    significant = results[results['significant']]
+    return '\n'.join([
+        f"A/B test results for {metric}{f' by {segment}' if segment else ''} "
+        f"(Holm-adjusted p-values, 95% CIs on the absolute lift):",
+        _table(results[columns], ['control_rate', 'conversion_rate', 'lift', 'lift_ci_lower',
+                                  'lift_ci_upper']),
+        f"{len(significant)} of {len(results)} comparisons significant.",
+    ])
+
+
+class FunnelBySegmentTool(BaseTool):
+    name: str = "Onboarding funnel by segment"
+    description: str = (f"Onboarding funnel completion and drop-off per step, overall or split by one of "
+                        f"{sorted(ONBOARDING_SEGMENTS)}. Argument: segment (empty for all users).")
+
+    def _run(self, segment: str = ''):
+        segment = _option(segment)
+        if segment is not None and segment not in ONBOARDING_SEGMENTS:
+            return f"Unknown segment {segment!r}; expected one of {sorted(ONBOARDING_SEGMENTS)}"
+        return funnel_summary(data_version(), segment)
+
+
+class CohortRetentionTool(BaseTool):
+    name: str = "Cohort retention"
+    description: str = ("Share of each signup cohort still active after 1, 3, 6 and 12 periods. "
+                        "Argument: granularity, one of 'day', 'week' or 'month'.")
+
+    def _run(self, granularity: str = 'month'):
+        granularity = _option(granularity) or 'month'
+        if granularity not in ('day', 'week', 'month'):
+            return f"Unknown granularity {granularity!r}; expected 'day', 'week' or 'month'"
+        return retention_summary(data_version(), granularity)
+
+
+class FeatureLiftTool(BaseTool):
+    name: str = "Feature retention lift"
+    description: str = ("Adoption and 30-day retention lift of every product feature, best first. "
+                        "Argument: account_tier to restrict to (empty for all users).")
+
+    def _run(self, account_tier: str = ''):
+        return feature_lift_summary(data_version(), _option(account_tier))
+
+
+class ABTestResultsTool(BaseTool):
+    name: str = "A/B test results"
+    description: str = (f"Variant vs control rates, lift with confidence interval and adjusted p-value for "
+                        f"every A/B test. Arguments: segment, one of {EXPERIMENT_SEGMENTS} (empty for all "
+                        f"users), and metric, one of {list(EXPERIMENT_METRICS)}.")
+
+    def _run(self, segment: str = '', metric: str = 'converted'):
+        segment, metric = _option(segment), _option(metric) or 'converted'
+        if segment is not None and segment not in EXPERIMENT_SEGMENTS:
+            return f"Unknown segment {segment!r}; expected one of {EXPERIMENT_SEGMENTS}"
+        if metric not in EXPERIMENT_METRICS:
+            return f"Unknown metric {metric!r}; expected one of {list(EXPERIMENT_METRICS)}"
+        return ab_test_summary(data_version(), segment, metric)
+
+
+def analytics_tools():
+    return [FunnelBySegmentTool(), CohortRetentionTool(), FeatureLiftTool(), ABTestResultsTool()]
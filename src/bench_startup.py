@@ -0,0 +1,81 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each case runs in a fresh interpreter, so it pays every import it triggers
+CASES = {
+    'python (baseline)': ['-c', 'pass'],
+    'main.py --help': [os.path.join(SRC_DIR, 'main.py'), '--help'],
+    'import main': ['-c', 'import main'],
+    'import agents': ['-c', 'import agents'],
+    'import tasks': ['-c', 'import tasks'],
+    'build agents': ['-c', 'from agents import ProductAnalysts as P; p = P(); '
+                           'p.market_researcher(); p.data_analyst(); p.content_writer()'],
+}
+
+
+def _env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SRC_DIR, env.get('PYTHONPATH')]))
+    return env
+
+
+def time_case(args, runs):
+    """Wall-clock seconds of `runs` fresh interpreters running args (None if it fails)."""
+    timings = []
+    for _ in range(runs):
+        # Timed by a wrapper process so interpreter startup is included
+        wrapper = ('import subprocess, sys, time; start = time.perf_counter(); '
+                   'code = subprocess.run(sys.argv[1:], stdout=subprocess.DEVNULL, '
+                   'stderr=subprocess.DEVNULL).returncode; '
+                   'print(time.perf_counter() - start if code == 0 else -1)')
+        out = subprocess.run([sys.executable, '-c', wrapper, sys.executable] + args,
+                             capture_output=True, text=True, env=_env(), cwd=SRC_DIR).stdout
+        seconds = float(out.strip() or -1)
+        if seconds < 0:
+            return None
+        timings.append(seconds)
+    return timings
+
+
+def slowest_imports(module, top=15):
+    """(cumulative µs, module) of the slowest imports triggered by importing module."""
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                         capture_output=True, text=True, env=_env(), cwd=SRC_DIR).stderr
+    rows = []
+    for line in err.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)', line)
+        if match:
+            rows.append((int(match.group(1)), match.group(3)))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup and import time of the crew CLI.")
+    parser.add_argument('cases', nargs='*', help=f"Cases to run (default: all of {list(CASES)})")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per case")
+    parser.add_argument('--importtime', metavar='MODULE',
+                        help="Also list the slowest imports triggered by importing MODULE")
+    args = parser.parse_args()
+
+    print(f"{'case':<20} {'median':>9} {'min':>9}")
+    for name in args.cases or CASES:
+        timings = time_case(CASES[name], args.runs)
+        if timings is None:
+            print(f"{name:<20} {'failed':>9}")
+        else:
+            print(f"{name:<20} {statistics.median(timings) * 1000:>7.0f}ms {min(timings) * 1000:>7.0f}ms")
+
+    if args.importtime:
+        print(f"\nSlowest imports under {args.importtime} (cumulative):")
+        for micros, module in slowest_imports(args.importtime):
+            print(f"  {micros / 1000:>8.1f}ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
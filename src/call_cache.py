@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Where cached LLM and tool results live (override with CREW_CACHE_PATH)
+CACHE_PATH = os.environ.get('CREW_CACHE_PATH',
+                            os.path.join(SRC_DIR, '..', 'data', '.cache', 'crew_calls.sqlite'))
+DEFAULT_TTL = 7 * 24 * 3600          # seconds a result stays valid
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2  # total size before least recently used results are evicted
+
+# Returned by CallCache.get() on a miss, since None is a valid cached result
+_MISSING = object()
+
+
+class CallCache:
+    """
+    Persistent, content-addressed cache for LLM and tool calls.
+
+    A call is identified by its kind ('llm' or 'tool'), the model or tool
+    name and its JSON payload (prompt, arguments, settings); the SHA-256 of
+    those is the key. Results are JSON-serializable values stored in SQLite,
+    so the cache is shared by every run and process on the machine. Entries
+    expire after ttl seconds, and the least recently used ones are evicted
+    once the total stored size exceeds max_bytes. Concurrent identical calls
+    in one process are deduplicated: the first caller makes the call and
+    the others wait for its result.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'deduplicated': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS calls (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS calls_last_used ON calls (last_used)")
+
+    @staticmethod
+    def key(kind, name, payload):
+        canonical = json.dumps([kind, name, payload], sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key):
+        """The cached value for key, or _MISSING if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM calls WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return _MISSING
+            if now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM calls WHERE key = ?", (key,))
+                return _MISSING
+            self._db.execute("UPDATE calls SET last_used = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, kind, name, value):
+        encoded = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO calls VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (key, kind, name, encoded, len(encoded), now, now))
+            self._evict()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM calls").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Oldest first, until the remaining entries fit
+        removed = []
+        for key, size in self._db.execute("SELECT key, size FROM calls ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            removed.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM calls WHERE key = ?", removed)
+        self.stats['evicted'] += len(removed)
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def call(self, kind, name, payload, fn):
+        """Return the cached result of a call, or make it with fn() and cache it."""
+        key = self.key(kind, name, payload)
+        value = self.get(key)
+        if value is not _MISSING:
+            self._count('hits')
+            return value
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            self._count('deduplicated')
+            return future.result()
+
+        try:
+            # Another caller may have stored it between the lookup and taking ownership
+            value = self.get(key)
+            if value is not _MISSING:
+                self._count('hits')
+            else:
+                self._count('misses')
+                value = fn()
+                self.put(key, kind, name, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM calls")
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """The process-wide cache, or None when disabled with CREW_CACHE=off."""
+    global _default_cache
+    if os.environ.get('CREW_CACHE', 'on').lower() in ('off', '0', 'false'):
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = CallCache()
+        return _default_cache
+
+
+def cached_call(kind, name, payload, fn):
+    """cache.call() on the default cache, or a plain fn() when caching is off."""
+    cache = default_cache()
+    return fn() if cache is None else cache.call(kind, name, payload, fn)
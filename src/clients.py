@@ -0,0 +1,94 @@
+import hashlib
+import os
+import time
+from crewai_tools import BaseTool, SerperDevTool
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_google_genai import ChatGoogleGenerativeAI
+from call_cache import cached_call
+
+# 'live' calls Gemini and Serper; 'stub' answers locally, for offline runs and tests
+BACKEND = os.environ.get('CREW_BACKEND', 'live')
+# Seconds each stub call takes, to make overlapping calls observable
+STUB_LATENCY = float(os.environ.get('CREW_STUB_LATENCY', '0'))
+
+GEMINI_MODEL = 'gemini-pro'
+
+
+class CachedChatMixin:
+    """
+    Routes _generate through the call cache, keyed by the model type, every
+    generation setting the model reports (temperature, top_p/top_k, max
+    output tokens, safety settings, ...), stop words and messages.
+    """
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        payload = {
+            'llm_type': self._llm_type,
+            'params': dict(self._identifying_params),
+            'stop': stop,
+            'messages': [[message.type, message.content] for message in messages],
+            'kwargs': kwargs,
+        }
+
+        def generate():
+            result = super(CachedChatMixin, self)._generate(messages, stop, run_manager, **kwargs)
+            return result.generations[0].message.content
+
+        text = cached_call('llm', getattr(self, 'model', self._llm_type), payload, generate)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+class CachedGemini(CachedChatMixin, ChatGoogleGenerativeAI):
+    pass
+
+
+class CachedSerperDevTool(SerperDevTool):
+    def _run(self, **kwargs):
+        return cached_call('tool', self.name, kwargs, lambda: super(CachedSerperDevTool, self)._run(**kwargs))
+
+
+class StubChatModel(BaseChatModel):
+    """Deterministic local stand-in for Gemini: the answer depends only on the prompt."""
+
+    model: str = 'stub'
+
+    @property
+    def _llm_type(self):
+        return 'stub'
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(STUB_LATENCY)
+        prompt = '\n'.join(str(message.content) for message in messages)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        text = f"Thought: I now know the final answer\nFinal Answer: Stub answer {digest}"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+class CachedStubChatModel(CachedChatMixin, StubChatModel):
+    pass
+
+
+class StubSearchTool(BaseTool):
+    name: str = "Search the internet"
+    description: str = "Offline stand-in for Serper search; returns canned results for a query."
+
+    def _run(self, search_query: str):
+        def search():
+            time.sleep(STUB_LATENCY)
+            return (f"Title: {search_query} overview\nLink: https://example.com/{len(search_query)}\n"
+                    f"Snippet: Stub search result for {search_query}.")
+        return cached_call('tool', self.name, {'search_query': search_query}, search)
+
+
+def make_llm():
+    if BACKEND == 'stub':
+        return CachedStubChatModel()
+    return CachedGemini(model=GEMINI_MODEL, verbose=True, temperature=0.5)
+
+
+def make_search_tool():
+    if BACKEND == 'stub':
+        return StubSearchTool()
+    return CachedSerperDevTool()
@@ -0,0 +1,156 @@
+import math
+import re
+import threading
+
+# Token budget for the upstream context interpolated into each task
+CONTEXT_BUDGETS = {'analysis': 1200, 'report': 1500}
+
+# Rough tokens per character for English prose (no tokenizer needed)
+CHARS_PER_TOKEN = 4
+# Longest single finding kept, in tokens
+MAX_FINDING_TOKENS = 60
+
+BULLET = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+')
+HEADING = re.compile(r'^\s*(?:#{1,6}\s+|\*\*)(.+?)(?:\*\*)?:?\s*$')
+SIGNAL_WORDS = re.compile(r'\b(?:increase|decrease|grow|growth|decline|trend|risk|opportunit|competitor|'
+                          r'market share|revenue|pricing|churn|retention|conversion|significant|recommend|'
+                          r'key|insight)', re.IGNORECASE)
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _text(item):
+    """Upstream results may be strings or crewai Tasks; use a Task's output, not its repr."""
+    output = getattr(item, 'output', None)
+    if output is not None:
+        return str(getattr(output, 'raw_output', None) or getattr(output, 'raw', None) or output)
+    return str(item)
+
+
+def _shorten(text, tokens):
+    limit = tokens * CHARS_PER_TOKEN
+    # One character is kept free for the ellipsis
+    return text if len(text) <= limit else text[:limit - 1].rsplit(' ', 1)[0] + '…'
+
+
+def key_findings(text, budget):
+    """
+    The most informative lines of text within budget tokens, in their
+    original order under their section headings. Bullets, figures and
+    strategy vocabulary score highest; text that fits is returned as is.
+    Every line counts against the budget, headings included.
+    """
+    text = text.strip()
+    if estimate_tokens(text) <= budget:
+        return text
+    if budget <= 0:
+        return ''
+
+    candidates = []
+    # Sections are numbered so a heading repeated later in the text is charged again
+    section, heading = 0, None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = HEADING.match(line)
+        if match and len(line) < 100:
+            section, heading = section + 1, match.group(1).strip('# *') or None
+            continue
+        is_bullet = bool(BULLET.match(line))
+        # Prose paragraphs are split into sentences, bullets kept whole
+        parts = [BULLET.sub('', line)] if is_bullet else re.split(r'(?<=[.!?])\s+', line)
+        for part in parts:
+            score = 2 * is_bullet + 2 * bool(re.search(r'\d', part)) + len(SIGNAL_WORDS.findall(part))
+            finding = _shorten(part, max(1, min(MAX_FINDING_TOKENS, budget - 1)))
+            candidates.append((len(candidates), (section, heading), finding, score))
+
+    # A line costs its tokens plus one for the bullet and newline; a section's
+    # heading line is charged with the first finding chosen from it
+    chosen, used, seen, headed = [], 0, set(), set()
+    for candidate in sorted(candidates, key=lambda c: (-c[3], c[0])):
+        key = candidate[2].lower()
+        section, heading = candidate[1]
+        cost = estimate_tokens(candidate[2]) + 1
+        if heading and section not in headed:
+            cost += estimate_tokens(heading) + 1
+        if key in seen or used + cost > budget:
+            continue
+        seen.add(key)
+        headed.add(section)
+        chosen.append(candidate)
+        used += cost
+
+    if not chosen:
+        return _shorten(text, budget)
+
+    lines, current = [], None
+    for _, (section, heading), finding, _ in sorted(chosen):
+        if section != current and heading:
+            lines.append(f"{heading}:")
+        current = section
+        lines.append(f"- {finding}")
+    return '\n'.join(lines)
+
+
+def compact_context(context, budget):
+    """
+    Upstream results as structured key findings within budget tokens.
+    context is a string or a list of strings/Tasks; the budget is shared
+    between them, and whatever short results leave over goes to the rest.
+    Labels and separators are paid for out of the budget first.
+    """
+    items = [context] if isinstance(context, str) else list(context or [])
+    texts = [_text(item).strip() for item in items]
+    texts = [text for text in texts if text]
+    if not texts:
+        return ''
+    joined = '\n\n'.join(texts)
+    if estimate_tokens(joined) <= budget:
+        return joined
+
+    condensed_labels = [f"Key findings ({estimate_tokens(text)} tokens condensed)" for text in texts]
+    # The longer label, its colon and newline, and the blank line before the next part
+    remaining = budget - sum(estimate_tokens(f"{label}:") + 1 for label in condensed_labels)
+    if remaining <= 0:
+        # Too small a budget to label each result: condense them as one
+        return key_findings(joined, budget)
+    # Shortest first, so their unused share flows to the longer results
+    order = sorted(range(len(texts)), key=lambda i: estimate_tokens(texts[i]))
+    compacted = {}
+    for n, i in enumerate(order):
+        share = remaining // (len(texts) - n)
+        compacted[i] = key_findings(texts[i], share)
+        remaining -= estimate_tokens(compacted[i])
+
+    parts = []
+    for i in range(len(texts)):
+        label = condensed_labels[i] if compacted[i] != texts[i] else "Upstream result"
+        parts.append(f"{label}:\n{compacted[i]}")
+    return '\n\n'.join(parts)
+
+
+class TokenLedger:
+    """Estimated tokens per pipeline stage: upstream context in, prompt sent and output."""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, upstream, prompt, output):
+        with self._lock:
+            totals = self.stages.setdefault(stage, {'runs': 0, 'upstream': 0, 'prompt': 0, 'output': 0})
+            totals['runs'] += 1
+            totals['upstream'] += estimate_tokens(upstream)
+            totals['prompt'] += estimate_tokens(prompt)
+            totals['output'] += estimate_tokens(output)
+
+    def summary(self):
+        lines = []
+        for stage, totals in self.stages.items():
+            runs = totals['runs']
+            lines.append(f"   {stage:<9} {runs} runs, per run: upstream {totals['upstream'] // runs} -> "
+                         f"prompt {totals['prompt'] // runs}, output {totals['output'] // runs} tokens")
+        return '\n'.join(lines)
@@ -1,48 +1,199 @@
+import argparse
 import os
-from crewai import Crew, Process
-from agents import ProductAnalysts
-from tasks import ProductTasks
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from call_cache import default_cache
+from context import TokenLedger
+
+# Max concurrent stages per external provider (API rate limits)
+PROVIDER_LIMITS = {'gemini': 4, 'serper': 8}
+
+# Pipeline stages per product, in dependency order, and the providers each one calls
+STAGES = ['research', 'analysis', 'report']
+STAGE_PROVIDERS = {
+    'research': ['gemini', 'serper'],
+    'analysis': ['gemini'],
+    'report': ['gemini'],
+}
+
+
+class UpstreamFailed(RuntimeError):
+    """A node was skipped because one of its dependencies failed."""
+
+
+class ProviderLimits:
+    """One semaphore per provider; a stage holds a slot of every provider it calls."""
+
+    def __init__(self, limits=PROVIDER_LIMITS):
+        self.semaphores = {provider: threading.BoundedSemaphore(limit) for provider, limit in limits.items()}
+
+    @contextmanager
+    def hold(self, providers):
+        # Always acquire in the same order so stages never deadlock
+        acquired = []
+        try:
+            for provider in sorted(providers):
+                self.semaphores[provider].acquire()
+                acquired.append(provider)
+            yield
+        finally:
+            for provider in reversed(acquired):
+                self.semaphores[provider].release()
+
+
+def build_dag(product_names):
+    """
+    One node per (product, stage). Products are independent of each other;
+    within a product each stage depends on the previous one.
+    """
+    dag = {}
+    for product_name in product_names:
+        for i, stage in enumerate(STAGES):
+            dag[(product_name, stage)] = [(product_name, STAGES[i - 1])] if i else []
+    return dag
+
+
+def run_dag(dag, run_node, workers):
+    """
+    Run every node as soon as its dependencies have finished, at most
+    `workers` at a time. run_node(node, upstream_results) returns the
+    node's result. Nodes downstream of a failure are skipped.
+    Returns (results, errors), both keyed by node.
+    """
+    results, errors = {}, {}
+    pending = dict(dag)
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for node, dependencies in list(pending.items()):
+                failed = [dep for dep in dependencies if dep in errors]
+                if failed:
+                    errors[node] = UpstreamFailed(f"{failed[0]} failed")
+                    del pending[node]
+                elif all(dep in results for dep in dependencies):
+                    running[pool.submit(run_node, node, [results[dep] for dep in dependencies])] = node
+                    del pending[node]
+            if not running:
+                if pending:
+                    raise ValueError(f"Unsatisfiable dependencies: {sorted(pending)}")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                if future.exception() is not None:
+                    errors[node] = future.exception()
+                else:
+                    results[node] = future.result()
+    return results, errors
+
+
+class CrewRunner:
+    """Runs one pipeline stage for one product as a single-task crew."""
+
+    def __init__(self, limits, verbose, ledger=None):
+        # Imported here so --help and argument errors don't pay for crewai
+        from agents import ProductAnalysts
+        from tasks import ProductTasks
+        self.limits = limits
+        self.verbose = verbose
+        self.ledger = ledger if ledger is not None else TokenLedger()
+        self.agents = ProductAnalysts()
+        self.tasks = ProductTasks()
+
+    def build(self, stage, product_name, upstream):
+        if stage == 'research':
+            agent = self.agents.market_researcher()
+            return agent, self.tasks.product_analysis_task(agent, product_name)
+        if stage == 'analysis':
+            agent = self.agents.data_analyst()
+            return agent, self.tasks.data_analysis_task(agent, upstream)
+        agent = self.agents.content_writer()
+        return agent, self.tasks.report_writing_task(agent, upstream)
+
+    def __call__(self, node, upstream_results):
+        from crewai import Crew, Process
+        product_name, stage = node
+        agent, task = self.build(stage, product_name, upstream_results)
+        crew = Crew(agents=[agent], tasks=[task], verbose=self.verbose, process=Process.sequential)
+        with self.limits.hold(STAGE_PROVIDERS[stage]):
+            start = time.perf_counter()
+            result = str(crew.kickoff())
+        self.ledger.record(stage, '\n\n'.join(upstream_results), task.description, result)
+        print(f"   ✓ {product_name}: {stage} ({time.perf_counter() - start:.1f}s)")
+        return result
+
+
+def analyze_products(product_names, workers=None, limits=PROVIDER_LIMITS, ledger=None):
+    """
+    Research, analyze and report on every product; returns (reports, errors)
+    by product. Estimated tokens per stage are recorded in ledger if given.
+    """
+    workers = workers or sum(limits.values())
+    runner = CrewRunner(ProviderLimits(limits), verbose=2 if len(product_names) == 1 else 0, ledger=ledger)
+    results, errors = run_dag(build_dag(product_names), runner, workers)
+    reports = {product_name: results[(product_name, 'report')]
+               for product_name in product_names if (product_name, 'report') in results}
+    failures = {product_name: error for (product_name, _), error in errors.items()
+                if not isinstance(error, UpstreamFailed)}
+    return reports, failures
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Product Data Analyst Crew")
+    parser.add_argument('products', nargs='*', help="Products or markets to analyze (prompted if omitted)")
+    parser.add_argument('--products-file', help="File with one product per line")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Stages running at once (default: sum of provider limits)")
+    parser.add_argument('--max-gemini', type=int, default=PROVIDER_LIMITS['gemini'],
+                        help="Concurrent stages calling Gemini")
+    parser.add_argument('--max-serper', type=int, default=PROVIDER_LIMITS['serper'],
+                        help="Concurrent stages calling Serper search")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Always call Gemini and Serper instead of reusing cached results")
+    args = parser.parse_args()
+    if args.no_cache:
+        os.environ['CREW_CACHE'] = 'off'
+
     print("Welcome to the Product Data Analyst Crew!")
     print("---------------------------------------")
-    product_name = input("Enter the product or market you want to analyze: ")
+    product_names = list(args.products)
+    if args.products_file:
+        with open(args.products_file) as f:
+            product_names += [line.strip() for line in f if line.strip()]
+    if not product_names:
+        product_names = [input("Enter the product or market you want to analyze: ").strip()]
+    product_names = list(dict.fromkeys(name for name in product_names if name))
 
-    if not product_name:
+    if not product_names:
         print("Product name is required to start the analysis.")
         return
 
-    agents = ProductAnalysts()
-    tasks = ProductTasks()
-
-    # Create Agents
-    researcher = agents.market_researcher()
-    analyst = agents.data_analyst()
-    writer = agents.content_writer()
-
-    # Create Tasks
-    # Note: Sequential process, so tasks are executed in order.
-    # We pass the output of previous tasks as context implicitly or explicitly if needed.
-    
-    task1 = tasks.product_analysis_task(researcher, product_name)
-    task2 = tasks.data_analysis_task(analyst, [task1]) # context from task1
-    task3 = tasks.report_writing_task(writer, [task2]) # context from task2
-
-    # Instantiate Crew
-    crew = Crew(
-        agents=[researcher, analyst, writer],
-        tasks=[task1, task2, task3],
-        verbose=2, # You can set validation_level to 1, 2, etc. (check crewai docs, verbose=True is standard)
-        process=Process.sequential
-    )
-
-    # Begin the task execution
-    result = crew.kickoff()
-
-    print("######################")
-    print("## Final Result ##")
-    print("######################")
-    print(result)
+    # Research runs concurrently across products; analyst -> writer only
+    # chains within a product, where there is a real dependency
+    limits = {'gemini': args.max_gemini, 'serper': args.max_serper}
+    start = time.perf_counter()
+    ledger = TokenLedger()
+    reports, failures = analyze_products(product_names, args.workers, limits, ledger)
+
+    for product_name, report in reports.items():
+        print("######################")
+        print(f"## Final Result: {product_name} ##")
+        print("######################")
+        print(report)
+    for product_name, error in failures.items():
+        print(f"❌ {product_name}: {error}")
+    print(f"\n{len(reports)} of {len(product_names)} products analyzed in {time.perf_counter() - start:.1f}s")
+    if ledger.stages:
+        print("Estimated tokens per stage:")
+        print(ledger.summary())
+    cache = default_cache()
+    if cache is not None:
+        stats = cache.stats
+        print(f"Call cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['deduplicated']} deduplicated ({cache.path})")
+
 
 if __name__ == "__main__":
     main()
@@ -1,4 +1,5 @@
 from crewai import Task
+from context import CONTEXT_BUDGETS, compact_context
 
 class ProductTasks:
     def product_analysis_task(self, agent, product_name):
@@ -10,17 +11,22 @@ class ProductTasks:
             expected_output="A comprehensive market research report summary."
         )
 
-    def data_analysis_task(self, agent, context):
+    def data_analysis_task(self, agent, context, budget=CONTEXT_BUDGETS['analysis']):
+        # Upstream results are condensed to key findings within the token budget
+        context = compact_context(context, budget)
         return Task(
             description=f"""Analyze the data collected from the market research. 
             Identify patterns, trends, and key insights. 
             Highlight any significant findings that would be valuable for the product strategy.
+            Use your analytics tools for onboarding funnel, cohort retention, feature lift and
+            A/B test numbers from our own product data, and quote the figures they return.
             The context for analysis is: {context}""",
             agent=agent,
             expected_output="A detailed analysis of the market research data."
         )
 
-    def report_writing_task(self, agent, context):
+    def report_writing_task(self, agent, context, budget=CONTEXT_BUDGETS['report']):
+        context = compact_context(context, budget)
         return Task(
             description=f"""Synthesize all findings into a high-quality product analysis report.
             The report should be well-structured, easy to read, and actionable.
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The analytics scripts and the crew modules import their siblings by name
+sys.path[:0] = [os.path.join(ROOT, 'python'), os.path.join(ROOT, 'src')]
+
+SMALL_USERS = 1200
+SMALL_WORKSPACES = 150
+
+
+@pytest.fixture(scope='session')
+def small_dataset(tmp_path_factory):
+    """A small generated CSV dataset, shared by the tests that only read it."""
+    from data_generation import generate_dataset
+    data_dir = str(tmp_path_factory.mktemp('data'))
+    generate_dataset(data_dir, SMALL_USERS, SMALL_WORKSPACES)
+    return data_dir
+
+
+@pytest.fixture(scope='session')
+def sql(small_dataset):
+    """Run SQL against the small dataset's typed DuckDB views; returns a DataFrame."""
+    pytest.importorskip('duckdb')
+    from sql_runner import connect, run_sql_file
+    con = connect(small_dataset)
+
+    def run(query=None, path=None):
+        if path is not None:
+            return run_sql_file(con, os.path.join(ROOT, 'sql', path))[0]
+        return con.execute(query).fetchdf()
+    return run
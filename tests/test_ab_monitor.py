@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import integrate, stats
+
+from ab_monitor import ExperimentMonitor, msprt
+
+
+def mixture_likelihood_ratio(lift, variance, mixing_sd):
+    """The mSPRT statistic by direct integration over a N(0, mixing_sd^2) prior on the lift."""
+    sd = np.sqrt(variance)
+    numerator, _ = integrate.quad(
+        lambda theta: stats.norm.pdf(lift, theta, sd) * stats.norm.pdf(theta, 0, mixing_sd),
+        -10 * mixing_sd, 10 * mixing_sd, points=[0, lift])
+    return numerator / stats.norm.pdf(lift, 0, sd)
+
+
+@pytest.mark.parametrize('lift, variance', [(0.0, 1e-4), (0.01, 1e-4), (-0.03, 4e-4), (0.02, 2.5e-5)])
+def test_msprt_p_value_is_the_inverse_mixture_likelihood_ratio(lift, variance):
+    p_value, _ = msprt(np.array([lift]), np.array([variance]), mixing_sd=0.05)
+    expected = min(1.0, 1 / mixture_likelihood_ratio(lift, variance, 0.05))
+    assert p_value[0] == pytest.approx(expected, rel=1e-6)
+
+
+def test_msprt_interval_excludes_zero_exactly_when_p_is_below_alpha():
+    lift = np.linspace(-0.05, 0.05, 101)
+    variance = np.full_like(lift, 1e-4)
+    p_value, radius = msprt(lift, variance, alpha=0.05)
+    assert np.array_equal(p_value < 0.05, np.abs(lift) > radius)
+
+
+def _assignments(rng, users, rates, tests=1):
+    """users assignment rows per test, with conversion rates per variant."""
+    variant = rng.choice(list(rates), users * tests)
+    return pd.DataFrame({
+        'test_name': np.repeat([f'test_{i}' for i in range(tests)], users),
+        'variant': variant,
+        'converted': rng.random(users * tests) < pd.Series(variant).map(rates).to_numpy(),
+    })
+
+
+def test_always_valid_p_value_never_increases_and_counts_add_up():
+    rng = np.random.default_rng(1)
+    monitor = ExperimentMonitor()
+    previous = 1.0
+    chunks = [_assignments(rng, 200, {'control': 0.30, 'variant_a': 0.33}) for _ in range(30)]
+    for chunk in chunks:
+        p = monitor.update(chunk)['always_valid_p'].iloc[0]
+        assert p <= previous
+        previous = p
+
+    everything = pd.concat(chunks)
+    for (_, variant), (users, conversions) in monitor.counts.items():
+        rows = everything[everything['variant'] == variant]
+        assert (users, conversions) == (len(rows), int(rows['converted'].sum()))
+
+
+def test_false_positive_rate_under_continuous_monitoring_stays_below_alpha():
+    # 200 A/A experiments, each looked at after every batch of users: the share
+    # ever declared significant must stay below alpha (a repeated z-test at
+    # every look rejects about a quarter of them)
+    rng = np.random.default_rng(7)
+    experiments, looks = 200, 40
+    monitor = ExperimentMonitor(alpha=0.05)
+    for _ in range(looks):
+        result = monitor.update(_assignments(rng, 100, {'control': 0.3, 'variant_a': 0.3}, experiments))
+    assert len(result) == experiments
+    assert (result['always_valid_p'] < 0.05).mean() <= 0.05
+
+
+def test_state_round_trip_continues_where_it_left_off():
+    rng = np.random.default_rng(3)
+    chunks = [_assignments(rng, 300, {'control': 0.3, 'variant_a': 0.36}) for _ in range(6)]
+
+    straight = ExperimentMonitor()
+    for chunk in chunks:
+        expected = straight.update(chunk)
+
+    resumed = ExperimentMonitor()
+    for chunk in chunks[:3]:
+        resumed.update(chunk)
+    resumed = ExperimentMonitor.from_state(json.loads(json.dumps(resumed.state())))
+    for chunk in chunks[3:]:
+        actual = resumed.update(chunk)
+
+    pd.testing.assert_frame_equal(actual, expected)
@@ -0,0 +1,78 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from aggregate_store import AGGREGATE_KEYS, VERSIONED_TABLES, compute_aggregates, read_inputs, \
+    refresh_aggregates
+
+
+def _sorted(df, keys):
+    return df.sort_values(keys).reset_index(drop=True) if keys else df.reset_index(drop=True)
+
+
+def assert_aggregates_equal(actual, expected):
+    assert set(actual) == set(expected) == set(AGGREGATE_KEYS)
+    for name, keys in AGGREGATE_KEYS.items():
+        pd.testing.assert_frame_equal(_sorted(actual[name], keys), _sorted(expected[name], keys),
+                                      check_dtype=False, obj=name)
+
+
+@pytest.fixture
+def split_dataset(small_dataset, tmp_path):
+    """A copy of the small dataset holding the first rows of each versioned
+    table, and the remaining lines of each to append later."""
+    data_dir = tmp_path / 'data'
+    shutil.copytree(small_dataset, data_dir)
+    remainders = {}
+    for table in VERSIONED_TABLES:
+        path = data_dir / f'{table}.csv'
+        with open(path, newline='') as f:
+            lines = f.readlines()
+        cut = 1 + (len(lines) - 1) * 2 // 3
+        with open(path, 'w', newline='') as f:
+            f.writelines(lines[:cut])
+        remainders[path] = lines[cut:]
+    return str(data_dir), remainders
+
+
+def _append(remainders):
+    for path, lines in remainders.items():
+        with open(path, 'a', newline='') as f:
+            f.writelines(lines)
+
+
+def test_incremental_refresh_matches_a_full_rebuild(split_dataset):
+    data_dir, remainders = split_dataset
+    _, _, mode = refresh_aggregates(data_dir)
+    assert mode == 'full'
+
+    _append(remainders)
+    _, incremental, mode = refresh_aggregates(data_dir)
+    assert mode == 'incremental'
+    assert_aggregates_equal(incremental, compute_aggregates(read_inputs(data_dir)))
+
+
+def test_unchanged_sources_reuse_the_stored_version(split_dataset):
+    data_dir, _ = split_dataset
+    first_version, first, _ = refresh_aggregates(data_dir)
+    version, stored, mode = refresh_aggregates(data_dir)
+
+    assert (version, mode) == (first_version, 'stored')
+    assert_aggregates_equal(stored, first)
+
+
+def test_rewritten_source_triggers_a_full_rebuild(split_dataset):
+    data_dir, _ = split_dataset
+    refresh_aggregates(data_dir)
+
+    path = os.path.join(data_dir, 'subscriptions.csv')
+    with open(path, newline='') as f:
+        lines = f.readlines()
+    with open(path, 'w', newline='') as f:
+        f.writelines(lines[:-1])
+    _, aggregates, mode = refresh_aggregates(data_dir)
+
+    assert mode == 'full'
+    assert_aggregates_equal(aggregates, compute_aggregates(read_inputs(data_dir)))
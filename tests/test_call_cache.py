@@ -0,0 +1,163 @@
+import threading
+import time
+
+import pytest
+
+import call_cache
+from call_cache import CallCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CallCache(str(tmp_path / 'calls.sqlite'))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A controllable time.time() for the cache module."""
+    now = [1000.0]
+    monkeypatch.setattr(call_cache.time, 'time', lambda: now[0])
+    return now
+
+
+def counting(value):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return value
+    return fn, calls
+
+
+def test_repeated_calls_hit_the_cache(cache):
+    fn, calls = counting({'answer': 42})
+    assert cache.call('llm', 'model', {'prompt': 'hi'}, fn) == {'answer': 42}
+    assert cache.call('llm', 'model', {'prompt': 'hi'}, fn) == {'answer': 42}
+    assert len(calls) == 1
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1
+
+
+def test_key_covers_kind_name_and_payload(cache):
+    fn, calls = counting('text')
+    for kind, name, payload in [('llm', 'a', {'p': 1}), ('tool', 'a', {'p': 1}),
+                                ('llm', 'b', {'p': 1}), ('llm', 'a', {'p': 2})]:
+        cache.call(kind, name, payload, fn)
+    assert len(calls) == 4
+    assert CallCache.key('llm', 'a', {'x': 1, 'y': 2}) == CallCache.key('llm', 'a', {'y': 2, 'x': 1})
+
+
+def test_none_results_are_cached(cache):
+    fn, calls = counting(None)
+    for _ in range(3):
+        assert cache.call('tool', 'search', {'q': 'x'}, fn) is None
+    assert len(calls) == 1
+
+
+def test_results_persist_across_instances(cache, tmp_path):
+    fn, calls = counting('stored')
+    cache.call('llm', 'model', {}, fn)
+    assert CallCache(cache.path).call('llm', 'model', {}, fn) == 'stored'
+    assert len(calls) == 1
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = CallCache(str(tmp_path / 'calls.sqlite'), ttl=60)
+    fn, calls = counting('v')
+    cache.call('llm', 'model', {}, fn)
+    clock[0] += 60
+    cache.call('llm', 'model', {}, fn)
+    assert len(calls) == 1
+    clock[0] += 61
+    cache.call('llm', 'model', {}, fn)
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    # Room for two 12-byte values
+    cache = CallCache(str(tmp_path / 'calls.sqlite'), max_bytes=30)
+    for name in ['a', 'b']:
+        clock[0] += 1
+        cache.call('tool', name, {}, lambda: 'x' * 10)
+    clock[0] += 1
+    cache.call('tool', 'a', {}, lambda: pytest.fail("a should still be cached"))
+    clock[0] += 1
+    cache.call('tool', 'c', {}, lambda: 'x' * 10)
+
+    assert cache.stats['evicted'] == 1
+    fn, calls = counting('x' * 10)
+    clock[0] += 1
+    cache.call('tool', 'b', {}, fn)
+    assert len(calls) == 1
+    cache.call('tool', 'c', {}, lambda: pytest.fail("c should still be cached"))
+
+
+def test_concurrent_identical_calls_are_made_once(cache):
+    waiters = 7
+    calls = []
+
+    def slow():
+        calls.append(1)
+        # Hold the call open until every other thread is waiting on it
+        deadline = time.monotonic() + 10
+        while cache.stats['deduplicated'] < waiters and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return 'result'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.call('llm', 'model', {}, slow)))
+               for _ in range(waiters + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['result'] * (waiters + 1)
+    assert len(calls) == 1
+    assert cache.stats['deduplicated'] == waiters
+
+
+def test_failures_reach_waiters_and_are_not_cached(cache):
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.call('llm', 'model', {}, fail)
+    assert cache.call('llm', 'model', {}, lambda: 'recovered') == 'recovered'
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setenv('CREW_CACHE', 'off')
+    fn, calls = counting('v')
+    call_cache.cached_call('llm', 'model', {}, fn)
+    call_cache.cached_call('llm', 'model', {}, fn)
+    assert len(calls) == 2
+
+
+@pytest.fixture
+def stub_clients(monkeypatch, tmp_path):
+    """The stub backend, caching into a temporary database."""
+    pytest.importorskip('crewai_tools')
+    pytest.importorskip('langchain_core')
+    import clients
+    monkeypatch.setattr(call_cache, '_default_cache', CallCache(str(tmp_path / 'calls.sqlite')))
+    return clients
+
+
+def test_stub_llm_answers_are_cached_per_prompt_and_settings(stub_clients):
+    from langchain_core.messages import HumanMessage
+
+    llm = stub_clients.CachedStubChatModel()
+    first = llm.invoke([HumanMessage(content='Analyze Asana')]).content
+    assert llm.invoke([HumanMessage(content='Analyze Asana')]).content == first
+    assert llm.invoke([HumanMessage(content='Analyze Trello')]).content != first
+    llm.invoke([HumanMessage(content='Analyze Asana')], stop=['Observation'])
+
+    stats = call_cache.default_cache().stats
+    assert (stats['hits'], stats['misses']) == (1, 3)
+
+
+def test_stub_search_results_are_cached(stub_clients):
+    tool = stub_clients.StubSearchTool()
+    assert tool._run('asana pricing') == tool._run('asana pricing')
+    stats = call_cache.default_cache().stats
+    assert (stats['hits'], stats['misses']) == (1, 1)
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+from cohorts import cohort_retention, event_retention_matrix, retention_matrix
+
+SQL_PERIODS = {1: 'retention_m1_pct', 3: 'retention_m3_pct', 6: 'retention_m6_pct', 12: 'retention_m12_pct'}
+
+
+def _compare(triangle, expected, periods):
+    expected = expected.set_index('cohort_month')
+    assert list(triangle.index) == list(expected.index)
+    for period in periods:
+        actual = (triangle[period] * 100).round(1).to_numpy(dtype=float)
+        np.testing.assert_allclose(actual, expected[SQL_PERIODS[period]].to_numpy(dtype=float),
+                                   err_msg=f'month {period}')
+
+
+def test_monthly_retention_matches_the_sql(small_dataset, sql):
+    triangle = cohort_retention('month', data_dir=small_dataset)
+    _compare(triangle, sql(path='04_cohort_retention.sql'), [1, 3, 6])
+
+
+def test_twelve_month_retention_matches_the_sql_over_360_days(small_dataset, sql):
+    # Periods are 30 days, so month 12 is day 360 where the SQL uses 365
+    with open(os.path.join(ROOT, 'sql', '04_cohort_retention.sql')) as f:
+        query = f.read().replace("INTERVAL '365 days'", "INTERVAL '360 days'") \
+            .replace('>= 365', '>= 360')
+    triangle = cohort_retention('month', data_dir=small_dataset)
+    _compare(triangle, sql(query), [12])
+
+
+def test_retention_matrix_on_a_small_reference():
+    # Days since 1970-01-01; observed for 100 days unless noted
+    signup = np.array([0, 5, 10, 40, 45])
+    last_active = np.array([95, 20, 70, 100, 50])
+    observed = np.array([100, 100, 100, 60, 100])
+    triangle = retention_matrix(signup, last_active, observed, 'month')
+
+    assert list(triangle.index) == ['1970-01', '1970-02']
+    assert triangle['cohort_size'].tolist() == [3, 2]
+    # January: active through periods 3, 0 and 2
+    assert triangle.loc['1970-01', [0, 1, 2, 3]].tolist() == pytest.approx([1, 2 / 3, 2 / 3, 1 / 3])
+    # February: one user observed 60 days (through period 2), the other 100
+    assert triangle.loc['1970-02', [1, 2]].tolist() == pytest.approx([1 / 2, 1 / 2])
+    assert triangle.loc['1970-02', 3] == pytest.approx(0.0)
+
+
+def test_event_retention_counts_each_user_once_per_period():
+    users = pd.Series(['a', 'b', 'c'])
+    signup = np.array([0, 0, 0])
+    # a: active in periods 0 and 1 (twice in 1); b: period 2 only; unknown users are ignored
+    event_users = ['a', 'a', 'a', 'b', 'zz']
+    event_days = np.array([1, 31, 45, 65, 31])
+    triangle = event_retention_matrix(users, signup, event_users, event_days, end_day=90)
+
+    assert triangle['cohort_size'].tolist() == [3]
+    assert triangle.loc['1970-01', [0, 1, 2]].tolist() == pytest.approx([1 / 3, 1 / 3, 1 / 3])
+
+
+def test_unknown_granularity_is_rejected():
+    with pytest.raises(ValueError):
+        retention_matrix(np.array([0]), np.array([0]), np.array([0]), 'quarter')
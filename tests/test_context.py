@@ -0,0 +1,50 @@
+import pytest
+
+from context import compact_context, estimate_tokens, key_findings
+
+
+def report(sections=8, bullets=6):
+    """A markdown report with a heading over every few bullets, as agents write them."""
+    lines = ["# Market Research Report"]
+    for section in range(sections):
+        lines.append(f"## Section {section}: Competitor Pricing and Market Share Trends")
+        for bullet in range(bullets):
+            lines.append(f"- Competitor {bullet} grew revenue {10 + bullet}% while churn fell; "
+                         f"key pricing risk for retention in segment {section}.")
+        lines.append("Overall the market keeps growing and conversion is a significant opportunity.")
+    return '\n'.join(lines)
+
+
+@pytest.mark.parametrize('budget', [30, 50, 120, 200, 500, 1200])
+def test_compacted_context_stays_within_budget(budget):
+    text = report()
+    for context in [text, [text, text + ' x'], [report(2, 2), text, report(20, 3)]]:
+        assert estimate_tokens(compact_context(context, budget)) <= budget
+
+
+@pytest.mark.parametrize('budget', [1, 5, 20, 80, 300])
+def test_key_findings_stay_within_budget(budget):
+    assert estimate_tokens(key_findings(report(), budget)) <= budget
+
+
+def test_key_findings_keep_headings_and_figures():
+    findings = key_findings(report(), 200)
+    lines = findings.splitlines()
+    assert lines[0].startswith('Section ') and lines[0].endswith(':')
+    assert all(line.startswith('- ') or line.endswith(':') for line in lines)
+    assert '%' in findings
+
+
+def test_context_that_fits_is_passed_through():
+    text = report(1, 2)
+    assert compact_context(text, estimate_tokens(text)) == text
+    assert compact_context(['first', 'second'], 100) == 'first\n\nsecond'
+    assert compact_context([], 100) == ''
+
+
+def test_short_results_leave_their_share_to_long_ones():
+    short, long = 'Pricing grew 5%.', report()
+    compacted = compact_context([long, short], 300)
+    assert "Upstream result:\nPricing grew 5%." in compacted
+    assert "Key findings" in compacted
+    assert estimate_tokens(compacted) <= 300
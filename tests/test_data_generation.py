@@ -0,0 +1,53 @@
+import filecmp
+import os
+
+import pytest
+
+from conftest import SMALL_USERS, SMALL_WORKSPACES
+from data_generation import generate_dataset
+
+
+def _tree(data_dir):
+    """Relative path of every generated file under data_dir."""
+    return sorted(os.path.relpath(os.path.join(root, name), data_dir)
+                  for root, _, files in os.walk(data_dir) for name in files)
+
+
+def _generate(data_dir, **options):
+    os.makedirs(data_dir, exist_ok=True)
+    row_counts = generate_dataset(str(data_dir), SMALL_USERS, SMALL_WORKSPACES, **options)
+    return row_counts, _tree(data_dir)
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet'])
+def test_sharded_output_is_identical_for_any_worker_count(tmp_path, file_format):
+    one_counts, one_files = _generate(tmp_path / 'one', shards=3, workers=1, file_format=file_format)
+    many_counts, many_files = _generate(tmp_path / 'many', shards=3, workers=3, file_format=file_format)
+
+    assert one_counts == many_counts
+    assert one_files == many_files
+    assert '_shards' not in os.listdir(tmp_path / 'many')
+    _, mismatch, errors = filecmp.cmpfiles(tmp_path / 'one', tmp_path / 'many', one_files, shallow=False)
+    assert mismatch == [] and errors == []
+
+
+def test_chunked_output_is_identical_across_runs(tmp_path):
+    first = _generate(tmp_path / 'first', chunk_size=250)
+    second = _generate(tmp_path / 'second', chunk_size=250)
+
+    assert first == second
+    _, mismatch, errors = filecmp.cmpfiles(tmp_path / 'first', tmp_path / 'second', first[1], shallow=False)
+    assert mismatch == [] and errors == []
+
+
+def test_sharded_ids_are_dense_and_unique(tmp_path):
+    import pandas as pd
+
+    row_counts, _ = _generate(tmp_path, shards=3, workers=1)
+    users = pd.read_csv(tmp_path / 'users.csv')
+    events = pd.read_csv(tmp_path / 'events.csv', usecols=['event_id'])
+
+    assert len(users) == row_counts['users'] == SMALL_USERS
+    assert users['user_id'].is_unique
+    assert events['event_id'].is_unique
+    assert len(events) == row_counts['events']
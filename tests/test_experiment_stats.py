@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from experiment_stats import adjust_pvalues, compare_variants, experiment_counts, wilson_interval
+
+COUNTS = pd.DataFrame({
+    'test_name': ['onboarding'] * 3 + ['pricing'] * 2,
+    'variant': ['control', 'variant_a', 'variant_b', 'control', 'variant_a'],
+    'users': [1000, 980, 1020, 400, 420],
+    'conversions': [334, 418, 351, 12, 21],
+})
+
+
+def holm_reference(p):
+    """Holm step-down, written out one comparison at a time."""
+    order = np.argsort(p)
+    adjusted = np.empty(len(p))
+    running = 0.0
+    for i, index in enumerate(order):
+        running = max(running, min(1.0, (len(p) - i) * p[index]))
+        adjusted[index] = running
+    return adjusted
+
+
+def bh_reference(p):
+    """Benjamini-Hochberg step-up, written out one comparison at a time."""
+    order = np.argsort(p)[::-1]
+    adjusted = np.empty(len(p))
+    running = 1.0
+    for i, index in enumerate(order):
+        rank = len(p) - i
+        running = min(running, len(p) / rank * p[index])
+        adjusted[index] = running
+    return adjusted
+
+
+def test_yates_chi_square_matches_scipy():
+    result = compare_variants(COUNTS)
+    for row in result.itertuples():
+        table = [[row.conversions, row.users - row.conversions],
+                 [row.control_conversions, row.control_users - row.control_conversions]]
+        chi2, p_value, _, _ = stats.chi2_contingency(table, correction=True)
+        assert row.chi2 == pytest.approx(chi2, rel=1e-9)
+        assert row.chi2_p_value == pytest.approx(p_value, rel=1e-9)
+
+
+def test_z_test_matches_the_uncorrected_chi_square():
+    result = compare_variants(COUNTS)
+    for row in result.itertuples():
+        table = [[row.conversions, row.users - row.conversions],
+                 [row.control_conversions, row.control_users - row.control_conversions]]
+        chi2, p_value, _, _ = stats.chi2_contingency(table, correction=False)
+        assert row.z_stat ** 2 == pytest.approx(chi2, rel=1e-9)
+        assert row.p_value == pytest.approx(p_value, rel=1e-9)
+
+
+def test_wilson_interval_matches_reference_values():
+    # Wilson 95% interval for 81/263 (Newcombe, 1998: 0.2553 to 0.3662)
+    lower, upper = wilson_interval(np.array([81.0]), np.array([263.0]))
+    assert lower[0] == pytest.approx(0.2553, abs=1e-4)
+    assert upper[0] == pytest.approx(0.3662, abs=1e-4)
+
+
+@pytest.mark.parametrize('method, reference', [('holm', holm_reference), ('fdr_bh', bh_reference)])
+def test_adjusted_p_values_match_the_step_procedures(method, reference):
+    p = np.random.default_rng(0).uniform(0, 0.2, 25) ** 2
+    np.testing.assert_allclose(adjust_pvalues(p, method), np.minimum(reference(p), 1.0), rtol=1e-12)
+
+
+def test_adjusted_p_values_match_published_example():
+    # Benjamini & Hochberg (1995): 15 p-values, 4 rejected at FDR 0.05 (Holm rejects 3)
+    p = np.array([0.0001, 0.0004, 0.0019, 0.0095, 0.0201, 0.0278, 0.0298, 0.0344,
+                  0.0459, 0.3240, 0.4262, 0.5719, 0.6528, 0.7590, 1.0000])
+    assert (adjust_pvalues(p, 'fdr_bh') < 0.05).sum() == 4
+    assert (adjust_pvalues(p, 'holm') < 0.05).sum() == 3
+    assert (adjust_pvalues(p, 'bonferroni') < 0.05).sum() == 3
+
+
+def test_grouped_adjustment_equals_adjusting_each_group_alone():
+    rng = np.random.default_rng(1)
+    p = rng.uniform(0, 0.1, 30)
+    groups = rng.choice(['a', 'b', 'c'], 30)
+    for method in ['holm', 'fdr_bh', 'bonferroni']:
+        adjusted = adjust_pvalues(p, method, groups)
+        for group in 'abc':
+            within = groups == group
+            np.testing.assert_allclose(adjusted[within], adjust_pvalues(p[within], method), rtol=1e-12)
+
+
+def test_counts_per_segment_add_up_to_all_users():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({
+        'test_name': 'onboarding',
+        'variant': rng.choice(['control', 'variant_a'], 500),
+        'converted': rng.random(500) < 0.4,
+        'account_tier': rng.choice(['free', 'starter', None], 500),
+    })
+    counts = experiment_counts(df, ['converted'], 'account_tier')
+    overall = counts[counts['segment'] == 'All users'].set_index('variant')
+    by_segment = counts[counts['segment'] != 'All users'].groupby('variant')[['users', 'conversions']].sum()
+    pd.testing.assert_frame_equal(overall[['users', 'conversions']], by_segment, check_dtype=False,
+                                  check_names=False)
+    expected = df.groupby('variant')['converted'].agg(['size', 'sum'])
+    assert overall['users'].tolist() == expected['size'].tolist()
+    assert overall['conversions'].tolist() == expected['sum'].tolist()
@@ -0,0 +1,88 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import load_table
+from feature_bitmaps import RETENTION_DAYS, build_index, co_adoption, feature_retention, pack, popcount
+
+
+@pytest.fixture(scope='module')
+def reference(small_dataset):
+    """Per-user tier, 30-day retention flag and adopted features, with plain pandas."""
+    users = load_table('users', small_dataset, columns=['user_id', 'account_tier'])
+    activity = load_table('user_activity_summary', small_dataset,
+                          columns=['user_id', 'signup_date', 'last_active_date', 'days_since_signup'])
+    activity = activity.assign(retained=(activity['days_since_signup'] >= RETENTION_DAYS) &
+                               (activity['last_active_date'] >=
+                                activity['signup_date'] + pd.Timedelta(days=RETENTION_DAYS)))
+    users = users.merge(activity[['user_id', 'retained']], on='user_id', how='left')
+    users['retained'] = users['retained'].fillna(False).astype(bool)
+    usage = load_table('feature_usage', small_dataset, columns=['user_id', 'feature_name'])
+    return users, usage
+
+
+def expected_retention(users, usage):
+    """Every feature in usage, adopted or not by these users."""
+    rows = []
+    for feature, adopters in usage.groupby('feature_name', observed=True)['user_id']:
+        adopted = users['user_id'].isin(adopters)
+        rows.append({
+            'feature_name': str(feature),
+            'adopters': int(adopted.sum()),
+            'adoption_rate': adopted.mean(),
+            'retention_rate': users.loc[adopted, 'retained'].mean(),
+            'baseline_retention_rate': users.loc[~adopted, 'retained'].mean(),
+        })
+    return pd.DataFrame(rows).set_index('feature_name').sort_index()
+
+
+def _check(actual, expected):
+    actual = actual.set_index('feature_name').sort_index()
+    assert actual.index.tolist() == expected.index.tolist()
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False)
+    np.testing.assert_allclose(actual['retention_lift'],
+                               actual['retention_rate'] / actual['baseline_retention_rate'])
+
+
+def test_feature_retention_matches_a_groupby(small_dataset, reference):
+    users, usage = reference
+    _check(feature_retention(build_index(small_dataset)), expected_retention(users, usage))
+
+
+def test_feature_retention_within_a_tier_matches_a_groupby(small_dataset, reference):
+    users, usage = reference
+    index = build_index(small_dataset)
+    for tier in ['free', 'enterprise']:
+        on_tier = users[users['account_tier'] == tier]
+        _check(feature_retention(index, index['tiers'][tier]), expected_retention(on_tier, usage))
+
+
+def test_co_adoption_matches_a_crosstab(small_dataset, reference):
+    _, usage = reference
+    adopted = pd.crosstab(usage['user_id'], usage['feature_name'].astype(str)).clip(upper=1)
+    expected = adopted.T @ adopted
+    actual = co_adoption(build_index(small_dataset))
+    pd.testing.assert_frame_equal(actual.loc[expected.index, expected.columns], expected,
+                                  check_dtype=False, check_names=False)
+
+
+def test_rows_for_unknown_users_are_ignored(small_dataset, tmp_path):
+    data_dir = tmp_path / 'data'
+    shutil.copytree(small_dataset, data_dir)
+    for table in ['feature_usage', 'user_activity_summary']:
+        path = data_dir / f'{table}.csv'
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        ghost = df.head(5).assign(user_id='ghost_user')
+        pd.concat([df, ghost]).to_csv(path, index=False)
+
+    clean, extended = build_index(small_dataset), build_index(str(data_dir))
+    assert np.array_equal(clean['retained'], extended['retained'])
+    for name, bitmap in clean['features'].items():
+        assert np.array_equal(bitmap, extended['features'][name])
+
+
+def test_pack_and_popcount_round_trip():
+    bits = np.random.default_rng(0).random((3, 130)) < 0.3
+    assert popcount(pack(bits)).tolist() == bits.sum(axis=1).tolist()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import load_table
+from funnel import ALL_USERS, NO_SEGMENT, ONBOARDING_STEPS, funnel_metrics, onboarding_funnel
+
+
+def test_onboarding_funnel_matches_the_sql(small_dataset, sql):
+    expected = sql(path='02_onboarding_cliff.sql')
+    funnel = onboarding_funnel(data_dir=small_dataset)
+
+    assert funnel['step_name'].tolist() == expected['step_name'].tolist()
+    assert funnel['users_reached'].tolist() == expected['users_reached'].tolist()
+    assert funnel['users_completed'].tolist() == expected['users_completed'].tolist()
+    np.testing.assert_allclose((funnel['completion_rate'] * 100).round(1),
+                               expected['completion_rate'].astype(float))
+    np.testing.assert_allclose((funnel['drop_off_rate'] * 100).round(1),
+                               expected['drop_off_rate'].astype(float))
+    np.testing.assert_allclose(funnel['median_hours_from_previous'].round(1),
+                               expected['median_hours_from_previous'].astype(float))
+
+
+def test_segments_match_a_groupby_and_add_up(small_dataset):
+    funnel = onboarding_funnel('account_tier', data_dir=small_dataset)
+    assert ALL_USERS not in set(funnel['segment'])
+
+    flags = [flag for flag, _, _ in ONBOARDING_STEPS]
+    df = load_table('onboarding_funnel', small_dataset, columns=['user_id'] + flags)
+    users = load_table('users', small_dataset, columns=['user_id', 'account_tier'])
+    df = df.merge(users, on='user_id')
+    completed = df.groupby('account_tier', observed=True)[flags].sum()
+    for tier, row in completed.iterrows():
+        counts = funnel[funnel['segment'] == tier]['users_completed'].tolist()
+        assert counts == row.tolist()
+
+    total = onboarding_funnel(data_dir=small_dataset)
+    summed = funnel.groupby('step_number')[['users_reached', 'users_completed']].sum()
+    assert summed['users_reached'].tolist() == total['users_reached'].tolist()
+    assert summed['users_completed'].tolist() == total['users_completed'].tolist()
+
+
+def test_reached_is_the_previous_step_and_missing_segments_are_kept():
+    df = pd.DataFrame({
+        'a': [True, True, True, False, True],
+        'b': [True, False, True, False, True],
+        'c': [False, False, True, False, True],
+        'group': ['x', 'x', None, 'y', 'y'],
+    })
+    result = funnel_metrics(df, ['a', 'b', 'c'], segment='group').set_index(['segment', 'step_number'])
+
+    assert result.loc['x', 'users_reached'].tolist() == [2, 2, 1]
+    assert result.loc['x', 'users_completed'].tolist() == [2, 1, 0]
+    assert result.loc[NO_SEGMENT, 'users_completed'].tolist() == [1, 1, 1]
+    assert result.loc['y', 'conversion_from_start'].tolist() == pytest.approx([0.5, 0.5, 0.5])
+    assert result.loc['y', 'drop_off_rate'].tolist() == pytest.approx([0.5, 0.0, 0.0])
+
+
+def test_unknown_segment_is_rejected(small_dataset):
+    with pytest.raises(ValueError):
+        onboarding_funnel('country', data_dir=small_dataset)
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+import call_cache
+from call_cache import CallCache
+from main import STAGE_PROVIDERS, STAGES, ProviderLimits, UpstreamFailed, analyze_products, build_dag, \
+    run_dag
+
+
+class StubStages:
+    """run_node stand-in: records start/finish order and peak concurrency per provider."""
+
+    def __init__(self, limits=None, fail=(), latency=0.02):
+        self.limits = limits
+        self.fail = set(fail)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.events = []
+        self.active = {'all': 0}
+        self.peak = {'all': 0}
+
+    def _count(self, keys, step):
+        with self.lock:
+            for key in keys:
+                self.active[key] = self.active.get(key, 0) + step
+                self.peak[key] = max(self.peak.get(key, 0), self.active[key])
+
+    def _work(self, node, keys):
+        self._count(keys, 1)
+        time.sleep(self.latency)
+        self._count(keys, -1)
+        if node in self.fail:
+            raise RuntimeError(f"{node} failed")
+
+    def __call__(self, node, upstream):
+        with self.lock:
+            self.events.append(('start', node))
+        providers = STAGE_PROVIDERS[node[1]]
+        if self.limits is None:
+            self._work(node, ['all'])
+        else:
+            with self.limits.hold(providers):
+                self._work(node, ['all'] + providers)
+        with self.lock:
+            self.events.append(('finish', node))
+        return f"{node[1]} of {node[0]} after [{', '.join(upstream)}]"
+
+
+def test_build_dag_chains_stages_within_each_product():
+    dag = build_dag(['Asana', 'Trello'])
+    assert len(dag) == 2 * len(STAGES)
+    assert dag[('Asana', 'research')] == []
+    assert dag[('Asana', 'analysis')] == [('Asana', 'research')]
+    assert dag[('Trello', 'report')] == [('Trello', 'analysis')]
+
+
+def test_nodes_start_after_their_dependencies_and_get_their_results():
+    products = ['A', 'B', 'C']
+    dag = build_dag(products)
+    stages = StubStages()
+    results, errors = run_dag(dag, stages, workers=3)
+
+    assert errors == {}
+    assert results[('B', 'report')] == "report of B after [analysis of B after [research of B after []]]"
+    order = {event: i for i, event in enumerate(stages.events)}
+    for node, dependencies in dag.items():
+        for dependency in dependencies:
+            assert order[('finish', dependency)] < order[('start', node)]
+    # Independent products overlap
+    assert stages.peak['all'] > 1
+
+
+@pytest.mark.parametrize('workers', [1, 2, 5])
+def test_at_most_workers_nodes_run_at_once(workers):
+    stages = StubStages()
+    run_dag(build_dag(list('ABCDEF')), stages, workers)
+    assert stages.peak['all'] <= workers
+
+
+def test_provider_limits_bound_concurrent_stages():
+    limits = {'gemini': 2, 'serper': 1}
+    stages = StubStages(ProviderLimits(limits))
+    results, _ = run_dag(build_dag(list('ABCDEFGH')), stages, workers=8)
+
+    assert len(results) == 8 * len(STAGES)
+    assert stages.peak['gemini'] == 2
+    assert stages.peak['serper'] == 1
+
+
+def test_failures_skip_only_downstream_nodes():
+    stages = StubStages(fail=[('B', 'research'), ('C', 'analysis')])
+    results, errors = run_dag(build_dag(['A', 'B', 'C']), stages, workers=2)
+
+    assert set(results) == {('A', 'research'), ('A', 'analysis'), ('A', 'report'), ('C', 'research')}
+    assert isinstance(errors[('B', 'research')], RuntimeError)
+    assert isinstance(errors[('B', 'analysis')], UpstreamFailed)
+    assert isinstance(errors[('B', 'report')], UpstreamFailed)
+    assert isinstance(errors[('C', 'report')], UpstreamFailed)
+    assert ('B', 'analysis') not in {node for kind, node in stages.events}
+
+
+def test_unsatisfiable_dependencies_are_reported():
+    dag = {'a': ['b'], 'b': ['a']}
+    with pytest.raises(ValueError):
+        run_dag(dag, StubStages(), workers=2)
+
+
+def test_products_run_end_to_end_on_the_stub_backend(monkeypatch, tmp_path):
+    pytest.importorskip('crewai')
+    import agents
+    import clients
+    monkeypatch.setattr(clients, 'BACKEND', 'stub')
+    monkeypatch.setattr(agents, '_built', {})
+    monkeypatch.setattr(call_cache, '_default_cache', CallCache(str(tmp_path / 'calls.sqlite')))
+
+    reports, failures = analyze_products(['Asana', 'Trello'], limits={'gemini': 1, 'serper': 1})
+    assert failures == {}
+    assert set(reports) == {'Asana', 'Trello'}
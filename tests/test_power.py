@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from power import days_curve, days_to_significance, grid_path, mde_proportions, planning_grid, \
+    power_proportions, sample_size_means, sample_size_proportions
+
+
+def test_sample_size_matches_closed_form_values():
+    # 10% -> 12% at alpha 0.05, power 0.80: 3,841 per arm (Fleiss, without
+    # continuity correction); 0.5 sd difference in means: 63 per arm
+    assert sample_size_proportions(0.10, 0.02) == 3841
+    assert sample_size_means(1.0, 0.5) == 63
+    # One-sided tests and lower power need fewer users, higher power more
+    assert sample_size_proportions(0.10, 0.02, two_sided=False) < 3841
+    assert sample_size_proportions(0.10, 0.02, power=0.90) > 3841
+
+
+def test_sample_size_broadcasts_and_rejects_impossible_designs():
+    n = sample_size_proportions(np.array([[0.2], [0.5]]), np.array([0.01, 0.05, 0.1]))
+    assert n.shape == (2, 3)
+    assert (np.diff(n, axis=1) < 0).all()
+    assert np.isnan(sample_size_proportions(0.95, 0.1))
+    assert np.isnan(sample_size_proportions(0.3, 0.0))
+
+
+def test_power_and_mde_invert_the_sample_size():
+    baselines = np.array([0.05, 0.2, 0.5])
+    mdes = np.array([0.01, 0.03, 0.05])
+    n = sample_size_proportions(baselines, mdes)
+    assert (power_proportions(baselines, mdes, n) >= 0.80).all()
+    assert (power_proportions(baselines, mdes, n - 50) < 0.80).all()
+    np.testing.assert_allclose(mde_proportions(baselines, n), mdes, rtol=1e-3)
+
+
+def test_simulated_power_matches_the_planned_power():
+    # Two-proportion z-tests on binomial draws at the planned sample size
+    baseline, mde = 0.3, 0.05
+    n = int(sample_size_proportions(baseline, mde))
+    rng = np.random.default_rng(0)
+    control = rng.binomial(n, baseline, 20_000) / n
+    variant = rng.binomial(n, baseline + mde, 20_000) / n
+    pooled = (control + variant) / 2
+    z = (variant - control) / np.sqrt(pooled * (1 - pooled) * 2 / n)
+    assert (np.abs(z) > 1.959964).mean() == pytest.approx(0.80, abs=0.015)
+
+
+def test_days_to_significance():
+    # 3,000 signups a month split over two arms is 50 users per arm a day
+    assert days_to_significance(1000, 3000) == 20
+    assert days_to_significance(1001, 3000) == 21
+    assert days_to_significance(1000, 3000, share_in_test=0.5) == 40
+
+
+def test_planning_grid_is_stored_and_read_back(tmp_path):
+    kwargs = dict(baselines=np.array([0.1, 0.3]), mdes=np.array([0.02, 0.05]),
+                  alphas=np.array([0.05]), powers=np.array([0.8]))
+    grid = planning_grid(str(tmp_path), **kwargs)
+    assert len(os.listdir(grid_path(str(tmp_path)))) == 1
+    pd.testing.assert_frame_equal(planning_grid(str(tmp_path), **kwargs), grid)
+
+    curve = days_curve(grid, 0.11, 3000)
+    assert curve['baseline'].unique().tolist() == [0.1]
+    assert curve['users_per_arm'].tolist() == [3841, sample_size_proportions(0.1, 0.05)]
+    assert curve['days'].tolist() == [77, np.ceil(sample_size_proportions(0.1, 0.05) / 50)]
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from resampling import poisson_bootstrap, resample_differences, resampling_intervals
+
+
+@pytest.fixture(scope='module')
+def groups():
+    rng = np.random.default_rng(0)
+    return {
+        'All users': (rng.exponential(10, 400), rng.exponential(12, 380)),
+        'small': (rng.exponential(10, 30), rng.exponential(12, 25)),
+    }
+
+
+def test_results_do_not_depend_on_the_number_of_workers(groups):
+    one = resample_differences(groups, n_resamples=2000, workers=1)
+    pool = resample_differences(groups, n_resamples=2000, workers=2)
+    assert one.keys() == pool.keys()
+    for key in one:
+        np.testing.assert_array_equal(one[key], pool[key])
+
+
+def test_results_depend_only_on_the_seed(groups):
+    first = resampling_intervals(groups, n_resamples=2000, seed=1)
+    pd.testing.assert_frame_equal(first, resampling_intervals(groups, n_resamples=2000, seed=1))
+    assert not first.equals(resampling_intervals(groups, n_resamples=2000, seed=2))
+
+
+def test_permutation_p_value_matches_the_exact_test():
+    control, variant = np.array([1.0, 2.0, 2.5, 4.0, 3.0]), np.array([3.5, 5.0, 4.5, 6.0, 2.0])
+    exact = stats.permutation_test((variant, control), lambda x, y: np.mean(x) - np.mean(y),
+                                   permutation_type='independent', n_resamples=np.inf).pvalue
+    result = resampling_intervals({'tiny': (control, variant)}, n_resamples=20_000)
+    assert result['p_value'].iloc[0] == pytest.approx(exact, abs=0.01)
+
+
+def test_bootstrap_interval_agrees_with_the_normal_interval_for_large_samples():
+    rng = np.random.default_rng(1)
+    control, variant = rng.normal(10, 3, 4000), rng.normal(10.4, 3, 4000)
+    result = resampling_intervals({'large': (control, variant)}, n_resamples=4000).iloc[0]
+
+    difference = variant.mean() - control.mean()
+    se = np.sqrt(control.var(ddof=1) / len(control) + variant.var(ddof=1) / len(variant))
+    assert result['difference'] == pytest.approx(difference)
+    assert result['ci_lower'] == pytest.approx(difference - 1.96 * se, abs=0.1 * se)
+    assert result['ci_upper'] == pytest.approx(difference + 1.96 * se, abs=0.1 * se)
+
+
+def test_poisson_bootstrap_streams_chunks_to_the_same_estimate():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({'variant': rng.choice(['control', 'variant_a'], 6000),
+                       'value': rng.normal(5, 2, 6000)})
+    df.loc[::50, 'value'] = np.nan
+    chunks = [df.iloc[start:start + 1000] for start in range(0, len(df), 1000)]
+    result = poisson_bootstrap(chunks, 'value', n_resamples=2000)
+
+    valid = df.dropna()
+    means = valid.groupby('variant')['value'].mean()
+    assert result['users'] + result['control_users'] == len(valid)
+    assert result['difference'] == pytest.approx(means['variant_a'] - means['control'])
+    bootstrap = resampling_intervals(
+        {'all': (valid.loc[valid['variant'] == 'control', 'value'],
+                 valid.loc[valid['variant'] == 'variant_a', 'value'])}, n_resamples=2000).iloc[0]
+    width = bootstrap['ci_upper'] - bootstrap['ci_lower']
+    assert result['ci_lower'] == pytest.approx(bootstrap['ci_lower'], abs=0.1 * width)
+    assert result['ci_upper'] == pytest.approx(bootstrap['ci_upper'], abs=0.1 * width)
+
+
+def test_unknown_statistic_is_rejected(groups):
+    with pytest.raises(ValueError):
+        resample_differences(groups, statistic='mode')
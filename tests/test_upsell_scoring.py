@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from data_loader import MRR_MAP
+from upsell_scoring import PAID_PLANS, PROFILE_COLUMNS, score_workspaces, undermonetized_workspaces, \
+    uplift_summary, workspace_profiles
+
+# Typical per-user activity by plan in the fixture
+PLAN_ACTIVITY = {'free': 5, 'starter': 20, 'professional': 60, 'enterprise': 150}
+
+
+def fixture_workspaces():
+    """Five workspaces per plan with activity scaled to the plan, plus three free candidates."""
+    rng = np.random.default_rng(0)
+    rows, plans = [], {}
+    workspaces = [(f'{plan}_{i}', plan, level, 3 + i)
+                  for plan, level in PLAN_ACTIVITY.items() for i in range(5)]
+    # Free workspaces that behave like enterprise, professional and free
+    workspaces += [('looks_enterprise', 'free', 150, 10), ('looks_professional', 'free', 60, 4),
+                   ('looks_free', 'free', 5, 4)]
+    for workspace, plan, level, users in workspaces:
+        plans[workspace] = plan
+        for user in range(users):
+            activity = level * rng.uniform(0.9, 1.1)
+            rows.append({'workspace_id': workspace, 'user_id': f'{workspace}_{user}',
+                         **{column: activity for column in PROFILE_COLUMNS},
+                         'is_power_user': level >= 60})
+    return pd.DataFrame(rows), pd.Series(plans)
+
+
+def test_workspace_profiles_match_a_groupby():
+    activity, _ = fixture_workspaces()
+    profiles = workspace_profiles(activity)
+    grouped = activity.groupby('workspace_id')
+    expected = grouped[PROFILE_COLUMNS].mean().assign(
+        users=grouped.size(), power_user_share=grouped['is_power_user'].mean())
+    pd.testing.assert_frame_equal(profiles.sort_index()[expected.columns], expected.sort_index(),
+                                  check_dtype=False, check_names=False)
+
+
+def test_free_workspaces_are_ranked_by_expected_uplift():
+    activity, plans = fixture_workspaces()
+    scores = score_workspaces(workspace_profiles(activity), plans)
+
+    assert set(scores['workspace_id']) == {workspace for workspace, plan in plans.items() if plan == 'free'}
+    assert scores['workspace_id'].head(2).tolist() == ['looks_enterprise', 'looks_professional']
+    assert scores['expected_mrr_uplift'].is_monotonic_decreasing
+
+    by_workspace = scores.set_index('workspace_id')
+    assert by_workspace.loc['looks_enterprise', 'nearest_paid_plan'] == 'enterprise'
+    assert by_workspace.loc['looks_professional', 'nearest_paid_plan'] == 'professional'
+    assert MRR_MAP['professional'] < by_workspace.loc['looks_enterprise', 'expected_mrr_per_seat'] <= \
+        MRR_MAP['enterprise']
+    assert by_workspace.loc['looks_free', 'expected_mrr_per_seat'] < MRR_MAP['starter'] / 2
+    np.testing.assert_allclose(scores['expected_mrr_uplift'],
+                               scores['expected_mrr_per_seat'] * scores['users'])
+
+
+def test_plan_probabilities_give_the_expected_mrr():
+    activity, plans = fixture_workspaces()
+    scores = score_workspaces(workspace_profiles(activity), plans)
+    paid = scores[[f'p_{plan}' for plan in PAID_PLANS]]
+    assert ((paid.sum(axis=1) > 0) & (paid.sum(axis=1) <= 1 + 1e-12)).all()
+    expected = sum(scores[f'p_{plan}'] * MRR_MAP[plan] for plan in PAID_PLANS)
+    np.testing.assert_allclose(scores['expected_mrr_per_seat'], expected)
+
+
+def test_uplift_summary_totals_the_top_candidates():
+    scores = pd.DataFrame({'users': [10, 4, 2], 'expected_mrr_uplift': [400.0, 90.0, 5.0]})
+    assert uplift_summary(scores, top=2) == {'workspaces': 2, 'users': 14, 'expected_mrr_uplift': 490.0,
+                                            'expected_arr_uplift': 5880.0}
+    assert uplift_summary(scores)['workspaces'] == 3
+
+
+def test_scores_on_generated_data_cover_active_free_workspaces(small_dataset):
+    scores = undermonetized_workspaces(small_dataset)
+    subscriptions = pd.read_csv(f'{small_dataset}/subscriptions.csv')
+    free = subscriptions[subscriptions['is_active'] & (subscriptions['plan_type'] == 'free')]
+    assert set(scores['workspace_id']) <= set(free['workspace_id'])
+    assert len(scores) > 0
+    assert scores['expected_mrr_uplift'].is_monotonic_decreasing